@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+
+from benchmarks.bench_serialize import make_articles
+from src.engine.keywords import KEYWORDS_FILE, KeywordMatcher, TagIndex, ahocorasick
+from src.engine.output import save_articles_to_file
+
+
+def legacy_tags(patterns, article):
+    # What topic filtering did before: one regular expression per keyword over the text
+    text = f"{article.get('title') or ''}\n{article.get('article_body') or ''}"
+    return [tag for tag, tag_patterns in patterns.items() if any(p.search(text) for p in tag_patterns)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time keyword tagging and tag lookups against scanning the text.")
+    parser.add_argument("--articles", type=int, default=20_000)
+    parser.add_argument("--keywords", default=KEYWORDS_FILE)
+    parser.add_argument("--tag", default="nuclear")
+    args = parser.parse_args()
+
+    with open(args.keywords, "r", encoding="utf-8") as f:
+        keywords = json.load(f)
+    articles = [article.to_dict() for article in make_articles(args.articles)]
+    matcher = KeywordMatcher(keywords)
+    patterns = {
+        tag: [re.compile(r"(?<!\w)" + re.escape(word), re.IGNORECASE) for word in words]
+        for tag, words in keywords.items()
+    }
+    print(f"{len(articles)} articles, {len(matcher.keywords)} keywords, "
+          f"{'pyahocorasick' if ahocorasick is not None else 'trie regex'} matcher")
+
+    started = time.perf_counter()
+    for article in articles:
+        legacy_tags(patterns, article)
+    legacy = time.perf_counter() - started
+    started = time.perf_counter()
+    matcher.tag_articles(articles)
+    tagging = time.perf_counter() - started
+    print(f"{'per-keyword regex':24} {legacy / len(articles) * 1e6:>8.0f} us/article")
+    print(f"{'matcher':24} {tagging / len(articles) * 1e6:>8.0f} us/article")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        output_file = os.path.join(work_dir, "output.json")
+        save_articles_to_file(articles, output_file, compact=True)
+        index = TagIndex(os.path.join(work_dir, "tags.sqlite"))
+        index.add(articles, output_file)
+
+        # A month of one topic: scanning every article's text against finding it in the index
+        start, end = date(2024, 5, 1), date(2024, 5, 31)
+        started = time.perf_counter()
+        with open(output_file, "r", encoding="utf-8") as f:
+            scanned = [
+                a for a in json.load(f)
+                if start.isoformat() <= (a.get("date") or "") <= end.isoformat() and args.tag in legacy_tags(patterns, a)
+            ]
+        scan = time.perf_counter() - started
+        started = time.perf_counter()
+        found = index.find(args.tag, start_date=start, end_date=end)
+        lookup = time.perf_counter() - started
+        print(f"{'filter by scanning':24} {scan * 1e3:>8.1f} ms, {len(scanned)} articles")
+        print(f"{'filter by tag index':24} {lookup * 1e3:>8.1f} ms, {len(found)} articles")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
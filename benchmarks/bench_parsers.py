@@ -0,0 +1,263 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+from benchmarks.offline import serve_fixtures
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DAY = date(2024, 5, 13)
+
+# Every extraction function of every scraper, with the fixtures it is served.
+# name: (module, function, args, {url: fixture})
+CASES = {
+    "onet_pl.scrape_article": (
+        "src.scrapers.onet_pl_scraper", "scrape_article",
+        ("https://wiadomosci.onet.pl/kraj/artykul-1/abc1",),
+        {"https://wiadomosci.onet.pl/kraj/artykul-1/abc1": "onet_pl/article.html"},
+    ),
+    "onet_pl.collect_links_by_date": (
+        "src.scrapers.onet_pl_scraper", "collect_links_by_date", (DAY,),
+        {"https://wiadomosci.onet.pl/archiwum/2024-05-13": "onet_pl/archive.html"},
+    ),
+    "pravda_ua.scrape_article[main]": (
+        "src.scrapers.pravda_ua_scraper", "scrape_article",
+        ("https://www.pravda.com.ua/news/2024/05/13/7400000/",),
+        {"https://www.pravda.com.ua/news/2024/05/13/7400000/": "pravda_ua/article_main.html"},
+    ),
+    "pravda_ua.scrape_article[life]": (
+        "src.scrapers.pravda_ua_scraper", "scrape_article",
+        ("https://life.pravda.com.ua/society/2024/05/13/7400001/",),
+        {"https://life.pravda.com.ua/society/2024/05/13/7400001/": "pravda_ua/article_life.html"},
+    ),
+    "pravda_ua.scrape_article[epravda]": (
+        "src.scrapers.pravda_ua_scraper", "scrape_article",
+        ("https://www.epravda.com.ua/news/2024/05/13/7400002/",),
+        {"https://www.epravda.com.ua/news/2024/05/13/7400002/": "pravda_ua/article_epravda.html"},
+    ),
+    "pravda_ua.scrape_article[eurointegration]": (
+        "src.scrapers.pravda_ua_scraper", "scrape_article",
+        ("https://www.eurointegration.com.ua/news/2024/05/13/7400003/",),
+        {"https://www.eurointegration.com.ua/news/2024/05/13/7400003/": "pravda_ua/article_eurointegration.html"},
+    ),
+    "pravda_ua.collect_links_by_date": (
+        "src.scrapers.pravda_ua_scraper", "collect_links_by_date", (DAY,),
+        {"https://www.pravda.com.ua/archives/date_13052024/": "pravda_ua/archive.html"},
+    ),
+    "blikk_hu.scrape_article": (
+        "src.scrapers.blikk_hu_scraper", "scrape_article",
+        ("https://www.blikk.hu/aktualis/belfold/cikk-1/x1",),
+        {"https://www.blikk.hu/aktualis/belfold/cikk-1/x1": "blikk_hu/article.html"},
+    ),
+    "blikk_hu.collect_links_by_date": (
+        "src.scrapers.blikk_hu_scraper", "collect_links_by_date", (DAY,),
+        {
+            "https://www.blikk.hu/archivum/online?date=2024-05-13&page=0": "blikk_hu/archive.html",
+            "https://www.blikk.hu/archivum/online?date=2024-05-13&page=1": "blikk_hu/archive_empty.html",
+        },
+    ),
+    "aktualne_cz.scrape_article": (
+        "src.scrapers.aktualne_cz_scraper", "scrape_article",
+        ("https://zpravy.aktualne.cz/domaci/clanek-1/r~000001/",),
+        {"https://zpravy.aktualne.cz/domaci/clanek-1/r~000001/": "aktualne_cz/article.html"},
+    ),
+    "aktualne_cz.collect_links": (
+        "src.scrapers.aktualne_cz_scraper", "collect_links", ("atom",),
+        {"https://www.aktualne.cz/hledani/?offset=0&query=atom": "aktualne_cz/search.html"},
+    ),
+    "iz_ru.srape_iz_ru": (
+        "src.scrapers.iz_ru_scraper", "srape_iz_ru",
+        ("https://iz.ru/1300001/2022-02-02/statia-1",),
+        {"https://iz.ru/1300001/2022-02-02/statia-1": "iz_ru/article.html"},
+    ),
+    "iz_ru.collect_links": (
+        "src.scrapers.iz_ru_scraper", "collect_links", ("atom",),
+        {
+            f"https://iz.ru/search?type=0&prd=0&from={page}&text=atom&date_from=&date_to=&sort=0": "iz_ru/search.html"
+            for page in range(0, 30, 10)
+        },
+    ),
+    "aktuality_sk.scrape_aktuality_sk": (
+        "src.scrapers.aktuality_sk_scraper", "scrape_aktuality_sk",
+        ("https://www.aktuality.sk/clanok/1abc/clanok-1/",),
+        {"https://www.aktuality.sk/clanok/1abc/clanok-1/": "aktuality_sk/article.html"},
+    ),
+    "aktuality_sk.collect_links": (
+        "src.scrapers.aktuality_sk_scraper", "collect_links", ("atom",),
+        {
+            "https://www.aktuality.sk/vyhladavanie/1/?search%5Btext%5D=atom&search%5Bzdroj%5D=spravy": "aktuality_sk/search.html",
+            "https://www.aktuality.sk/vyhladavanie/2/?search%5Btext%5D=atom&search%5Bzdroj%5D=spravy": "aktuality_sk/search_empty.html",
+        },
+    ),
+}
+
+
+def bench_case(name, min_time):
+    module_name, function_name, args, routes = CASES[name]
+    function = getattr(importlib.import_module(module_name), function_name)
+
+    with serve_fixtures(routes) as router, contextlib.redirect_stdout(io.StringIO()) as log:
+        function(*args)  # warm-up
+
+        # Peak memory of a single call, measured apart from the timed loop
+        tracemalloc.start()
+        function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        router.fetches = 0
+        started = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            function(*args)
+            log.seek(0)
+            log.truncate()
+            elapsed = time.perf_counter() - started
+
+    return {
+        "pages_per_sec": round(router.fetches / elapsed, 2),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def write_synthetic_output(path, size_mb, duplicate_ratio=0.1, seed=26):
+    # Streams a scraper-shaped output file to disk without holding it in memory
+    rng = random.Random(seed)
+    body = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 50
+    target = size_mb * 1024 * 1024
+    written = 0
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        while written < target:
+            if count and rng.random() < duplicate_ratio:
+                url_id = rng.randrange(count)
+            else:
+                url_id = count
+            record = {
+                "country": "Poland",
+                "language": "pl",
+                "source": "onet_pl",
+                "url": f"https://wiadomosci.onet.pl/kraj/artykul-{url_id}/abc",
+                "date": "2024-05-13",
+                "title": f"Article {count}",
+                "article_body": body,
+            }
+            chunk = ("" if count == 0 else ",\n") + json.dumps(record, ensure_ascii=False, indent=4)
+            f.write(chunk)
+            written += len(chunk)
+            count += 1
+        f.write("\n]")
+    return count
+
+
+def _dedup_child(path, queue):
+    from src.utils.deduplication import remove_duplicates_from_file
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        remove_duplicates_from_file(path)
+        elapsed = time.perf_counter() - started
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def bench_dedup(size_mb):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic_output.json")
+        records = write_synthetic_output(path, size_mb)
+        actual_mb = os.path.getsize(path) / (1024 * 1024)
+
+        # A fresh interpreter per run, so ru_maxrss is the peak of dedup alone
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=_dedup_child, args=(path, queue))
+        process.start()
+        elapsed, max_rss_kb = queue.get()
+        process.join()
+
+    return {
+        "mb_per_sec": round(actual_mb / elapsed, 2),
+        "records_per_sec": round(records / elapsed, 2),
+        "peak_rss_kb": max_rss_kb,
+    }
+
+
+def compare(results, baseline, tolerance):
+    # Throughput may drop and memory may grow by `tolerance` before it counts
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, value in metrics.items():
+            if metric not in reference:
+                continue
+            expected = reference[metric]
+            if metric.endswith("_per_sec"):
+                if value < expected * (1 - tolerance):
+                    regressions.append((name, metric, expected, value))
+            elif value > expected * (1 + tolerance):
+                regressions.append((name, metric, expected, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for every site parser and for deduplication.")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to spend timing each case")
+    parser.add_argument("--dedup-mb", type=int, default=64, help="size of the synthetic dedup input, 0 to skip")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    args = parser.parse_args()
+
+    results = {}
+    for name in CASES:
+        if args.only and args.only not in name:
+            continue
+        results[name] = bench_case(name, args.min_time)
+        print(f"{name:45} {results[name]['pages_per_sec']:>10} pages/s {results[name]['peak_kb']:>10} KB peak")
+
+    if args.dedup_mb and (not args.only or args.only in "dedup"):
+        name = f"dedup[{args.dedup_mb}MB]"
+        results[name] = bench_dedup(args.dedup_mb)
+        print(f"{name:45} {results[name]['mb_per_sec']:>10} MB/s    {results[name]['peak_rss_kb']:>10} KB peak RSS")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=4, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found, run with --update-baseline first.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, metric, expected, value in regressions:
+        print(f"REGRESSION {name} {metric}: baseline {expected}, now {value}")
+    if not regressions:
+        print("No regressions against the baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
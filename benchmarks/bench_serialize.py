@@ -0,0 +1,78 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.engine.output import save_articles_to_file
+from src.engine.records import Article
+from src.engine.serialize import available_serializers
+
+WORDS = (
+    "energia atom reaktor rząd minister projekt elektrownia budowa decyzja "
+    "parlament eksperci bezpieczeństwo kraj rozmowy miliardy plan"
+).split()
+
+
+def make_articles(count, paragraphs=8, seed=0):
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        body = "".join(" ".join(rng.choice(WORDS) for _ in range(40)) + ".\n" for _ in range(paragraphs))
+        articles.append(Article(
+            "Poland", "Polish", "onet.pl", f"https://wiadomosci.onet.pl/kraj/artykul-{i}/abc{i}",
+            title=" ".join(rng.choice(WORDS) for _ in range(8)), date="13-05-2024", article_body=body,
+        ))
+    return articles
+
+
+def legacy_dump(articles, output_file):
+    # What the scrapers did before: one json.dump of the whole list of dicts
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump([article.to_dict() for article in articles], f, ensure_ascii=False, indent=4)
+
+
+def timed(function, output_file):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function(output_file)
+    return time.perf_counter() - started, os.path.getsize(output_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON serializers on a large synthetic output file.")
+    parser.add_argument("--articles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles)
+    cases = {"legacy json.dump": lambda path: legacy_dump(articles, path)}
+    for name in available_serializers():
+        for compact in (False, True):
+            label = f"{name} {'compact' if compact else 'pretty'}"
+            cases[label] = lambda path, name=name, compact=compact: save_articles_to_file(
+                articles, path, compact=compact, serializer=name
+            )
+
+    print(f"Serializing {args.articles} articles")
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = None
+        for label, function in cases.items():
+            output_file = os.path.join(tmp, "output.json")
+            seconds, size = timed(function, output_file)
+            with open(output_file, "rb") as f:
+                data = f.read()
+            if label.endswith("pretty") or label.startswith("legacy"):
+                reference = reference or data
+                same = "same bytes as legacy" if data == reference else "DIFFERENT bytes from legacy"
+            else:
+                same = ""
+            print(f"{label:20} {seconds:>8.2f}s {size / 1e6:>10.1f} MB  {args.articles / seconds:>12.0f} articles/s  {same}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
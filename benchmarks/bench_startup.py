@@ -0,0 +1,79 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Import cost of main.py and of each scraper module, measured in a fresh
+# interpreter with `python -X importtime` so nothing is cached between runs.
+
+MODULES = [
+    "main",
+    "src.scrapers.onet_pl_scraper",
+    "src.scrapers.pravda_ua_scraper",
+    "src.scrapers.blikk_hu_scraper",
+    "src.scrapers.aktualne_cz_scraper",
+    "src.scrapers.iz_ru_scraper",
+    "src.scrapers.aktuality_sk_scraper",
+]
+
+
+def import_times(module):
+    """Returns (total microseconds, [(dependency, microseconds)]) for one fresh import of module.
+
+    Dependencies are the top-level packages imported while importing
+    `module`, not the ones the interpreter loads at startup (site, encodings, ...).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    lines = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            lines.append((name.strip(), int(cumulative), len(name) - len(name.lstrip())))
+
+    # -X importtime prints a module after everything it imported, indented
+    # two more spaces per level
+    for index, (name, total, depth) in enumerate(lines):
+        if name == module:
+            break
+    else:
+        return 0, []
+    dependencies = []
+    for dependency, cumulative, dependency_depth in reversed(lines[:index]):
+        if dependency_depth <= depth:
+            break
+        if "." not in dependency:
+            dependencies.append((dependency, cumulative))
+    return total, dependencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup (import) time of main.py and the scraper modules.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest dependencies to list per module")
+    parser.add_argument("--max-main-ms", type=float, default=50.0, help="fail when importing main.py takes longer")
+    args = parser.parse_args()
+
+    main_ms = None
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(args.runs)]
+        total_ms = statistics.median(total for total, _ in runs) / 1000
+        print(f"{module:40} {total_ms:>8.1f} ms")
+        slowest = sorted(runs[-1][1], key=lambda item: item[1], reverse=True)
+        for name, us in slowest[:args.top]:
+            print(f"    {name:36} {us / 1000:>8.1f} ms")
+        if module == "main":
+            main_ms = total_ms
+
+    if main_ms > args.max_main_ms:
+        print(f"Importing main.py took {main_ms:.1f} ms, over the {args.max_main_ms} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import argparse
+import importlib
+import sys
+import time
+
+import soupsieve
+
+from benchmarks.bench_parsers import CASES
+from benchmarks.offline import load_fixture
+from src.engine.extractor import HEADINGS, compile_spec
+from src.engine.source import make_soup
+from src.engine.text import assemble_text
+
+# Body selectors as they were before src.engine.text, where they differ
+LEGACY_BODY = {
+    "src.scrapers.blikk_hu_scraper": "article.space-y-6, article.space-y-6 div.promotion_frame",
+}
+
+
+def legacy_assemble(extractor, containers, elements):
+    # What every extractor did before: each matching element of each
+    # container, nested ones included, appended one by one
+    parts = []
+    for container in containers:
+        for element in elements.select(container):
+            if extractor.bare_only and element.attrs:
+                continue
+            text = element.get_text(strip=True)
+            if extractor.skip_empty and not text:
+                continue
+            template = extractor.heading if element.name[0] == "h" else extractor.paragraph
+            parts.append(template.format(text))
+    return "".join(parts)
+
+
+def article_cases():
+    # Every article fixture of the parser benchmark, with the extractor its URL uses
+    for name, (module_name, function_name, args, routes) in CASES.items():
+        if "collect_links" in function_name:
+            continue
+        module = importlib.import_module(module_name)
+        url = args[0]
+        compiled = compile_spec(module.SPEC)
+        extractor = compiled.article
+        for match, variant in compiled.article_variants:
+            if match in url:
+                extractor = variant
+                break
+        legacy_body = extractor.body
+        if module_name in LEGACY_BODY:
+            legacy_body = soupsieve.compile(LEGACY_BODY[module_name])
+        elements = soupsieve.compile(module.SPEC["article"].get("elements", HEADINGS))
+        # Containers are selected up front; only the assembly is timed
+        soup = make_soup(load_fixture(routes[url]))
+        yield name, extractor, extractor.body.select(soup), legacy_body.select(soup), elements
+
+
+def timed(function, min_time, rounds=5):
+    # Best of several rounds, the machine being shared with other work
+    best = None
+    for _ in range(rounds):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            result = function()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time / rounds:
+                break
+        best = min(best or elapsed / calls, elapsed / calls)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the old and the shared article body assembly on the fixtures.")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per case")
+    args = parser.parse_args()
+
+    variants = {
+        "shared": {},
+        "shared+nfc+collapse": {"unicode_form": "NFC", "collapse_whitespace": True},
+    }
+    totals = {"legacy": [0.0, 0]}
+    totals.update({label: [0.0, 0] for label in variants})
+
+    print(f"{'case':42} {'variant':22} {'us/article':>10} {'body bytes':>11}")
+    for name, extractor, containers, legacy_containers, elements in article_cases():
+        text, seconds = timed(lambda: legacy_assemble(extractor, legacy_containers, elements), args.min_time)
+        results = {"legacy": (seconds, len(text.encode("utf-8")))}
+        for label, options in variants.items():
+            text, seconds = timed(lambda: "".join(assemble_text(
+                containers, extractor.elements, extractor.paragraph, extractor.heading,
+                extractor.bare_only, extractor.skip_empty, **options,
+            )), args.min_time)
+            results[label] = (seconds, len(text.encode("utf-8")))
+        for label, (seconds, size) in results.items():
+            totals[label][0] += seconds
+            totals[label][1] += size
+            print(f"{name:42} {label:22} {seconds * 1e6:>10.0f} {size:>11}")
+
+    print()
+    for label, (seconds, size) in totals.items():
+        print(f"{'total':42} {label:22} {seconds * 1e6:>10.0f} {size:>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
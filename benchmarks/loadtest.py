@@ -0,0 +1,130 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from urllib.request import urlopen
+
+from benchmarks.mock_news_server import DEFAULT_CONFIG, site_urls, start_server
+
+SOURCES = {
+    "onet_pl": ("src.scrapers.onet_pl_scraper", "by_date"),
+    "pravda_ua": ("src.scrapers.pravda_ua_scraper", "by_date"),
+    "blikk_hu": ("src.scrapers.blikk_hu_scraper", "by_date"),
+    "aktualne_cz": ("src.scrapers.aktualne_cz_scraper", "by_query"),
+    "iz_ru": ("src.scrapers.iz_ru_scraper", "by_query"),
+    "aktuality_sk": ("src.scrapers.aktuality_sk_scraper", "by_query"),
+}
+FIRST_DAY = date(2024, 5, 1)
+
+
+def _serve(config, ready):
+    server, site = start_server(config)
+    ready.put(site.base_url)
+    while True:
+        time.sleep(3600)
+
+
+def _run_worker(source, base_url, units, workers, backend, results):
+    module_name, mode = SOURCES[source]
+    module = importlib.import_module(module_name)
+    module.SPEC["base_url"] = site_urls(base_url)[module_name]
+
+    # Each worker writes its output into its own temporary directory
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        output_file = os.path.join(tmp, "output.json")
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if mode == "by_date":
+                module.run_scraper(units[0], units[-1], output_file, workers=workers, backend=backend)
+            else:
+                module.run_scraper(units, output_file, workers=workers, backend=backend)
+        elapsed = time.perf_counter() - started
+        articles = 0
+        if os.path.exists(output_file):
+            with open(output_file, "r", encoding="utf-8") as f:
+                articles = len(json.load(f))
+    results.put((articles, elapsed))
+
+
+def split_units(mode, units, processes):
+    # Days or queries are handed out in contiguous chunks, one chunk per process
+    if mode == "by_date":
+        all_units = [FIRST_DAY + timedelta(days=i) for i in range(units)]
+    else:
+        all_units = [f"query{i}" for i in range(units)]
+    size = -(-len(all_units) // processes)
+    return [all_units[i:i + size] for i in range(0, len(all_units), size)]
+
+
+def run_load_test(source, units, processes, config, workers=1, backend="threads"):
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    server = context.Process(target=_serve, args=(config, ready), daemon=True)
+    server.start()
+    base_url = ready.get()
+
+    try:
+        results = context.Queue()
+        processes_started = [
+            context.Process(target=_run_worker, args=(source, base_url, chunk, workers, backend, results))
+            for chunk in split_units(SOURCES[source][1], units, processes)
+        ]
+        started = time.perf_counter()
+        for process in processes_started:
+            process.start()
+        outcomes = [results.get() for _ in processes_started]
+        for process in processes_started:
+            process.join()
+        wall = time.perf_counter() - started
+
+        with urlopen(f"{base_url}/__stats") as response:
+            stats = json.load(response)
+    finally:
+        server.terminate()
+
+    articles = sum(count for count, _ in outcomes)
+    return {
+        "source": source,
+        "processes": len(processes_started),
+        "articles": articles,
+        "wall_seconds": round(wall, 2),
+        "articles_per_sec": round(articles / wall, 2) if wall else 0.0,
+        "server": stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test run_scraper against the local mock news server.")
+    parser.add_argument("source", choices=sorted(SOURCES))
+    parser.add_argument("--units", type=int, default=4, help="days (by_date) or queries (by_query) to scrape")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1], help="process counts to compare, e.g. 1 2 4")
+    parser.add_argument("--workers", type=int, default=1, help="article fetches in flight per process")
+    parser.add_argument("--backend", nargs="+", choices=["threads", "async"], default=["threads"],
+                        help="fetch backends to compare")
+    for name, value in DEFAULT_CONFIG.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    config = {name: getattr(args, name) for name in DEFAULT_CONFIG}
+    for backend in args.backend:
+        for processes in args.processes:
+            result = run_load_test(args.source, args.units, processes, config, args.workers, backend)
+            print(
+                f"{result['source']:14} {backend:8} processes={result['processes']:<3} workers={args.workers:<3} "
+                f"articles={result['articles']:<6} "
+                f"wall={result['wall_seconds']:>8}s  {result['articles_per_sec']:>8} articles/s  "
+                f"responses={result['server']['by_status']}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
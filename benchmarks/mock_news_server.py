@@ -0,0 +1,311 @@
+import argparse
+import hashlib
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Local stand-in for the six news sites. Every site lives under its own path
+# prefix and serves archive, search and article pages with the markup the
+# matching scraper in src/scrapers/ expects.
+
+WORDS = (
+    "energia atom reaktor rząd minister projekt elektrownia budowa decyzja "
+    "parlament eksperci bezpieczeństwo kraj rozmowy miliardy plan"
+).split()
+
+PRAVDA_VARIANTS = (
+    ("www.pravda.com.ua", "post_title", "post_text"),
+    ("life.pravda.com.ua", "post_article_title", "post_article_text"),
+    ("epravda.com.ua", "post_article_title", "post_article_body"),
+    ("eurointegration.com.ua", "post__title", "post__text"),
+)
+
+DEFAULT_CONFIG = {
+    "latency": 0.0,          # seconds added to every response
+    "jitter": 0.0,           # random extra latency, 0..jitter seconds
+    "error_rate": 0.0,       # share of responses answered with 500
+    "rate_limit_rate": 0.0,  # share of responses answered with 429
+    "retry_after": 1,        # Retry-After header sent with 429
+    "links_per_page": 20,    # article links on an archive or search page
+    "pages": 1,              # archive pages per day (blikk) and search pages per query
+    "paragraphs": 12,        # paragraphs per article
+    "stall_rate": 0.0,       # share of responses whose body trickles out slowly
+    "stall_seconds": 30.0,   # time a stalled body takes to arrive in full
+}
+
+
+def _sentence(rng, words=12):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return html.escape(text.capitalize() + ".")
+
+
+def _page(title, body):
+    return (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title></head>"
+        f"<body><header><nav><a href=\"/\">Home</a></nav></header><main>{body}</main>"
+        "<footer><a href=\"/contact\">Contact</a></footer></body></html>"
+    )
+
+
+class MockNewsSite:
+    def __init__(self, config=None):
+        self.config = dict(DEFAULT_CONFIG)
+        self.config.update(config or {})
+        self.base_url = ""
+        self.stats = {"requests": 0, "by_status": {}, "by_site": {}}
+        self._lock = threading.Lock()
+
+    def _record(self, site, status):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["by_status"][str(status)] = self.stats["by_status"].get(str(status), 0) + 1
+            self.stats["by_site"][site] = self.stats["by_site"].get(site, 0) + 1
+
+    def respond(self, path, query, request_headers=None):
+        """Returns (status, headers, body) for one GET request."""
+        site = path.strip("/").split("/", 1)[0]
+        if site == "__stats":
+            return 200, {"Content-Type": "application/json"}, json.dumps(self.stats).encode("utf-8")
+
+        delay = self.config["latency"] + random.uniform(0, self.config["jitter"])
+        if delay:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < self.config["rate_limit_rate"]:
+            self._record(site, 429)
+            return 429, {"Retry-After": str(self.config["retry_after"])}, b"Too Many Requests"
+        if roll < self.config["rate_limit_rate"] + self.config["error_rate"]:
+            self._record(site, 500)
+            return 500, {}, b"Internal Server Error"
+
+        handler = getattr(self, f"_{site}", None)
+        body = handler(path, query) if handler else None
+        if body is None:
+            self._record(site, 404)
+            return 404, {}, b"Not Found"
+        body = body.encode("utf-8")
+        # Pages are generated from their path, so the ETag is stable until
+        # the config changes (e.g. links_per_page, to publish new articles)
+        etag = '"' + hashlib.md5(body).hexdigest()[:16] + '"'
+        if request_headers is not None and request_headers.get("If-None-Match") == etag:
+            self._record(site, 304)
+            return 304, {"ETag": etag}, b""
+        self._record(site, 200)
+        return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": etag}, body
+
+    def _links(self, site, key):
+        return [f"{self.base_url}/{site}/article/{key}-{i}" for i in range(self.config["links_per_page"])]
+
+    def _paragraphs(self, rng, heading="h2"):
+        parts = []
+        for i in range(self.config["paragraphs"]):
+            if i % 4 == 3:
+                parts.append(f"<{heading}>{_sentence(rng, 5)}</{heading}>")
+            parts.append(f"<p>{' '.join(_sentence(rng) for _ in range(3))}</p>")
+        return "".join(parts)
+
+    # onet.pl
+
+    def _onet(self, path, query):
+        parts = path.strip("/").split("/")
+        rng = random.Random(path)
+        if len(parts) == 3 and parts[1] == "archiwum":
+            items = "".join(f'<a class="itemTitle" href="{url}">{_sentence(rng, 6)}</a>' for url in self._links("onet", parts[2]))
+            return _page("Archiwum", f'<div class="archive">{items}</div>')
+        if len(parts) == 3 and parts[1] == "article":
+            paragraphs = "".join(f'<p class="hyphenate narrow">{_sentence(rng)}</p>' for _ in range(self.config["paragraphs"]))
+            return _page("Onet", f'<h1 class="mainTitle">{_sentence(rng, 8)}</h1><div id="lead">{_sentence(rng)}</div><div id="detail">{paragraphs}</div>')
+        return None
+
+    # pravda.com.ua, with its subdomains folded into the path
+
+    def _pravda(self, path, query):
+        parts = path.strip("/").split("/")
+        rng = random.Random(path)
+        if len(parts) == 3 and parts[1] == "archives":
+            date_key = parts[2].replace("date_", "")
+            items = []
+            for i in range(self.config["links_per_page"]):
+                host = PRAVDA_VARIANTS[i % len(PRAVDA_VARIANTS)][0]
+                url = f"{self.base_url}/pravda/{host}/article/{date_key}-{i}"
+                items.append(f'<div class="article article_list"><a href="{url}">{_sentence(rng, 6)}</a></div>')
+            return _page("Архів", "".join(items))
+        if len(parts) == 4 and parts[2] == "article":
+            for host, title_class, body_class in PRAVDA_VARIANTS:
+                if parts[1] == host:
+                    return _page("Pravda", f'<h1 class="{title_class}">{_sentence(rng, 8)}</h1><div class="{body_class}">{self._paragraphs(rng)}</div>')
+        return None
+
+    # blikk.hu
+
+    def _blikk(self, path, query):
+        parts = path.strip("/").split("/")
+        rng = random.Random(path + repr(sorted(query.items())))
+        if parts[1:] == ["archivum", "online"]:
+            page = int(query.get("page", ["0"])[0])
+            if page >= self.config["pages"]:
+                return _page("Archívum", "<p>Nincs találat</p>")
+            key = f"{query.get('date', [''])[0]}-{page}"
+            items = "".join(
+                f'<li class="pb-3 md:pb-4 border-b border-b-gray-400"><a href="{url}">{_sentence(rng, 6)}</a></li>'
+                for url in self._links("blikk", key)
+            )
+            return _page("Archívum", f'<ul class="flex flex-col gap-4">{items}</ul>')
+        if len(parts) == 3 and parts[1] == "article":
+            return _page("Blikk", f'<section class="title"><h1>{_sentence(rng, 8)}</h1></section><article class="space-y-6">{self._paragraphs(rng)}</article>')
+        return None
+
+    # aktualne.cz
+
+    def _aktualne(self, path, query):
+        parts = path.strip("/").split("/")
+        rng = random.Random(path + repr(sorted(query.items())))
+        if parts[1:] == ["hledani"]:
+            offset = int(query.get("offset", ["0"])[0])
+            if offset // 20 >= self.config["pages"]:
+                return _page("Hledání", "")
+            key = f"{query.get('query', [''])[0]}-{offset}"
+            items = "".join(f'<div class="timeline"><a href="{url}">{_sentence(rng, 6)}</a></div>' for url in self._links("aktualne", key))
+            return _page("Hledání", items)
+        if len(parts) == 3 and parts[1] == "article":
+            paragraphs = "".join(f"<p>{_sentence(rng)}</p>" for _ in range(self.config["paragraphs"]))
+            return _page("Aktuálně", (
+                f'<h1 class="article-title">{_sentence(rng, 8)}</h1><div class="author__date">13. 5. 2025 14:32</div>'
+                f'<div class="article__perex">{_sentence(rng)}</div><div class="article__content">{paragraphs}</div>'
+            ))
+        return None
+
+    # iz.ru
+
+    def _iz(self, path, query):
+        parts = path.strip("/").split("/")
+        rng = random.Random(path + repr(sorted(query.items())))
+        if parts[1:] == ["search"]:
+            offset = int(query.get("from", ["0"])[0])
+            if offset // 10 >= self.config["pages"]:
+                return _page("Поиск", "")
+            key = f"{query.get('text', [''])[0]}-{offset}"
+            items = "".join(f'<div class="view-search__title"><a href="{url}">{_sentence(rng, 6)}</a></div>' for url in self._links("iz", key))
+            return _page("Поиск", items)
+        if len(parts) == 3 and parts[1] == "article":
+            return _page("Известия", (
+                f'<h1 itemprop="headline">{_sentence(rng, 8)}</h1><time datetime="2022-02-21T18:45:00Z">21.02.2022</time>'
+                f'<div itemprop="articleBody">{self._paragraphs(rng, "h3")}</div>'
+            ))
+        return None
+
+    # aktuality.sk
+
+    def _aktuality(self, path, query):
+        parts = path.strip("/").split("/")
+        rng = random.Random(path + repr(sorted(query.items())))
+        if len(parts) == 3 and parts[1] == "vyhladavanie":
+            page = int(parts[2])
+            if page > self.config["pages"]:
+                return _page("Vyhľadávanie", "")
+            key = f"{query.get('search[text]', [''])[0]}-{page}"
+            items = "".join(
+                f'<li class="article-item"><a class="article-image" href="{url}"></a><span class="article-time">13.05.2025 10:15</span></li>'
+                for url in self._links("aktuality", key)
+            )
+            return _page("Vyhľadávanie", f"<ul>{items}</ul>")
+        if len(parts) == 3 and parts[1] == "article":
+            return _page("Aktuality", (
+                f'<h1 itemprop="headline">{_sentence(rng, 8)}</h1>'
+                f'<div id="perex-id"><span itemprop="description">{_sentence(rng)}</span></div>'
+                f'<div itemprop="articleBody">{self._paragraphs(rng)}</div>'
+            ))
+        return None
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; without this, keep-alive
+        # clients stall on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            status, headers, body = site.respond(
+                parts.path, parse_qs(parts.query, keep_blank_values=True), self.headers
+            )
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if status == 200 and random.random() < site.config["stall_rate"]:
+                # A server that keeps the connection alive a few bytes at a
+                # time never trips a per-read timeout
+                chunks = max(1, int(site.config["stall_seconds"] * 10))
+                size = -(-len(body) // chunks)
+                try:
+                    for i in range(0, len(body), size):
+                        self.wfile.write(body[i:i + size])
+                        time.sleep(0.1)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+                return
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class MockServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops connections when an event loop opens
+    # hundreds at once, which would measure the server rather than the client
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def start_server(config=None, host="127.0.0.1", port=0):
+    """Starts the mock server on a background thread and returns (server, site)."""
+    site = MockNewsSite(config)
+    server = MockServer((host, port), make_handler(site))
+    site.base_url = f"http://{host}:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, site
+
+
+def site_urls(base_url):
+    # SPEC base URL to override so each scraper talks to the mock server
+    return {
+        "src.scrapers.onet_pl_scraper": f"{base_url}/onet/",
+        "src.scrapers.pravda_ua_scraper": f"{base_url}/pravda/",
+        "src.scrapers.blikk_hu_scraper": f"{base_url}/blikk/",
+        "src.scrapers.aktualne_cz_scraper": f"{base_url}/aktualne",
+        "src.scrapers.iz_ru_scraper": f"{base_url}/iz/",
+        "src.scrapers.aktuality_sk_scraper": f"{base_url}/aktuality",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic news pages for load testing the scrapers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    for name, value in DEFAULT_CONFIG.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    config = {name: getattr(args, name) for name in DEFAULT_CONFIG}
+    server, site = start_server(config, args.host, args.port)
+    print(f"Mock news server running on {site.base_url} (stats at {site.base_url}/__stats)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
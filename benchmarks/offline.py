@@ -0,0 +1,66 @@
+import os
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def _prepare_url(url):
+    return requests.Request("GET", url).prepare().url
+
+
+def _build_response(request, status, content):
+    response = requests.Response()
+    response.status_code = status
+    response.url = request.url
+    response.request = request
+    response.reason = "OK" if status == 200 else "Not Found"
+    response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response.headers["Content-Length"] = str(len(content))
+    response._content = content
+    response._content_consumed = True
+    response.encoding = "utf-8"
+    return response
+
+
+class FixtureRouter:
+    """Answers every request made through `requests` from the fixture corpus.
+
+    Unknown URLs get a 404, so nothing can ever leave the machine while a
+    benchmark is running.
+    """
+
+    def __init__(self, routes):
+        self.routes = {}
+        self.fetches = 0
+        for url, fixture in routes.items():
+            self.routes[_prepare_url(url)] = load_fixture(fixture)
+
+    def send(self, request):
+        self.fetches += 1
+        content = self.routes.get(request.url)
+        if content is None:
+            return _build_response(request, 404, b"")
+        return _build_response(request, 200, content)
+
+
+@contextmanager
+def serve_fixtures(routes):
+    router = FixtureRouter(routes)
+    original_send = HTTPAdapter.send
+
+    def send(adapter, request, **kwargs):
+        return router.send(request)
+
+    HTTPAdapter.send = send
+    try:
+        yield router
+    finally:
+        HTTPAdapter.send = original_send
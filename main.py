@@ -1,39 +1,46 @@
-from src.scrapers.aktualne_cz_scraper import run_scraper as run_cz_scraper
-from src.scrapers.iz_ru_scraper import run_scraper as run_iz_ru_scraper
-from src.scrapers.aktuality_sk_scraper import run_scraper as run_aktuality_sk_scraper
-from src.scrapers.pravda_ua_scraper import run_scraper
-from src.scrapers.blikk_hu_scraper import run_scraper as run_blikk_hu_scraper
-from src.scrapers.onet_pl_scraper import run_scraper as run_onet_pl_scraper
+import argparse
 from datetime import datetime
-from src.utils.deduplication import remove_duplicates_from_file
-
-
-# You can expand this dictionary with more countries and scrapers
-SCRAPER_OPTIONS = {
-    "Czech Republic": {
-        "aktualne.cz": {"function": run_cz_scraper, "mode": "by_query"}
-    },
-    "Russia": {
-        "iz.ru": {"function": run_iz_ru_scraper, "mode": "by_query"}
-    },
-    "Ukraine": {
-        "pravda.ua": {"function": run_scraper, "mode": "by_date"}
-    },
-    "Slovakia": {
-        "aktuality.sk": {"function": run_aktuality_sk_scraper, "mode": "by_query"}
-    },
-    "Hungary": {
-        "blikk.hu": {"function": run_blikk_hu_scraper, "mode": "by_date"}
-    },
-    "Poland": {
-        "onet.pl": {"function": run_onet_pl_scraper, "mode": "by_date"}
-    }
-}
-
-
-def select_country():
+
+from src.engine.registry import available_sources, get_source
+
+# Every run also adds its articles here, see src/engine/segments.py
+SEGMENTS_DIR = "data/segments"
+# and updates the corpus statistics, see src/engine/stats.py
+STATS_DIR = "data/stats"
+# With --keywords, articles are tagged with the keywords in this file (or the
+# one given) and the tags are indexed in TAG_INDEX, see src/engine/keywords.py
+KEYWORDS_FILE = "keywords.json"
+TAG_INDEX = "data/tags.sqlite"
+# Circuit breakers that pause a source whose pages stop yielding articles, see
+# src/engine/health.py
+HEALTH_FILE = "data/health.json"
+
+# Scrapers come from the registry in src/engine/registry.py (built-in ones and
+# plugins installed as entry points). Nothing heavy is imported until a
+# scraper has been picked.
+
+
+def tagging_options(keywords):
+    if not keywords:
+        return {}
+    return {"keywords": keywords, "tag_index": TAG_INDEX}
+
+
+def output_path(key):
+    return f"data/raw/{key}_output.json"
+
+
+def scraper_options():
+    # {country: {label: key}}, for the menus
+    options = {}
+    for key, entry in available_sources().items():
+        options.setdefault(entry["country"], {})[entry["label"]] = key
+    return options
+
+
+def select_country(options):
     print("Select a country:")
-    countries = list(SCRAPER_OPTIONS.keys())
+    countries = list(options.keys())
     for i, country in enumerate(countries, 1):
         print(f"{i}. {country}")
     choice = input("Enter number: ")
@@ -44,14 +51,14 @@ def select_country():
         return None
 
 
-def select_source(country):
+def select_source(options, country):
     print(f"Select a news source for {country}:")
-    sources = list(SCRAPER_OPTIONS[country].keys())
+    sources = list(options[country].keys())
     for i, source in enumerate(sources, 1):
         print(f"{i}. {source}")
     choice = input("Enter number: ")
     try:
-        return sources[int(choice) - 1]
+        return options[country][sources[int(choice) - 1]]
     except (IndexError, ValueError):
         print("Invalid selection.")
         return None
@@ -79,41 +86,107 @@ def get_date_range():
     return start_date, end_date
 
 
-def main():
+def get_optional_date_range():
+    choice = input("Limit the results to a date range? (y/n): ").strip().lower()
+    return get_date_range() if choice == "y" else (None, None)
+
+
+def interactive(keywords=None):
     print("Article Scraper has just started!")
 
-    country = select_country()
+    options = scraper_options()
+    country = select_country(options)
     if not country:
         return
 
-    source = select_source(country)
-    if not source:
+    key = select_source(options, country)
+    if not key:
         return
 
-    scraper_info = SCRAPER_OPTIONS[country][source]
-    scraper_function = scraper_info["function"]
-    scraper_mode = scraper_info["mode"]
+    source = get_source(key)
+    output_file = output_path(key)
 
-    output_file = f"data/raw/{source.replace('.', '_')}_output.json"
-
-    if scraper_mode == "by_date":
-        start_date, end_date = get_date_range()
-        scraper_function(start_date, end_date, output_file)
-    else:
+    start_date = end_date = queries = None
+    if source.supports_query:
         queries = get_queries()
         if not queries:
             print("No queries provided.")
             return
-        scraper_function(queries, output_file)
+    if source.mode == "by_date":
+        start_date, end_date = get_date_range()
+    elif source.supports_date:
+        start_date, end_date = get_optional_date_range()
+
+    from src.engine.runner import run_source
+
+    units = source.make_units(start_date, end_date, queries)
+    run_source(
+        source, units, output_file, segments=SEGMENTS_DIR, stats=STATS_DIR, start_date=start_date, end_date=end_date,
+        health=HEALTH_FILE, **tagging_options(keywords),
+    )
 
     print(f"Results saved to {output_file}")
 
     # Now ask if duplicates should be removed
     choice = input("Do you want to remove duplicate entries by 'url'? (y/n): ").strip().lower()
     if choice == "y":
+        from src.utils.deduplication import remove_duplicates_from_file
+
         remove_duplicates_from_file(output_file)
         print("Done")
 
 
+def batch(args):
+    # Non-interactive run of any number of sources, e.g. from cron
+    from src.engine.runner import run_sources
+
+    queries = [q.strip() for q in (args.queries or "").split(",") if q.strip()]
+    jobs = []
+    for key in args.sources:
+        source = get_source(key)
+        if source.mode == "by_date" and not (args.start and args.end):
+            print(f"{key} needs --start and --end, skipping it")
+            continue
+        if source.supports_query and not queries:
+            print(f"{key} needs --queries, skipping it")
+            continue
+        jobs.append({
+            "source": source,
+            "units": source.make_units(args.start, args.end, queries),
+            "output_file": output_path(key),
+            "options": {
+                "workers": args.workers, "segments": SEGMENTS_DIR, "stats": STATS_DIR, "health": HEALTH_FILE,
+                "backend": args.backend, "start_date": args.start, "end_date": args.end, **tagging_options(args.keywords),
+            },
+        })
+    run_sources(jobs, parallel=args.parallel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape news articles. Without --sources, asks interactively.")
+    parser.add_argument("--sources", nargs="+", help="registry keys, e.g. onet_pl iz_ru")
+    parser.add_argument("--list", action="store_true", help="list available scrapers and exit")
+    parser.add_argument("--start", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
+                        help="YYYY-MM-DD; for query sources, the earliest article date where supported")
+    parser.add_argument("--end", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
+                        help="YYYY-MM-DD; for query sources, the latest article date where supported")
+    parser.add_argument("--queries", help="comma-separated search queries")
+    parser.add_argument("--workers", type=int, default=1, help="article fetch threads per source")
+    parser.add_argument("--parallel", type=int, default=4, help="sources scraped at the same time")
+    parser.add_argument("--backend", choices=["threads", "async", "aiohttp", "httpx"], default="threads",
+                        help="fetch articles on threads or on an event loop (needs aiohttp or httpx)")
+    parser.add_argument("--keywords", nargs="?", const=KEYWORDS_FILE, metavar="FILE",
+                        help=f"tag articles with the keywords in FILE (default {KEYWORDS_FILE})")
+    args = parser.parse_args()
+
+    if args.list:
+        for key, entry in sorted(available_sources().items()):
+            print(f"{key:15} {entry['label']:15} {entry['country']:15} {entry['mode']}")
+    elif args.sources:
+        batch(args)
+    else:
+        interactive(args.keywords)
+
+
 if __name__ == "__main__":
     main()
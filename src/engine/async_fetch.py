@@ -0,0 +1,130 @@
+import asyncio
+import importlib.util
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.engine.fetch import (
+    CHUNK_SIZE, DEFAULT_BACKOFF, DEFAULT_MAX_BYTES, DEFAULT_RETRIES, DEFAULT_TIMEOUT, HTML_TYPES, DeadlineExceeded,
+    ResponseTooLarge, check_headers, describe_error, is_transient, retry_delay,
+)
+
+try:
+    import httpx
+except ImportError:  # optional, see README
+    httpx = None
+
+try:
+    import aiohttp
+except ImportError:  # optional, see README
+    aiohttp = None
+
+# Asyncio counterpart of src.engine.fetch, for runs with thousands of article
+# fetches in flight. It uses aiohttp or httpx (the one to pick for HTTP/2,
+# which it speaks when the h2 package is installed), caps the number of open
+# requests per host, and raises the same exceptions as the synchronous path,
+# so retries, dead letters and error summaries work unchanged.
+
+PER_HOST_LIMIT = 8
+
+
+def available_backends():
+    return [name for name, module in (("aiohttp", aiohttp), ("httpx", httpx)) if module is not None]
+
+
+def _error_response(url, status, headers):
+    # Lets http_status(), retry_delay() and describe_error() read async errors
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    return response
+
+
+class AsyncFetcher:
+    """Downloads pages on the running event loop; use as `async with AsyncFetcher() as fetcher`."""
+
+    def __init__(self, backend="auto", per_host=PER_HOST_LIMIT):
+        if backend == "auto":
+            backends = available_backends()
+            if not backends:
+                raise ImportError("The async fetch backend needs httpx or aiohttp installed")
+            backend = backends[0]
+        self.backend = backend
+        self.per_host = per_host
+        self._hosts = {}
+        self._client = None
+
+    async def __aenter__(self):
+        if self.backend == "httpx":
+            http2 = importlib.util.find_spec("h2") is not None
+            limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+            self._client = httpx.AsyncClient(http2=http2, limits=limits, follow_redirects=True, timeout=None)
+        else:
+            connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.per_host)
+            self._client = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.backend == "httpx":
+            await self._client.aclose()
+        else:
+            await self._client.close()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def _download(self, url, headers, max_bytes, content_types):
+        if self.backend == "httpx":
+            async with self._client.stream("GET", url, headers=headers) as response:
+                status, chunks = response.status_code, response.aiter_bytes(CHUNK_SIZE)
+                return await self._read(url, status, response, chunks, max_bytes, content_types)
+        async with self._client.get(url, headers=headers) as response:
+            status, chunks = response.status, response.content.iter_chunked(CHUNK_SIZE)
+            return await self._read(url, status, response, chunks, max_bytes, content_types)
+
+    async def _read(self, url, status, response, chunks, max_bytes, content_types):
+        if status >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{status} Error for url: {url}", response=_error_response(url, status, response.headers)
+            )
+        check_headers(response, url, max_bytes, content_types)
+        body = bytearray()
+        async for chunk in chunks:
+            body += chunk
+            if max_bytes and len(body) > max_bytes:
+                raise ResponseTooLarge(f"Response larger than {max_bytes} bytes: {url}")
+        return bytes(body)
+
+    async def fetch(self, url, headers=None, timeout=DEFAULT_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES,
+                    content_types=HTML_TYPES):
+        """Same contract as src.engine.fetch.fetch(): `timeout` is a deadline for the whole request."""
+        async with self._host_slot(url):
+            try:
+                return await asyncio.wait_for(self._download(url, headers, max_bytes, content_types), timeout)
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"Deadline of {timeout}s exceeded for {url}") from None
+            except requests.exceptions.RequestException:
+                raise
+            except Exception as e:
+                if (httpx and isinstance(e, httpx.TransportError)) or (aiohttp and isinstance(e, aiohttp.ClientError)):
+                    raise requests.exceptions.ConnectionError(f"{type(e).__name__}: {e} ({url})") from e
+                raise
+
+    async def fetch_with_retry(self, url, headers=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                               backoff=DEFAULT_BACKOFF, max_bytes=DEFAULT_MAX_BYTES, content_types=HTML_TYPES):
+        attempt = 0
+        while True:
+            try:
+                return await self.fetch(url, headers, timeout, max_bytes, content_types)
+            except requests.exceptions.RequestException as e:
+                if attempt >= retries or not is_transient(e):
+                    raise
+                delay = retry_delay(e, attempt, backoff)
+                print(f"{describe_error(e)} for {url}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
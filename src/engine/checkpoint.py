@@ -0,0 +1,43 @@
+import json
+import os
+import shutil
+
+from src.engine.output import save_articles_to_file
+from src.engine.records import Article
+
+# A run keeps every finished day or query in a checkpoint directory next to
+# its output file:
+#
+#   <output>.checkpoint/<source>_<unit>.json   articles of one finished unit
+#
+# The directory belongs to one output file, so runs writing different outputs
+# never share it. Re-running an interrupted run with the same output file
+# loads the finished units instead of scraping them again, and the directory
+# is removed once the output has been written.
+
+
+def checkpoint_dir(output_file):
+    return f"{output_file}.checkpoint"
+
+
+class Checkpoint:
+    def __init__(self, output_file):
+        self.path = checkpoint_dir(output_file)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, source, unit):
+        return os.path.join(self.path, f"{source.key}_{source.unit_key(unit)}.json")
+
+    def load(self, source, unit):
+        """Returns the articles of a finished unit, or None if it has not been scraped yet."""
+        path = self._file(source, unit)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return [Article.from_dict(article) for article in json.load(f)]
+
+    def save(self, source, unit, articles):
+        save_articles_to_file(articles, self._file(source, unit), compact=True)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
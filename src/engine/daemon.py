@@ -0,0 +1,321 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from src.engine.deadletter import DeadLetterStore, default_store
+from src.engine.fetch import cancel_all, reset_cancel
+from src.engine.health import HEALTH_FILE, OPEN, get_health
+from src.engine.runner import scrape_links
+from src.engine.segments import new_run_id, write_segment
+from src.engine.source import load_source
+
+# Continuous crawling. Every source gets its own loop that re-crawls, on its
+# own interval, the most recent days of its archive (by_date sources) or its
+# watched queries (by_query sources), and adds what is new to the segment
+# corpus:
+#
+#   python -m src.engine.daemon --config schedule.json
+#   python -m src.engine.daemon onet_pl iz_ru --queries "atom, uran" --interval 600
+#
+# Each tick is cheap: listing pages are requested with the ETag and
+# Last-Modified of the previous tick, so an unchanged page costs a 304 and no
+# parsing, and links are checked against the set of URLs already seen, so
+# only new articles are fetched. Both live in one SQLite file (CrawlState).
+# An article whose fetch fails is marked seen as well and goes to the
+# dead-letter store of its source (data/raw/<source>_output_failed.jsonl);
+# `python -m src.engine.deadletter retry <source> --segments data/segments`
+# adds the recovered articles to the corpus, see src.engine.deadletter.
+# With --revisions, new articles are tracked and, after every tick, the recent
+# ones are re-checked for edits, see src.engine.revisions.
+
+STATE_FILE = os.path.join("data", "crawl.sqlite")
+SEGMENTS_DIR = os.path.join("data", "segments")
+DEFAULT_INTERVAL = 900    # seconds between two ticks of a source
+DEFAULT_DAYS = 2          # by_date sources re-crawl today and the days before it
+SEEN_DAYS = 90            # seen URLs are forgotten after this many days
+IN_CLAUSE = 500           # URLs looked up per query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    source TEXT NOT NULL,  -- Source.key
+    url TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (source, url)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class CrawlState:
+    """Seen URLs and HTTP validators of listing pages, in a single SQLite file.
+
+    Validators of pages fetched by a thread are held back until that thread
+    calls mark_seen(), so a crash between fetching a listing page and
+    fetching its articles never leaves the page looking unchanged.
+    """
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+
+    def _db(self):
+        # One connection per thread; every source loop has its own thread
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=60)
+            self._local.pending = {}
+        return db
+
+    # Validators, see src.engine.fetch.fetch()
+
+    def request_headers(self, url):
+        row = self._db().execute("SELECT etag, last_modified FROM validators WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def store(self, url, response_headers):
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if etag or last_modified:
+            self._db()
+            self._local.pending[url] = (etag, last_modified)
+
+    # Seen URLs
+
+    def unseen(self, source_key, links):
+        """Returns the links whose URLs have not been seen for this source."""
+        urls = [link["url"] for link in links]
+        seen = set()
+        db = self._db()
+        for i in range(0, len(urls), IN_CLAUSE):
+            chunk = urls[i:i + IN_CLAUSE]
+            rows = db.execute(
+                f"SELECT url FROM seen WHERE source = ? AND url IN ({', '.join('?' * len(chunk))})",
+                (source_key, *chunk),
+            )
+            seen.update(url for url, in rows)
+        return [link for link in links if link["url"] not in seen]
+
+    def mark_seen(self, source_key, urls):
+        """Records urls as seen, together with the validators of the pages they were listed on."""
+        db = self._db()
+        now = time.time()
+        pending, self._local.pending = self._local.pending, {}
+        with db:
+            db.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?, ?)", [(source_key, url, now) for url in urls])
+            db.executemany(
+                "INSERT OR REPLACE INTO validators VALUES (?, ?, ?, ?)",
+                [(url, etag, last_modified, now) for url, (etag, last_modified) in pending.items()],
+            )
+
+    def prune(self, max_age_days=SEEN_DAYS):
+        cutoff = time.time() - max_age_days * 86400
+        db = self._db()
+        with db:
+            removed = db.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,)).rowcount
+            db.execute("DELETE FROM validators WHERE updated_at < ?", (cutoff,))
+        return removed
+
+    def counts(self):
+        return dict(self._db().execute("SELECT source, COUNT(*) FROM seen GROUP BY source ORDER BY source"))
+
+
+def tick_units(source, days=DEFAULT_DAYS, queries=None, today=None):
+    """Returns (units, start_date) for one tick: the last `days` days, or the queries with a window of those days."""
+    today = today or date.today()
+    first_day = today - timedelta(days=days - 1)
+    if source.mode == "by_date":
+        return source.make_units(first_day, today), None
+    return source.make_units(queries=queries), first_day if source.supports_date else None
+
+
+def tick(source, units, state, workers=1, backend="threads", segments=SEGMENTS_DIR, dead_letters=None,
+         start_date=None, matcher=None, index=None, stats=None, revisions=None):
+    """Scrapes the articles of `units` whose URLs were not seen before; returns how many were added."""
+    run_id = new_run_id()
+    added = 0
+    for unit in units:
+        links = state.unseen(source.key, source.collect_links(unit, start_date))
+        if links:
+            print(f"{len(links)} new links for {source.unit_label(unit)}")
+            articles = scrape_links(source, unit, links, workers, dead_letters, backend)
+            if get_health(source).state == OPEN:
+                # Nothing is kept or marked seen, the links are fetched again once the source works
+                break
+            if matcher:
+                matcher.tag_articles(articles)
+            if articles:
+                location = write_segment(segments, source, unit, articles, run_id)
+                if index:
+                    index.add(articles, location)
+                if revisions:
+                    from src.engine.revisions import track
+
+                    track(revisions, source, unit, articles)
+            added += len(articles)
+        state.mark_seen(source.key, [link["url"] for link in links])
+    if stats and added:
+        from src.engine.stats import update_stats
+
+        update_stats(stats, segments, source_key=source.key)
+    return added
+
+
+def crawl_loop(job, state, stop, options):
+    # Ticks one source until stop is set; a failed tick is reported and retried on the next one
+    source = job["source"]
+    source.validators = state
+    workers = options.get("workers", 1)
+    if source.max_concurrency:
+        workers = min(workers, source.max_concurrency)
+    dead_letters = DeadLetterStore(default_store(source.key))
+    health = get_health(source)
+    if options.get("health"):
+        from src.engine.health import restore, save
+
+        restore(health, options["health"])
+    while not stop.is_set():
+        started = time.monotonic()
+        if health.paused():
+            print(f"[{source.key}] paused by its circuit breaker: {health.reason}")
+            if job.get("once"):
+                return
+            stop.wait(job.get("interval", DEFAULT_INTERVAL))
+            continue
+        units, start_date = tick_units(source, job.get("days", DEFAULT_DAYS), job.get("queries"))
+        try:
+            added = tick(
+                source, units, state, workers, options.get("backend", "threads"),
+                options.get("segments", SEGMENTS_DIR), dead_letters, start_date, options.get("matcher"),
+                options.get("index"), options.get("stats"), options.get("revisions"),
+            )
+            print(f"[{source.key}] {added} new articles in {time.monotonic() - started:.1f}s")
+            if options.get("revisions") and health.state != OPEN:
+                from src.engine.revisions import CHECK_DAYS, check
+
+                # Each recent article at most once per interval
+                check(
+                    options["revisions"], source, options.get("recheck_days") or CHECK_DAYS,
+                    job.get("interval", DEFAULT_INTERVAL), workers, segments=options.get("segments", SEGMENTS_DIR),
+                )
+        except Exception as e:
+            print(f"[{source.key}] tick failed: {type(e).__name__}: {e}")
+        if options.get("health"):
+            save(health, options["health"])
+        if job.get("once"):
+            return
+        stop.wait(max(0.0, job.get("interval", DEFAULT_INTERVAL) - (time.monotonic() - started)))
+
+
+def crawl(jobs, state, once=False, **options):
+    """Runs every job's loop on its own thread until Ctrl+C (or one tick each with once=True).
+
+    Each job is {"source": Source, "interval": seconds, "days": n,
+    "queries": [...]}; options are workers, backend, segments, stats,
+    matcher and index (see src.engine.keywords), revisions (a
+    RevisionStore) with recheck_days (see src.engine.revisions), and health
+    (a JSON file keeping circuit breakers across restarts, see
+    src.engine.health).
+    """
+    stop = threading.Event()
+    reset_cancel()
+    state.prune()
+    threads = []
+    for job in jobs:
+        thread = threading.Thread(
+            target=crawl_loop, args=({**job, "once": once}, state, stop, options), name=job["source"].key, daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        print("Stopping after the downloads in flight are aborted...")
+        stop.set()
+        cancel_all()
+        for thread in threads:
+            thread.join()
+
+
+def load_schedule(path):
+    """Reads {source key: {"interval": seconds, "days": n, "queries": [...]}} from a JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-crawl sources on an interval, fetching only new articles.")
+    parser.add_argument("sources", nargs="*", help="registry keys, e.g. onet_pl iz_ru")
+    parser.add_argument("--config", help="JSON schedule: {source: {interval, days, queries}}")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between ticks of a source")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="recent days re-crawled on every tick")
+    parser.add_argument("--queries", help="comma-separated watched queries for by_query sources")
+    parser.add_argument("--once", action="store_true", help="run one tick of every source and exit")
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--segments", default=SEGMENTS_DIR)
+    parser.add_argument("--stats", help="statistics directory to update after each tick, e.g. data/stats")
+    parser.add_argument("--keywords", help="keyword file to tag articles with, e.g. keywords.json")
+    parser.add_argument("--tag-index", help="tag index to update, e.g. data/tags.sqlite")
+    parser.add_argument("--revisions", help="revision store to track articles in, e.g. data/revisions.sqlite")
+    parser.add_argument("--recheck-days", type=float, help="re-check articles first seen this recently (3 days)")
+    parser.add_argument("--health", default=HEALTH_FILE, help="circuit breaker and extraction health file")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--backend", default="threads", choices=("threads", "async", "aiohttp", "httpx"))
+    args = parser.parse_args()
+
+    schedule = load_schedule(args.config) if args.config else {}
+    queries = [q.strip() for q in (args.queries or "").split(",") if q.strip()]
+    for key in args.sources:
+        schedule.setdefault(key, {})
+    jobs = []
+    for key, settings in schedule.items():
+        source = load_source(key)
+        job = {"source": source, "interval": args.interval, "days": args.days, "queries": queries, **settings}
+        if source.supports_query and not job["queries"]:
+            print(f"{key} needs queries, skipping it")
+            continue
+        jobs.append(job)
+    if not jobs:
+        parser.error("no sources to crawl")
+
+    matcher = index = None
+    if args.keywords:
+        from src.engine.keywords import KeywordMatcher, TagIndex
+
+        matcher = KeywordMatcher.load(args.keywords)
+        index = TagIndex(args.tag_index) if args.tag_index else None
+    revisions = None
+    if args.revisions:
+        from src.engine.revisions import RevisionStore
+
+        revisions = RevisionStore(args.revisions)
+    crawl(
+        jobs, CrawlState(args.state), once=args.once, workers=args.workers, backend=args.backend,
+        segments=args.segments, stats=args.stats, matcher=matcher, index=index, revisions=revisions,
+        recheck_days=args.recheck_days, health=args.health,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import re
+from datetime import date, datetime
+
+# Every date the engine writes is an ISO-8601 day ("2024-05-13"), whatever
+# the site printed: ISO strings compare and sort as dates, so range filters
+# and partitioning never have to parse them. normalize_date() accepts what
+# the scrapers and older output files contain:
+#
+#   2024-05-13, 2024-05-13T22:47:00Z   year first
+#   13-05-2024, 13.05.2024, 13. 5. 2024, 13/5/2024   day first
+#   datetime.date / datetime.datetime objects
+#
+# Day-first is assumed whenever the year comes last, as on every site
+# scraped so far.
+
+_YEAR_FIRST = re.compile(r"^\s*(\d{4})[-./](\d{1,2})[-./](\d{1,2})(?:$|[T\s])")
+_DAY_FIRST = re.compile(r"^\s*(\d{1,2})[-./]\s*(\d{1,2})[-./]\s*(\d{4})(?:$|\D)")
+
+# Scraped dates repeat a lot (every article of a day shares one), so results
+# are memoised, up to CACHE_SIZE distinct values each
+_cache = {}
+_days = {}
+CACHE_SIZE = 100_000
+
+
+def _parse(value):
+    match = _YEAR_FIRST.match(value)
+    if match:
+        year, month, day = match.groups()
+    else:
+        match = _DAY_FIRST.match(value)
+        if not match:
+            return None
+        day, month, year = match.groups()
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def normalize_date(value):
+    """Returns value as an ISO-8601 day ("YYYY-MM-DD"), or None if it is not a recognisable date."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    try:
+        return _cache[value]
+    except KeyError:
+        pass
+    normalized = _parse(str(value))
+    if len(_cache) < CACHE_SIZE:
+        _cache[value] = normalized
+    return normalized
+
+
+def parse_date(value):
+    """Returns value as a datetime.date, or None; records of one day share the object."""
+    normalized = normalize_date(value)
+    if normalized is None:
+        return None
+    day = _days.get(normalized)
+    if day is None:
+        day = date.fromisoformat(normalized)
+        if len(_days) < CACHE_SIZE:
+            _days[normalized] = day
+    return day
+
+
+def in_range(value, start_date=None, end_date=None):
+    """True if the ISO date value lies in [start_date, end_date]; undated values are kept."""
+    if not value:
+        return True
+    return (start_date is None or value >= start_date.isoformat()) and (end_date is None or value <= end_date.isoformat())
@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+from src.engine.fetch import describe_error, http_status
+from src.engine.output import save_articles_to_file
+from src.engine.records import Article, build_record
+from src.engine.segments import new_run_id, write_segment
+from src.engine.source import load_source
+
+# Articles that could not be fetched or parsed are appended to a dead-letter
+# file (JSON lines) next to the output, instead of being written as empty
+# records or dropped. A later retry pass re-fetches only those URLs and adds
+# the recovered articles to the output file, or to the segment corpus of
+# main.py and daemon runs (with their statistics, tags and revisions):
+#
+#   python -m src.engine.deadletter retry onet_pl --output data/raw/onet_pl_output.json
+#   python -m src.engine.deadletter retry onet_pl --segments data/segments --stats data/stats
+
+
+def dead_letter_path(output_file):
+    return os.path.splitext(output_file)[0] + "_failed.jsonl"
+
+
+def default_store(source_key):
+    # Where main.py and the daemon record the failures of a source
+    return dead_letter_path(os.path.join("data", "raw", f"{source_key}_output.json"))
+
+
+class DeadLetterStore:
+    """Append-only log of failed articles; the last line per URL wins."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = None  # (source, url) of pending entries, read on the first recovered() call
+
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def record(self, source, unit, link, error, attempts=1):
+        if self._pending is not None:
+            self._pending.add((source.key, link["url"]))
+        self._append({
+            "source": source.key,
+            "url": link["url"],
+            "unit": source.encode_unit(unit),
+            "link": link,
+            "error_class": describe_error(error),
+            "status": http_status(error),
+            "error": str(error),
+            "attempts": attempts,
+            "failed_at": time.time(),
+        })
+
+    def resolve(self, source_key, url):
+        if self._pending is not None:
+            self._pending.discard((source_key, url))
+        self._append({"source": source_key, "url": url, "resolved": True, "resolved_at": time.time()})
+
+    def recovered(self, source_key, url):
+        """Resolves url if it is pending, e.g. when a later run scraped it after all.
+
+        Only pending URLs get a line, so calling this for every scraped
+        article does not grow the file.
+        """
+        with self._lock:
+            if self._pending is None:
+                self._pending = {(entry["source"], entry["url"]) for entry in self.pending()}
+            if (source_key, url) not in self._pending:
+                return
+        self.resolve(source_key, url)
+
+    def pending(self, source_key=None):
+        """Returns the latest entry of every URL that has not been recovered yet."""
+        if not os.path.exists(self.path):
+            return []
+        latest = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line of a process killed mid-append
+                if source_key is None or entry["source"] == source_key:
+                    latest[(entry["source"], entry["url"])] = entry
+        return [entry for entry in latest.values() if not entry.get("resolved")]
+
+    def summary(self, source_key=None):
+        counts = {}
+        for entry in self.pending(source_key):
+            counts[entry["error_class"]] = counts.get(entry["error_class"], 0) + 1
+        return counts
+
+
+def append_articles(articles, output_file):
+    existing = []
+    if os.path.exists(output_file):
+        with open(output_file, "r", encoding="utf-8") as f:
+            existing = [Article.from_dict(article) for article in json.load(f)]
+    save_articles_to_file(existing + articles, output_file)
+
+
+def _store_recovered(source, recovered, output_file, segments, stats, keywords, tag_index, revisions):
+    # The same steps as a run of src.engine.runner.run_source(), per unit
+    records = [record for _, record in recovered]
+    if keywords:
+        from src.engine.keywords import KeywordMatcher
+
+        KeywordMatcher.load(keywords).tag_articles(records)
+    if output_file:
+        append_articles(records, output_file)
+    index = revision_store = None
+    if tag_index:
+        from src.engine.keywords import TagIndex
+
+        index = TagIndex(tag_index)
+    if revisions:
+        from src.engine.revisions import RevisionStore, track
+
+        revision_store = RevisionStore(revisions)
+    by_unit = {}
+    for unit, record in recovered:
+        by_unit.setdefault(unit, []).append(record)
+    run_id = new_run_id()
+    for unit, unit_records in by_unit.items():
+        location = output_file
+        if segments:
+            location = write_segment(segments, source, unit, unit_records, run_id)
+        if index and location:
+            index.add(unit_records, location)
+        if revision_store:
+            track(revision_store, source, unit, unit_records)
+    if stats and segments:
+        from src.engine.stats import update_stats
+
+        update_stats(stats, segments, source_key=source.key)
+
+
+def retry_dead_letters(source, store, output_file=None, rounds=3, backoff=5.0, segments=None, stats=None,
+                       keywords=None, tag_index=None, revisions=None):
+    """Re-fetches the failed articles of a source and adds the recovered ones to output_file and/or segments.
+
+    Each round only retries what is still failing, waiting backoff * 2**n
+    seconds between rounds. The other options are those of run_source().
+    """
+    recovered = []
+    for round_number in range(rounds):
+        entries = store.pending(source.key)
+        if not entries:
+            break
+        if round_number:
+            time.sleep(backoff * 2 ** (round_number - 1))
+        print(f"Retry round {round_number + 1}: {len(entries)} failed articles")
+
+        for entry in entries:
+            link = entry["link"]
+            unit = source.decode_unit(entry["unit"])
+            try:
+                title, date, body = source.parse_article(link["url"], source.fetch(link["url"]))
+            except Exception as e:
+                print(f"Still failing: {link['url']} ({describe_error(e)})")
+                store.record(source, unit, link, e, attempts=entry["attempts"] + 1)
+                continue
+            if not (source.skip_empty and not any([title, body])):
+                recovered.append((unit, build_record(source, unit, link, title, date, body)))
+            store.resolve(source.key, link["url"])
+
+    if recovered:
+        _store_recovered(source, recovered, output_file, segments, stats, keywords, tag_index, revisions)
+    print(f"Recovered {len(recovered)} articles, {len(store.pending(source.key))} still failing")
+    return [record for _, record in recovered]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and retry articles that failed to download.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="count failed articles per error class")
+    list_parser.add_argument("--store", help="dead-letter file (default: the one of --source)")
+    list_parser.add_argument("--source")
+
+    retry_parser = commands.add_parser("retry", help="re-fetch failed articles of a source")
+    retry_parser.add_argument("source", help="short name, e.g. onet_pl")
+    retry_parser.add_argument("--store", help="dead-letter file (default: data/raw/<source>_output_failed.jsonl)")
+    retry_parser.add_argument("--output", help="output file the recovered articles are added to")
+    retry_parser.add_argument("--segments", help="segment corpus the recovered articles are added to")
+    retry_parser.add_argument("--stats", help="statistics directory to update, with --segments")
+    retry_parser.add_argument("--keywords", help="keyword file to tag the recovered articles with")
+    retry_parser.add_argument("--tag-index", help="tag index to update, e.g. data/tags.sqlite")
+    retry_parser.add_argument("--revisions", help="revision store to track the recovered articles in")
+    retry_parser.add_argument("--rounds", type=int, default=3)
+    retry_parser.add_argument("--backoff", type=float, default=5.0)
+
+    args = parser.parse_args()
+    if not args.store:
+        if not args.source:
+            parser.error("--store or --source is needed")
+        args.store = default_store(args.source)
+    store = DeadLetterStore(args.store)
+
+    if args.command == "list":
+        for error_class, count in sorted(store.summary(args.source).items()):
+            print(f"{error_class:30} {count}")
+    elif args.command == "retry":
+        if not (args.output or args.segments):
+            retry_parser.error("--output or --segments is needed")
+        retry_dead_letters(
+            load_source(args.source), store, args.output, args.rounds, args.backoff, args.segments, args.stats,
+            args.keywords, args.tag_index, args.revisions,
+        )
+
+
+if __name__ == "__main__":
+    main()
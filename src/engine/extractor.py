@@ -0,0 +1,226 @@
+import re
+from urllib.parse import urljoin
+
+import soupsieve
+
+from src.engine.dates import in_range, normalize_date
+from src.engine.text import assemble_text, element_text, tag_names
+
+# A source is described by a plain dict (see SPEC in any module under
+# src/scrapers/). compile_spec() turns it into an Extractor once, when the
+# source is first used, so every page only pays for running pre-compiled
+# selectors.
+#
+# Spec keys:
+#   base_url          used to resolve relative links
+#   archive_url       by_date listing template, formatted with date= and page=
+#   search_url        by_query listing template, formatted with query= and page=,
+#                     and date_from= / date_to= when the site can filter by date
+#   search_date_format  strftime format of date_from and date_to (default %Y-%m-%d)
+#   pagination        {"start", "step", "count" (None = until empty), "stop_when_empty"}
+#   date_format       strftime format of by_date days in messages
+#   links             {"container", "items", "link", "all_links", "date"}
+#   article           {"title", "date", "lead", "lead_format", "body", "elements",
+#                      "bare_only", "skip_empty", "paragraph", "heading",
+#                      "unicode_normalize", "collapse_whitespace"}
+#                     (body text is assembled by src.engine.text)
+#   article_variants  [(url substring, article spec), ...] tried before "article"
+#
+# Dates are declared as {"selector", "attr" (optional), "pattern", "format"}:
+# the regex groups of the first match are passed to str.format, and the result
+# is normalised to an ISO-8601 day by src.engine.dates. Link dates let a
+# by_query run drop links outside its date window before fetching them.
+
+HEADINGS = "h1, h2, h3, h4, h5, h6, p"
+
+ARTICLE_DEFAULTS = {
+    "title": None,
+    "date": None,
+    "lead": None,
+    "lead_format": "{}\n\n",
+    "body": None,
+    "elements": HEADINGS,
+    "bare_only": False,
+    "skip_empty": True,
+    "paragraph": "{}\n",
+    "heading": "\n{}\n",
+    "unicode_normalize": None,
+    "collapse_whitespace": False,
+}
+
+PAGINATION_DEFAULTS = {"start": 0, "step": 1, "count": 1, "stop_when_empty": True}
+
+
+def _compile(selector):
+    return soupsieve.compile(selector) if selector else None
+
+
+def _compile_date(date_spec):
+    if not date_spec:
+        return None
+    return {
+        "selector": _compile(date_spec["selector"]),
+        "attr": date_spec.get("attr"),
+        "pattern": re.compile(date_spec["pattern"]),
+        "format": date_spec.get("format", "{0}-{1}-{2}"),
+    }
+
+
+def _extract_date(compiled, node):
+    tag = compiled["selector"].select_one(node)
+    if tag is None:
+        return None
+    if compiled["attr"]:
+        if not tag.has_attr(compiled["attr"]):
+            return None
+        raw = tag[compiled["attr"]]
+    else:
+        raw = tag.get_text(strip=True)
+    match = compiled["pattern"].search(raw)
+    return normalize_date(compiled["format"].format(*match.groups())) if match else None
+
+
+class ArticleExtractor:
+    def __init__(self, spec):
+        spec = {**ARTICLE_DEFAULTS, **spec}
+        self.title = _compile(spec["title"])
+        self.date = _compile_date(spec["date"])
+        self.lead = _compile(spec["lead"])
+        self.lead_format = spec["lead_format"]
+        self.body = _compile(spec["body"])
+        self.elements = tag_names(spec["elements"]) or _compile(spec["elements"])
+        self.bare_only = spec["bare_only"]
+        self.skip_empty = spec["skip_empty"]
+        self.paragraph = spec["paragraph"]
+        self.heading = spec["heading"]
+        self.unicode_form = spec["unicode_normalize"]
+        self.collapse_whitespace = spec["collapse_whitespace"]
+
+    def __call__(self, soup):
+        parts = []
+
+        # Title
+        try:
+            title_tag = self.title.select_one(soup) if self.title else None
+            title = element_text(title_tag, self.unicode_form, self.collapse_whitespace) if title_tag else None
+        except Exception as e:
+            print(f"Error getting title: {e}")
+            title = None
+
+        # Date
+        try:
+            date = _extract_date(self.date, soup) if self.date else None
+        except Exception as e:
+            print(f"Error getting date: {e}")
+            date = None
+
+        # Lead
+        try:
+            lead_tag = self.lead.select_one(soup) if self.lead else None
+            lead = element_text(lead_tag, self.unicode_form, self.collapse_whitespace) if lead_tag else ""
+            if lead:
+                parts.append(self.lead_format.format(lead))
+        except Exception as e:
+            print(f"Error getting lead: {e}")
+
+        # Article body
+        try:
+            if self.body:
+                parts += assemble_text(
+                    self.body.select(soup), self.elements, self.paragraph, self.heading, self.bare_only,
+                    self.skip_empty, self.unicode_form, self.collapse_whitespace,
+                )
+        except Exception as e:
+            print(f"Error getting article body: {e}")
+
+        return title, date, "".join(parts)
+
+
+class Extractor:
+    def __init__(self, spec):
+        self.spec = spec
+        self.pagination = {**PAGINATION_DEFAULTS, **spec.get("pagination", {})}
+
+        links = spec.get("links", {})
+        self.links_container = _compile(links.get("container"))
+        self.links_items = _compile(links.get("items"))
+        self.links_link = _compile(links.get("link"))
+        self.all_links = links.get("all_links", False)
+        self.links_date = _compile_date(links.get("date"))
+
+        self.article = ArticleExtractor(spec["article"])
+        self.article_variants = [(match, ArticleExtractor(variant)) for match, variant in spec.get("article_variants", [])]
+
+    def listing_urls(self, date=None, query=None, start_date=None, end_date=None):
+        # URL templates are read at call time so the spec can be re-pointed (e.g. at a mock server)
+        template = self.spec["archive_url"] if date is not None else self.spec["search_url"]
+        search_format = self.spec.get("search_date_format", "%Y-%m-%d")
+        date_from = start_date.strftime(search_format) if start_date else ""
+        date_to = end_date.strftime(search_format) if end_date else ""
+        count = self.pagination["count"]
+        index = 0
+        while count is None or index < count:
+            page = self.pagination["start"] + index * self.pagination["step"]
+            yield page, template.format(
+                base_url=self.spec["base_url"], date=date, query=query, page=page,
+                date_from=date_from, date_to=date_to,
+            )
+            index += 1
+
+    def in_window(self, link, start_date=None, end_date=None):
+        """False for links whose listing date falls outside [start_date, end_date]; undated links are kept."""
+        return in_range(link["date"], start_date, end_date)
+
+    def format_date(self, date):
+        return date.strftime(self.spec["date_format"])
+
+    def absolute_url(self, href):
+        return href if href.startswith("http") else urljoin(self.spec["base_url"], href)
+
+    def extract_links(self, soup):
+        """Returns [{"url": ..., "date": ...}] for one listing page, in page order."""
+        root = soup
+        if self.links_container:
+            root = self.links_container.select_one(soup)
+            if root is None:
+                return []
+
+        links = []
+        seen = set()
+        for item in self.links_items.select(root):
+            if self.links_link is None:
+                anchors = [item]
+            elif self.all_links:
+                anchors = self.links_link.select(item)
+            else:
+                anchor = self.links_link.select_one(item)
+                anchors = [anchor] if anchor is not None else []
+
+            date = None
+            if self.links_date:
+                try:
+                    date = _extract_date(self.links_date, item)
+                except Exception as e:
+                    print(f"Error formatting date: {e}")
+
+            for anchor in anchors:
+                href = anchor.get("href")
+                if not href:
+                    continue
+                url = self.absolute_url(href)
+                if url in seen:
+                    continue
+                seen.add(url)
+                links.append({"url": url, "date": date})
+        return links
+
+    def extract_article(self, soup, url=""):
+        """Returns (title, date, body) using the first article variant matching the URL."""
+        for match, extractor in self.article_variants:
+            if match in url:
+                return extractor(soup)
+        return self.article(soup)
+
+
+def compile_spec(spec):
+    return Extractor(spec)
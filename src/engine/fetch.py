@@ -0,0 +1,294 @@
+import queue
+import random
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_TIMEOUT = 20          # total seconds for one request: connect, headers and body
+CONNECT_TIMEOUT = 10
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+# Download buffers kept for reuse; they grow as needed, and ones that grew
+# past POOL_MAX_BUFFER_BYTES are dropped after use
+POOL_SIZE = 32
+POOL_BUFFER_BYTES = 256 * 1024
+POOL_MAX_BUFFER_BYTES = 2 * 1024 * 1024
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 1.0
+MAX_DELAY = 60
+
+# Worth another try: the server or the network may recover
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+# One session per thread keeps connections to each host alive between requests
+_local = threading.local()
+
+# Set by cancel_all() to abort every download in progress, e.g. on Ctrl+C
+_cancelled = threading.Event()
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The whole request took longer than its deadline."""
+
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    """The response body is bigger than the allowed maximum."""
+
+
+class UnexpectedContentType(requests.exceptions.RequestException):
+    """The response is not one of the accepted content types, e.g. a PDF or a video."""
+
+
+class NotModified(requests.exceptions.RequestException):
+    """The page has not changed since it was last fetched (HTTP 304)."""
+
+
+class FetchCancelled(requests.exceptions.RequestException):
+    """The download was aborted by cancel_all()."""
+
+
+def cancel_all():
+    _cancelled.set()
+
+
+def reset_cancel():
+    _cancelled.clear()
+
+
+class BufferPool:
+    """A bounded set of reusable download buffers.
+
+    Bodies are read into a pooled bytearray instead of a list of chunks, so a
+    page costs one buffer plus the final bytes, and parallel fetches do not
+    keep allocating fresh memory for every page.
+    """
+
+    def __init__(self, size=POOL_SIZE, buffer_bytes=POOL_BUFFER_BYTES, max_buffer_bytes=POOL_MAX_BUFFER_BYTES):
+        self.buffer_bytes = buffer_bytes
+        self.max_buffer_bytes = max_buffer_bytes
+        self._free = queue.LifoQueue(maxsize=size)
+
+    def acquire(self):
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return bytearray(self.buffer_bytes)
+
+    def release(self, buffer):
+        if len(buffer) > self.max_buffer_bytes:
+            return  # grown for an unusually large page, let it go
+        try:
+            self._free.put_nowait(buffer)
+        except queue.Full:
+            pass
+
+
+_buffers = BufferPool()
+
+
+def get_session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("http://", _WatchedAdapter())
+        session.mount("https://", _WatchedAdapter())
+        _local.session = session
+    return session
+
+
+class _WatchedConnection:
+    # Hands the connection a request goes out on to the fetching thread's
+    # Watchdog, so the deadline also covers a server that is slow to send
+    # its headers
+    def request(self, *args, **kwargs):
+        watchdog = getattr(_local, "watchdog", None)
+        if watchdog is not None:
+            watchdog.connection = self
+        return super().request(*args, **kwargs)
+
+
+class _WatchedHTTPConnection(_WatchedConnection, HTTPConnection):
+    pass
+
+
+class _WatchedHTTPSConnection(_WatchedConnection, HTTPSConnection):
+    pass
+
+
+class _WatchedHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _WatchedHTTPConnection
+
+
+class _WatchedHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _WatchedHTTPSConnection
+
+
+class _WatchedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _WatchedHTTPPool, "https": _WatchedHTTPSPool}
+
+
+class Watchdog:
+    """Cuts a request's connection once its deadline has passed.
+
+    Runs on a timer thread: shutting the socket down wakes up a read that is
+    blocked on a server sending the headers or the body a few bytes at a time.
+    """
+
+    def __init__(self, timeout):
+        self.connection = None
+        self.response = None
+        self.fired = threading.Event()
+        self._timer = threading.Timer(timeout, self._abort)
+        self._timer.daemon = True
+
+    def start(self):
+        self._timer.start()
+
+    def cancel(self):
+        self._timer.cancel()
+
+    def _abort(self):
+        self.fired.set()
+        try:
+            if self.response is not None:
+                self.response.raw.shutdown()
+            elif self.connection is not None and self.connection.sock is not None:
+                self.connection.sock.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+
+
+def check_headers(response, url, max_bytes, content_types):
+    # Rejects a response from its headers alone, before any of the body is read
+    if content_types:
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in content_types:
+            raise UnexpectedContentType(f"Unexpected content type {content_type} for {url}")
+    length = response.headers.get("Content-Length", "")
+    if max_bytes and length.isdigit() and int(length) > max_bytes:
+        raise ResponseTooLarge(f"Response of {length} bytes larger than {max_bytes} bytes: {url}")
+
+
+def fetch(url, headers=None, timeout=DEFAULT_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES, content_types=HTML_TYPES,
+          validators=None):
+    """Downloads a page and returns its body, raising on HTTP errors.
+
+    `timeout` is a deadline for the whole request. requests' own timeout only
+    bounds each socket read, so the request runs under a Watchdog, started
+    before it is sent, that cuts the connection once the deadline has passed. Responses that are not
+    one of `content_types` or are bigger than `max_bytes` are abandoned.
+
+    With `validators` (e.g. a src.engine.daemon.CrawlState) the request is
+    conditional: the ETag and Last-Modified of the last response for the URL
+    are sent along, NotModified is raised when the server answers 304, and
+    the validators of a new response are handed back to be stored.
+    """
+    if _cancelled.is_set():
+        raise FetchCancelled(f"Fetch cancelled: {url}")
+    if validators is not None:
+        headers = {**(headers or {}), **validators.request_headers(url)}
+
+    started = time.monotonic()
+    watchdog = Watchdog(timeout)
+    watchdog.start()
+    _local.watchdog = watchdog
+    try:
+        try:
+            response = get_session().get(
+                url, headers=headers, timeout=(min(CONNECT_TIMEOUT, timeout), timeout), stream=True
+            )
+        except requests.exceptions.ConnectionError as e:
+            if watchdog.fired.is_set():
+                raise DeadlineExceeded(f"Deadline of {timeout}s exceeded for {url}") from e
+            raise
+        finally:
+            _local.watchdog = None
+        watchdog.response = response
+        try:
+            if response.status_code == 304:
+                raise NotModified(f"Not modified since the last fetch: {url}", response=response)
+            response.raise_for_status()
+            check_headers(response, url, max_bytes, content_types)
+
+            buffer = _buffers.acquire()
+            size = 0
+            try:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    end = size + len(chunk)
+                    if max_bytes and end > max_bytes:
+                        raise ResponseTooLarge(f"Response larger than {max_bytes} bytes: {url}")
+                    if end > len(buffer):
+                        buffer.extend(bytes(max(end - len(buffer), len(buffer))))
+                    buffer[size:end] = chunk
+                    size = end
+                    if _cancelled.is_set():
+                        raise FetchCancelled(f"Fetch cancelled: {url}")
+                    if time.monotonic() - started > timeout:
+                        raise DeadlineExceeded(f"Deadline of {timeout}s exceeded for {url}")
+                content = bytes(memoryview(buffer)[:size])
+                if validators is not None:
+                    validators.store(url, response.headers)
+                return content
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                if watchdog.fired.is_set():
+                    raise DeadlineExceeded(f"Deadline of {timeout}s exceeded for {url}") from e
+                raise
+            finally:
+                _buffers.release(buffer)
+        finally:
+            response.close()
+    finally:
+        watchdog.cancel()
+
+
+def http_status(error):
+    response = getattr(error, "response", None)
+    return response.status_code if response is not None else None
+
+
+def describe_error(error):
+    # e.g. "HTTPError 503" or "ReadTimeout"
+    status = http_status(error)
+    return f"{type(error).__name__} {status}" if status else type(error).__name__
+
+
+def is_transient(error):
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    return http_status(error) in TRANSIENT_STATUS
+
+
+def retry_delay(error, attempt, backoff=DEFAULT_BACKOFF):
+    """Seconds to wait before retry number `attempt` (0-based)."""
+    response = getattr(error, "response", None)
+    if response is not None and response.headers.get("Retry-After", "").isdigit():
+        return min(int(response.headers["Retry-After"]), MAX_DELAY)
+    # Exponential backoff with jitter, so parallel workers do not retry in lockstep
+    return min(backoff * 2 ** attempt * random.uniform(1, 1.5), MAX_DELAY)
+
+
+def fetch_with_retry(url, headers=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                     max_bytes=DEFAULT_MAX_BYTES, content_types=HTML_TYPES, validators=None):
+    """fetch() that retries transient failures (timeouts, 429, 5xx) with backoff."""
+    attempt = 0
+    while True:
+        try:
+            return fetch(
+                url, headers=headers, timeout=timeout, max_bytes=max_bytes, content_types=content_types,
+                validators=validators,
+            )
+        except requests.exceptions.RequestException as e:
+            if attempt >= retries or not is_transient(e) or _cancelled.is_set():
+                raise
+            delay = retry_delay(e, attempt, backoff)
+            print(f"{describe_error(e)} for {url}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
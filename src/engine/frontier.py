@@ -0,0 +1,467 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from src.engine.health import OPEN, get_health
+from src.engine.output import save_articles_to_file
+from src.engine.records import Article, as_dict, build_record
+from src.engine.runner import date_range
+from src.engine.source import load_source
+
+# Persistent URL frontier in a single SQLite file.
+#
+# Link collection and article fetching are independent consumers of it:
+# collectors turn pending units (days or queries) into pending URLs, fetchers
+# turn pending URLs into records. Every row carries a state
+# (pending / in_flight / done / failed) and a retry count, so a crashed run
+# resumes where it stopped and more consumers can join at any time:
+#
+#   python -m src.engine.frontier --db data/frontier.sqlite add onet_pl --start 2024-05-01 --end 2024-05-31
+#   python -m src.engine.frontier --db data/frontier.sqlite collect
+#   python -m src.engine.frontier --db data/frontier.sqlite fetch --workers 8
+#   python -m src.engine.frontier --db data/frontier.sqlite export onet_pl --output data/raw/onet_pl_output.json
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+STALE_AFTER = 600  # seconds after which a claim from another host counts as abandoned
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    source TEXT NOT NULL,  -- Source.key
+    seq INTEGER NOT NULL,
+    unit TEXT NOT NULL,
+    start_date TEXT,       -- date window of a by_query unit
+    end_date TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    retries INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    worker TEXT,
+    updated_at REAL,
+    PRIMARY KEY (source, unit)
+);
+CREATE TABLE IF NOT EXISTS urls (
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    unit_seq INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    link TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'pending',
+    retries INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    worker TEXT,
+    updated_at REAL,
+    record TEXT,
+    PRIMARY KEY (source, url)
+);
+CREATE INDEX IF NOT EXISTS urls_pending ON urls (state, source, priority DESC, unit_seq, position);
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    last_served REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class Frontier:
+    def __init__(self, path, max_retries=3):
+        self.path = path
+        self.max_retries = max_retries
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+
+    def _db(self):
+        # SQLite connections are not shared between threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self._local.db = db
+        return db
+
+    # Link collection stage
+
+    def add_units(self, source, units, start_date=None, end_date=None):
+        """Queues units; start_date and end_date are the date window of by_query units."""
+        window = (None, None)
+        if source.mode == "by_query":
+            window = (start_date.isoformat() if start_date else None, end_date.isoformat() if end_date else None)
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        db.execute("INSERT OR IGNORE INTO sources (name) VALUES (?)", (source.key,))
+        start = db.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM units WHERE source = ?", (source.key,)).fetchone()[0]
+        added = 0
+        for offset, unit in enumerate(units):
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO units (source, seq, unit, start_date, end_date, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (source.key, start + offset, source.encode_unit(unit), *window, time.time()),
+            )
+            added += cursor.rowcount
+        db.execute("COMMIT")
+        return added
+
+    def claim_unit(self, worker_id):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        row = db.execute(
+            "SELECT source, seq, unit, start_date, end_date FROM units WHERE state = 'pending' "
+            "ORDER BY seq, source LIMIT 1"
+        ).fetchone()
+        if row:
+            db.execute(
+                "UPDATE units SET state = ?, worker = ?, updated_at = ? WHERE source = ? AND unit = ?",
+                (IN_FLIGHT, worker_id, time.time(), row[0], row[2]),
+            )
+        db.execute("COMMIT")
+        return row
+
+    def add_links(self, source_key, unit, unit_seq, links, priority=0):
+        # URLs already in the frontier (from any unit) are not fetched again
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        added = 0
+        for position, link in enumerate(links):
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO urls (source, url, unit, unit_seq, position, link, priority, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (source_key, link["url"], unit, unit_seq, position, json.dumps(link, ensure_ascii=False), priority, time.time()),
+            )
+            added += cursor.rowcount
+        db.execute(
+            "UPDATE units SET state = ?, updated_at = ? WHERE source = ? AND unit = ?",
+            (DONE, time.time(), source_key, unit),
+        )
+        db.execute("COMMIT")
+        return added
+
+    def fail_unit(self, source_key, unit, error):
+        self._fail("units", "unit", source_key, unit, error)
+
+    # Article fetch stage
+
+    def claim_url(self, worker_id, skip=()):
+        """Claims the best pending URL of the source served least recently, leaving out sources in skip."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        skip = sorted(skip)
+        row = db.execute(
+            "SELECT u.source, u.url, u.unit, u.link FROM urls u JOIN sources s ON s.name = u.source "
+            f"WHERE u.state = 'pending' AND u.source NOT IN ({', '.join('?' * len(skip))}) "
+            "ORDER BY s.last_served, u.priority DESC, u.unit_seq, u.position LIMIT 1",
+            skip,
+        ).fetchone()
+        if row:
+            now = time.time()
+            db.execute(
+                "UPDATE urls SET state = ?, worker = ?, updated_at = ? WHERE source = ? AND url = ?",
+                (IN_FLIGHT, worker_id, now, row[0], row[1]),
+            )
+            db.execute("UPDATE sources SET last_served = ? WHERE name = ?", (now, row[0]))
+        db.execute("COMMIT")
+        if row is None:
+            return None
+        return row[0], row[2], json.loads(row[3])
+
+    def complete_url(self, source_key, url, record):
+        self._db().execute(
+            "UPDATE urls SET state = ?, record = ?, last_error = NULL, updated_at = ? WHERE source = ? AND url = ?",
+            (DONE, json.dumps(as_dict(record), ensure_ascii=False) if record is not None else None, time.time(), source_key, url),
+        )
+
+    def release_url(self, source_key, url):
+        # Back to pending without using up a retry, e.g. while its source is paused
+        self._db().execute(
+            "UPDATE urls SET state = ?, worker = NULL, updated_at = ? WHERE source = ? AND url = ?",
+            (PENDING, time.time(), source_key, url),
+        )
+
+    def release_empty(self, source_key, since):
+        """Returns URLs finished since `since` without a title or body to pending, after a broken selector."""
+        cursor = self._db().execute(
+            "UPDATE urls SET state = ?, record = NULL, worker = NULL WHERE source = ? AND state = ? AND updated_at >= ? "
+            "AND (record IS NULL OR json_extract(record, '$.article_body') IS NULL "
+            "OR COALESCE(json_extract(record, '$.title'), json_extract(record, '$.header')) IS NULL)",
+            (PENDING, source_key, DONE, since),
+        )
+        return cursor.rowcount
+
+    def fail_url(self, source_key, url, error):
+        self._fail("urls", "url", source_key, url, error)
+
+    def _fail(self, table, key, source_key, value, error):
+        # Back to pending until the retry budget is spent
+        self._db().execute(
+            f"UPDATE {table} SET retries = retries + 1, last_error = ?, updated_at = ?, "
+            f"state = CASE WHEN retries + 1 >= ? THEN 'failed' ELSE 'pending' END "
+            f"WHERE source = ? AND {key} = ?",
+            (f"{type(error).__name__}: {error}", time.time(), self.max_retries, source_key, value),
+        )
+
+    # Housekeeping
+
+    def requeue_stale(self, max_age):
+        """Returns rows claimed by consumers that died to the pending state.
+
+        Rows of consumers on this host whose process is gone are released at
+        once; rows of other hosts once their claim is `max_age` seconds old.
+        """
+        cutoff = time.time() - max_age
+        db = self._db()
+        requeued = 0
+        for table in ("units", "urls"):
+            workers = [row[0] for row in db.execute(
+                f"SELECT DISTINCT worker FROM {table} WHERE state = ? AND worker IS NOT NULL", (IN_FLIGHT,)
+            )]
+            dead = [worker for worker in workers if not _worker_alive(worker)]
+            cursor = db.execute(
+                f"UPDATE {table} SET state = 'pending', worker = NULL WHERE state = ? "
+                f"AND (updated_at < ? OR worker IN ({', '.join('?' * len(dead))}))",
+                (IN_FLIGHT, cutoff, *dead),
+            )
+            requeued += cursor.rowcount
+        return requeued
+
+    def requeue_failed(self):
+        """Gives failed URLs a fresh retry budget."""
+        cursor = self._db().execute(
+            "UPDATE urls SET state = 'pending', retries = 0, worker = NULL WHERE state = ?", (FAILED,)
+        )
+        return cursor.rowcount
+
+    def has_open_units(self):
+        row = self._db().execute("SELECT COUNT(*) FROM units WHERE state IN (?, ?)", (PENDING, IN_FLIGHT)).fetchone()
+        return row[0] > 0
+
+    def status(self):
+        db = self._db()
+        return {
+            "units": dict(db.execute("SELECT state, COUNT(*) FROM units GROUP BY state").fetchall()),
+            "urls": dict(db.execute("SELECT state, COUNT(*) FROM urls GROUP BY state").fetchall()),
+        }
+
+    def records(self, source_key, units=None):
+        """Yields the finished articles of a source, or only those of `units` (encoded units)."""
+        units = set(units) if units is not None else None
+        rows = self._db().execute(
+            "SELECT unit, record FROM urls WHERE source = ? AND state = ? AND record IS NOT NULL "
+            "ORDER BY unit_seq, position",
+            (source_key, DONE),
+        )
+        for unit, record in rows:
+            if units is None or unit in units:
+                yield Article.from_dict(json.loads(record))
+
+
+def _worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+
+
+def _worker_alive(worker_id):
+    # Only processes on this host can be checked; os.kill(pid, 0) would end
+    # the process on Windows
+    host, pid, _ = worker_id.rsplit("-", 2)
+    if host != socket.gethostname() or os.name == "nt":
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        pass
+    return True
+
+
+def collect(frontier, sources):
+    """Link collection consumer: runs until no unit is pending."""
+    worker_id = _worker_id()
+    collected = 0
+    while True:
+        claimed = frontier.claim_unit(worker_id)
+        if claimed is None:
+            return collected
+        source_key, unit_seq, unit, start_date, end_date = claimed
+        source = sources.get(source_key) or load_source(source_key)
+        sources[source_key] = source
+        start_date = date.fromisoformat(start_date) if start_date else None
+        end_date = date.fromisoformat(end_date) if end_date else None
+        try:
+            links = source.collect_links(source.decode_unit(unit), start_date, end_date, strict=True)
+        except Exception as e:
+            print(f"Error collecting links for {unit}: {e}")
+            frontier.fail_unit(source_key, unit, e)
+            continue
+        added = frontier.add_links(source_key, unit, unit_seq, links)
+        print(f"Queued {added} new links for {unit}")
+        collected += 1
+
+
+def fetch(frontier, sources, wait_for_collectors=True):
+    """Article fetch consumer: runs until no URL is pending.
+
+    With wait_for_collectors, an empty frontier is only final once no unit is
+    left to collect, so fetchers can start alongside the collectors. URLs of a
+    source whose circuit breaker is open (see src.engine.health) are left
+    pending for a later run.
+    """
+    worker_id = _worker_id()
+    fetched = 0
+    paused = set()
+    started = time.time()
+    while True:
+        claimed = frontier.claim_url(worker_id, paused)
+        if claimed is None:
+            if wait_for_collectors and frontier.has_open_units():
+                time.sleep(0.5)
+                continue
+            return fetched
+        source_key, unit, link = claimed
+        source = sources.get(source_key) or load_source(source_key)
+        sources[source_key] = source
+        health = get_health(source)
+        if health.paused():
+            frontier.release_url(source_key, link["url"])
+            paused.add(source_key)
+            continue
+
+        print(f"Fetching article: {link['url']}")
+        try:
+            title, date_, body = source.parse_article(link["url"], source.fetch(link["url"]))
+        except Exception as e:
+            print(f"Error fetching {link['url']}: {e}")
+            health.observe_failure()
+            frontier.fail_url(source_key, link["url"], e)
+            continue
+        health.observe(title, date_ or link["date"], body, source.article_selectors(link["url"]))
+        if health.state == OPEN:
+            # Tripped on this article: it and the empty articles before it are
+            # fetched again once the source works
+            frontier.release_url(source_key, link["url"])
+            frontier.release_empty(source_key, started)
+            paused.add(source_key)
+            continue
+
+        record = None
+        if not (source.skip_empty and not any([title, body])):
+            record = build_record(source, source.decode_unit(unit), link, title, date_, body)
+        frontier.complete_url(source_key, link["url"], record)
+        fetched += 1
+
+
+def export(frontier, source_key, output_file, compact=False, units=None):
+    articles = list(frontier.records(source_key, units))
+    save_articles_to_file(articles, output_file, compact=compact)
+    return articles
+
+
+def run_with_frontier(source, units, output_file, frontier_path, workers=1, compact=False, start_date=None,
+                      end_date=None, health=None):
+    """run_source() equivalent backed by a persistent frontier.
+
+    Re-running with the same frontier file resumes an interrupted run:
+    finished units and URLs are not fetched again. Dead letters, segments,
+    statistics, tagging, revisions and the async backends are not supported
+    here; run_source() refuses them together with a frontier.
+    """
+    frontier = Frontier(frontier_path)
+    # Rows of a previous run that died; live consumers sharing the file keep theirs
+    frontier.requeue_stale(STALE_AFTER)
+    units = list(units)
+    frontier.add_units(source, units, start_date, end_date)
+    source_health = get_health(source)
+    if health:
+        from src.engine.health import restore
+
+        restore(source_health, health)
+
+    sources = {source.key: source}
+    threads = [threading.Thread(target=collect, args=(frontier, sources))]
+    threads += [threading.Thread(target=fetch, args=(frontier, sources)) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"Frontier status: {frontier.status()}")
+    articles = export(frontier, source.key, output_file, compact, [source.encode_unit(unit) for unit in units])
+    if health:
+        from src.engine.health import save
+
+        save(source_health, health)
+    print(f"\nEnd of scraping. All articles saved to {output_file}")
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent URL frontier for crash-safe crawling.")
+    parser.add_argument("--db", default=os.path.join("data", "frontier.sqlite"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="queue days or queries of a source")
+    add_parser.add_argument("source")
+    add_parser.add_argument("--start", type=date.fromisoformat,
+                            help="first day (YYYY-MM-DD); for by_query sources, the earliest article date")
+    add_parser.add_argument("--end", type=date.fromisoformat,
+                            help="last day (YYYY-MM-DD); for by_query sources, the latest article date")
+    add_parser.add_argument("--queries", help="comma-separated queries")
+
+    commands.add_parser("collect", help="collect links for pending units")
+
+    fetch_parser = commands.add_parser("fetch", help="fetch pending articles")
+    fetch_parser.add_argument("--workers", type=int, default=1)
+
+    requeue_parser = commands.add_parser("requeue", help="release rows held by dead consumers")
+    requeue_parser.add_argument("--max-age", type=float, default=STALE_AFTER)
+    requeue_parser.add_argument("--failed", action="store_true", help="also retry URLs that ran out of retries")
+
+    commands.add_parser("status", help="show row counts per state")
+
+    export_parser = commands.add_parser("export", help="write finished articles of a source to a file")
+    export_parser.add_argument("source")
+    export_parser.add_argument("--output", required=True)
+
+    args = parser.parse_args()
+    frontier = Frontier(args.db)
+
+    if args.command == "add":
+        source = load_source(args.source)
+        if source.mode == "by_date":
+            if not (args.start and args.end):
+                add_parser.error(f"{args.source} is scraped by date and needs --start and --end")
+            units = date_range(args.start, args.end)
+        else:
+            units = [q.strip() for q in (args.queries or "").split(",") if q.strip()]
+        print(f"Added {frontier.add_units(source, units, args.start, args.end)} units")
+    elif args.command == "collect":
+        collect(frontier, {})
+    elif args.command == "fetch":
+        sources = {}
+        threads = [threading.Thread(target=fetch, args=(frontier, sources)) for _ in range(args.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elif args.command == "requeue":
+        requeued = frontier.requeue_stale(args.max_age)
+        if args.failed:
+            requeued += frontier.requeue_failed()
+        print(f"Requeued {requeued} rows")
+    elif args.command == "status":
+        print(json.dumps(frontier.status(), indent=4))
+    elif args.command == "export":
+        export(frontier, args.source, args.output)
+
+
+if __name__ == "__main__":
+    main()
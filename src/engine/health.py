@@ -0,0 +1,279 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from src.engine.output import atomic_write
+
+# Extraction health per source, and a circuit breaker that pauses a source
+# whose pages stop yielding usable articles, usually because the site changed
+# its markup and a selector no longer matches.
+#
+# Every parsed article adds a sample (title found, body length, date found,
+# and the selectors used for its URL) to a rolling window, and every failed
+# fetch a failure. Once MIN_SAMPLES articles are in the window and more than
+# MAX_EMPTY_RATE of them have no title or no body, or MAX_EMPTY_LISTINGS
+# listing pages in a row have no links, the breaker opens: the run stops
+# fetching that source, keeps its checkpoint, and reports the selectors that
+# come back empty. After COOLDOWN seconds the breaker is half-open and the
+# next PROBE articles decide whether it closes again or stays open.
+#
+#   python -m src.engine.health show
+#   python -m src.engine.health reset onet_pl
+
+HEALTH_FILE = os.path.join("data", "health.json")
+WINDOW = 100              # articles in the rolling window
+MIN_SAMPLES = 20          # articles needed before the breaker can open
+MAX_EMPTY_RATE = 0.5      # share of articles without title, or without body
+SHORT_BODY = 200          # bodies under this many characters count as short in the metrics
+MAX_EMPTY_LISTINGS = 3    # listing pages in a row without a single link
+COOLDOWN = 3600           # seconds a source stays paused
+PROBE = 10                # articles that decide whether a half-open breaker closes
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_registry = {}
+_registry_lock = threading.Lock()
+_NO_SELECTORS = {}  # shared, so the samples of a source without selectors form one group
+
+
+def _percentile(values, share):
+    return values[min(len(values) - 1, int(share * len(values)))] if values else 0
+
+
+class SourceHealth:
+    def __init__(self, key, window=WINDOW, min_samples=MIN_SAMPLES, max_empty_rate=MAX_EMPTY_RATE,
+                 cooldown=COOLDOWN, probe=PROBE):
+        self.key = key
+        self.min_samples = min_samples
+        self.max_empty_rate = max_empty_rate
+        self.cooldown = cooldown
+        self.probe = probe
+        # (title found, body length, date found, selectors)
+        self.samples = deque(maxlen=window)
+        self.fetches = deque(maxlen=window)  # True for a failed fetch
+        self.empty_listings = 0
+        self.state = CLOSED
+        self.opened_at = None
+        self.reason = None
+        self.failing = []
+        self._lock = threading.Lock()
+
+    # Observations
+
+    def observe(self, title, date, body, selectors=None):
+        with self._lock:
+            self.samples.append((bool(title), len(body or ""), bool(date), selectors or _NO_SELECTORS))
+            self.fetches.append(False)
+            self._evaluate()
+
+    def observe_failure(self):
+        with self._lock:
+            self.fetches.append(True)
+
+    def observe_listing(self, links, selectors=None):
+        """Counts a listing page (a day or query) and the number of links found on it."""
+        with self._lock:
+            self.empty_listings = 0 if links else self.empty_listings + 1
+            if self.state != OPEN and self.empty_listings >= MAX_EMPTY_LISTINGS:
+                failing = [("links", selectors or {}, self.empty_listings, self.empty_listings)]
+                self._open(f"{self.empty_listings} listing pages in a row had no links", failing)
+
+    # Breaker
+
+    def _open(self, reason, failing):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.reason = reason
+        self.failing = failing
+        print(self.report())
+
+    def _evaluate(self):
+        if self.state == OPEN:
+            return
+        samples = list(self.samples)
+        if self.state == HALF_OPEN:
+            if len(samples) < self.probe:
+                return
+        elif len(samples) < self.min_samples:
+            return
+        failing = self._failing_selectors(samples)
+        if failing:
+            fields = " or ".join(sorted({field for field, *_ in failing}, reverse=True))
+            self._open(f"more than {self.max_empty_rate:.0%} of the last {len(samples)} articles have no {fields}",
+                       failing)
+        elif self.state == HALF_OPEN:
+            print(f"{self.key}: extraction recovered, resuming")
+            self.state = CLOSED
+            self.reason = None
+            self.failing = []
+
+    def _failing_selectors(self, samples):
+        # [(field, selectors, empty, total)]: when a field is empty in too many
+        # of the samples, the sets of selectors (article variants) that
+        # mostly come back empty for it
+        failing = []
+        for field, index in (("title", 0), ("body", 1)):
+            groups = {}
+            for sample in samples:
+                selectors = sample[3]
+                if field == "title" and selectors and not selectors.get("title"):
+                    continue  # the spec has no title selector
+                group = groups.setdefault(id(selectors), [selectors, 0, 0])
+                group[2] += 1
+                if not sample[index]:
+                    group[1] += 1
+            empty = sum(group[1] for group in groups.values())
+            total = sum(group[2] for group in groups.values())
+            if not total or empty <= self.max_empty_rate * total:
+                continue
+            for selectors, group_empty, group_total in groups.values():
+                if group_empty > self.max_empty_rate * group_total:
+                    failing.append((field, selectors, group_empty, group_total))
+        return failing
+
+    def paused(self, now=None):
+        """True while the breaker is open; moves it to half-open once the cooldown has passed."""
+        with self._lock:
+            if self.state == OPEN and (now or time.time()) - self.opened_at >= self.cooldown:
+                print(f"{self.key}: paused since {time.ctime(self.opened_at)}, probing {self.probe} articles")
+                self.state = HALF_OPEN
+                self.samples.clear()
+                self.empty_listings = 0
+            return self.state == OPEN
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.opened_at = self.reason = None
+            self.failing = []
+            self.samples.clear()
+            self.fetches.clear()
+            self.empty_listings = 0
+
+    # Reporting
+
+    def metrics(self):
+        samples = list(self.samples)
+        count = len(samples)
+        lengths = sorted(sample[1] for sample in samples)
+        fetches = list(self.fetches)
+        return {
+            "articles": count,
+            "empty_title_rate": round(sum(not s[0] for s in samples) / count, 3) if count else None,
+            "empty_body_rate": round(sum(not s[1] for s in samples) / count, 3) if count else None,
+            "short_body_rate": round(sum(s[1] < SHORT_BODY for s in samples) / count, 3) if count else None,
+            "missing_date_rate": round(sum(not s[2] for s in samples) / count, 3) if count else None,
+            "body_length_p10": _percentile(lengths, 0.1),
+            "body_length_p50": _percentile(lengths, 0.5),
+            "body_length_p90": _percentile(lengths, 0.9),
+            "fetch_failure_rate": round(sum(fetches) / len(fetches), 3) if fetches else None,
+            "empty_listings": self.empty_listings,
+        }
+
+    def failing_selectors(self):
+        """Returns readable descriptions of the selectors that come back empty."""
+        lines = []
+        for field, selectors, empty, total in self.failing:
+            if field == "links":
+                described = ", ".join(f"{k} {v!r}" for k, v in selectors.items() if v) or "listing selectors"
+            elif field == "body":
+                described = ", ".join(f"{k} {selectors[k]!r}" for k in ("body", "elements") if selectors.get(k))
+            else:
+                described = f"{field} {selectors.get(field)!r}" if selectors.get(field) else field
+            lines.append(f"{described or field}: empty in {empty} of {total}")
+        return lines
+
+    def report(self):
+        lines = [f"{self.key}: circuit breaker {self.state}" + (f", {self.reason}" if self.reason else "")]
+        if self.state == OPEN:
+            lines.append(f"  paused until {time.ctime(self.opened_at + self.cooldown)} "
+                         f"(python -m src.engine.health reset {self.key} to resume now)")
+        failing = self.failing_selectors()
+        if failing:
+            lines.append("  failing selectors:")
+            lines.extend(f"    {line}" for line in failing)
+        lines.append(f"  metrics: {json.dumps(self.metrics())}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "state": self.state,
+            "opened_at": self.opened_at,
+            "reason": self.reason,
+            "failing_selectors": self.failing_selectors(),
+            "metrics": self.metrics(),
+            "updated_at": time.time(),
+        }
+
+
+def get_health(source):
+    """The SourceHealth of a source, shared by every run in this process."""
+    with _registry_lock:
+        health = _registry.get(source.key)
+        if health is None:
+            health = _registry[source.key] = SourceHealth(source.key)
+        return health
+
+
+def _read(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def restore(health, path=HEALTH_FILE):
+    """Takes over an open breaker saved by an earlier run, so a paused source stays paused."""
+    saved = _read(path).get(health.key)
+    if saved and saved["state"] == OPEN and health.state == CLOSED:
+        with health._lock:
+            health.state = OPEN
+            health.opened_at = saved["opened_at"]
+            health.reason = saved["reason"]
+    return health
+
+
+def save(health, path=HEALTH_FILE):
+    with _registry_lock:
+        report = _read(path)
+        report[health.key] = health.to_dict()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with atomic_write(path) as f:
+            f.write(json.dumps(report, ensure_ascii=False, indent=4).encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or reset the extraction health of sources.")
+    parser.add_argument("--file", default=HEALTH_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("show", help="print the last saved health of every source")
+    reset_parser = commands.add_parser("reset", help="close the breaker of a source, e.g. after fixing its spec")
+    reset_parser.add_argument("source")
+    args = parser.parse_args()
+
+    report = _read(args.file)
+    if args.command == "show":
+        for key, health in sorted(report.items()):
+            print(f"{key}: {health['state']}" + (f", {health['reason']}" if health["reason"] else ""))
+            for line in health["failing_selectors"]:
+                print(f"  {line}")
+            print(f"  {json.dumps(health['metrics'])}")
+    elif args.command == "reset":
+        if args.source not in report:
+            print(f"No saved health for {args.source}")
+            return
+        report[args.source].update({"state": CLOSED, "opened_at": None, "reason": None, "failing_selectors": []})
+        with atomic_write(args.file) as f:
+            f.write(json.dumps(report, ensure_ascii=False, indent=4).encode("utf-8"))
+        print(f"{args.source} resumed")
+
+
+if __name__ == "__main__":
+    main()
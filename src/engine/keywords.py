@@ -0,0 +1,298 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import date
+
+from src.engine.dates import normalize_date
+from src.engine.output import save_articles_to_file
+from src.engine.records import as_dict
+from src.engine.segments import SEGMENT_SUFFIX, list_segments, partition_segments
+from src.engine.stats import iter_output
+
+try:
+    import ahocorasick
+except ImportError:  # optional, see README
+    ahocorasick = None
+
+# Keyword tagging at ingest time. A keyword file maps tags to keywords:
+#
+#   {"nuclear": ["atom", "jądrow", "wzbogaconego uranu", "ядерн"], ...}
+#
+# Every article is matched against all keywords in one pass over its title and
+# body, and the tags of the keywords found are stored in the article's `tags`
+# field and in a SQLite index, so finding the articles of a topic never reads
+# article text:
+#
+#   python -m src.engine.keywords find nuclear --start 2024-05-01 --end 2024-05-31
+#
+# A keyword matches at the start of a word and may be followed by more
+# letters, so "atom" also finds "atomowej" and "atomu"; a keyword can be
+# several words ("jaderná elektrárna"). Matching is case-insensitive and
+# folds ё to е and the Ukrainian apostrophes, like src.engine.tokens.
+# pyahocorasick (pip install pyahocorasick) is used when installed;
+# otherwise the keywords are compiled into one trie-shaped regular
+# expression, which the re module also scans in a single pass.
+
+KEYWORDS_FILE = "keywords.json"
+TAG_INDEX = os.path.join("data", "tags.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    date TEXT,
+    location TEXT NOT NULL,  -- segment or output file holding the article when it was indexed
+    PRIMARY KEY (tag, url)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_by_date ON tags (tag, date);
+CREATE INDEX IF NOT EXISTS tags_by_url ON tags (url);
+"""
+
+
+def fold(text):
+    # str.replace() rather than str.translate(), which is far slower on long texts
+    text = unicodedata.normalize("NFC", text).casefold()
+    return text.replace("ё", "е").replace("’", "'").replace("ʼ", "'")
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+def _trie_pattern(node):
+    # Children of a trie node as alternatives; "" marks the end of a keyword,
+    # after which the rest is optional. Greedy matching finds the longest keyword
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return "(?:" + pattern + ")?" if "" in node else pattern
+
+
+class KeywordMatcher:
+    def __init__(self, keywords):
+        # {folded keyword: set of tags}
+        self.keywords = {}
+        for tag, words in keywords.items():
+            for word in words:
+                word = " ".join(fold(word).split())
+                if word:
+                    self.keywords.setdefault(word, set()).add(tag)
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for word in self.keywords:
+                self._automaton.add_word(word, word)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            trie = {}
+            for word in self.keywords:
+                node = trie
+                for char in word:
+                    node = node.setdefault(char, {})
+                node[""] = {}
+            # The lookahead keeps matches zero-width, so a keyword starting
+            # inside a longer match (a word of a phrase) is found as well
+            self._pattern = re.compile(r"(?<!\w)(?=(" + _trie_pattern(trie) + "))") if trie else None
+            # The keywords found at one position are the prefixes of the
+            # longest one, so every keyword carries the tags of its prefixes
+            self._prefix_tags = {}
+            for word, tags in self.keywords.items():
+                prefix_tags = set(tags)
+                for end in range(1, len(word)):
+                    prefix_tags.update(self.keywords.get(word[:end], ()))
+                self._prefix_tags[word] = frozenset(prefix_tags)
+
+    @classmethod
+    def load(cls, keywords):
+        """A matcher for a {tag: [keywords]} dict or the path of a JSON file holding one."""
+        if isinstance(keywords, KeywordMatcher):
+            return keywords
+        if isinstance(keywords, str):
+            with open(keywords, "r", encoding="utf-8") as f:
+                keywords = json.load(f)
+        return cls(keywords)
+
+    def tags(self, text):
+        """Returns the sorted tags of the keywords found in text."""
+        if not text or not self.keywords:
+            return []
+        text = " ".join(fold(text).split())
+        found = set()
+        if self._automaton is not None:
+            for end, word in self._automaton.iter(text):
+                start = end - len(word) + 1
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    found.update(self.keywords[word])
+        elif self._pattern is not None:
+            for match in set(self._pattern.findall(text)):
+                found.update(self._prefix_tags[match])
+        return sorted(found)
+
+    def tag_articles(self, articles):
+        """Sets the tags of every article (Article records or dicts) from its title and body."""
+        for article in articles:
+            if isinstance(article, dict):
+                title = article.get("title") or article.get("header") or ""
+                tags = self.tags(f"{title}\n{article.get('article_body') or ''}")
+                if tags:
+                    article["tags"] = tags
+                else:
+                    article.pop("tags", None)
+            else:
+                article.tags = self.tags(f"{article.title or ''}\n{article.article_body or ''}")
+        return articles
+
+
+class TagIndex:
+    """Tag -> articles index in a single SQLite file."""
+
+    def __init__(self, path=TAG_INDEX):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+
+    def _db(self):
+        # One connection per thread; runs of several sources share the file
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=60)
+        return db
+
+    def add(self, articles, location):
+        """Indexes the tags of articles stored in `location`; a later location replaces an earlier one.
+
+        The tags an article had before are dropped, so re-tagging it with
+        changed keywords does not leave tags it no longer has.
+        """
+        urls = []
+        rows = []
+        for article in articles:
+            article = as_dict(article)
+            urls.append((article["url"],))
+            for tag in article.get("tags") or ():
+                rows.append((tag, article["url"], article.get("source") or "", normalize_date(article.get("date")), location))
+        db = self._db()
+        with db:
+            db.executemany("DELETE FROM tags WHERE url = ?", urls)
+            db.executemany("INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def find(self, tag, source=None, start_date=None, end_date=None):
+        """Returns (url, source, date, location) rows of the articles tagged `tag`, by date."""
+        query = "SELECT url, source, date, location FROM tags WHERE tag = ?"
+        params = [tag]
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        if start_date:
+            query += " AND date >= ?"
+            params.append(start_date.isoformat())
+        if end_date:
+            query += " AND date <= ?"
+            params.append(end_date.isoformat())
+        return self._db().execute(query + " ORDER BY date, url", params).fetchall()
+
+    def counts(self):
+        return dict(self._db().execute("SELECT tag, COUNT(*) FROM tags GROUP BY tag ORDER BY tag"))
+
+
+def _current_files(location):
+    # A segment merged away by segments.compact() lives on in a newer segment
+    # of the same partition; the newest copy of an article wins
+    if os.path.exists(location):
+        return [location]
+    if location.endswith(SEGMENT_SUFFIX):
+        return list(reversed(partition_segments(os.path.dirname(location))))
+    return []
+
+
+def load_articles(rows):
+    """Reads the indexed articles back, opening only the files they are stored in."""
+    wanted = {}
+    for url, _, _, location in rows:
+        # All segments of a compacted partition resolve to the same files, read once
+        wanted.setdefault(tuple(_current_files(location)), set()).add(url)
+    for files, urls in wanted.items():
+        for path in files:
+            for article in iter_output(path):
+                if article.get("url") in urls:
+                    urls.discard(article["url"])
+                    yield article
+            if not urls:
+                break
+        if urls:
+            print(f"{len(urls)} indexed articles no longer exist, skipped: {sorted(urls)[:3]}")
+
+
+def tag_corpus(matcher, index, segments_root=None, files=(), source_key=None):
+    """Tags and indexes existing segments and output files, e.g. after the keywords changed."""
+    locations = []
+    if segments_root:
+        for paths in list_segments(segments_root, source_key).values():
+            locations.extend(paths)
+    locations.extend(files)
+    total = 0
+    for location in locations:
+        articles = matcher.tag_articles(list(iter_output(location)))
+        total += index.add(articles, location)
+    print(f"Indexed {total} tags of {len(locations)} files in {index.path}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tag articles with keywords and query the tag index.")
+    parser.add_argument("--index", default=TAG_INDEX)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    tag_parser = commands.add_parser("tag", help="tag and index existing segments and output files")
+    tag_parser.add_argument("--keywords", default=KEYWORDS_FILE)
+    tag_parser.add_argument("--segments", help="segment corpus root, e.g. data/segments")
+    tag_parser.add_argument("--source", help="only this source's segments")
+    tag_parser.add_argument("--input", nargs="*", default=[], help="output files to include")
+
+    commands.add_parser("list", help="show tags and their article counts")
+
+    find_parser = commands.add_parser("find", help="list or export the articles with a tag")
+    find_parser.add_argument("tag")
+    find_parser.add_argument("--source", help="registry key (e.g. onet_pl) or source name as written in the output")
+    find_parser.add_argument("--start", type=date.fromisoformat)
+    find_parser.add_argument("--end", type=date.fromisoformat)
+    find_parser.add_argument("--output", help="write the articles to this file instead of listing their URLs")
+
+    args = parser.parse_args()
+    index = TagIndex(args.index)
+
+    if args.command == "tag":
+        tag_corpus(KeywordMatcher.load(args.keywords), index, args.segments, args.input, args.source)
+    elif args.command == "list":
+        for tag, count in index.counts().items():
+            print(f"{tag}: {count} articles")
+    elif args.command == "find":
+        source = args.source
+        if source:
+            from src.engine.registry import available_sources, get_source
+
+            if source in available_sources():
+                source = get_source(source).name  # the name is what the index holds
+        rows = index.find(args.tag, source, args.start, args.end)
+        if args.output:
+            save_articles_to_file(load_articles(rows), args.output)
+            print(f"{len(rows)} articles tagged {args.tag} written to {args.output}")
+        else:
+            for url, source, day, _ in rows:
+                print(f"{day or '-'} {source} {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from src.engine.records import as_dict
+from src.engine.serialize import get_serializer
+
+BATCH_SIZE = 1000
+
+
+def fsync_directory(directory):
+    # Makes a rename inside `directory` durable; not possible on Windows
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(output_file, text=False):
+    """Opens a temporary file that replaces output_file only once it is complete.
+
+    The data is flushed to disk before the rename, so after a crash or power
+    loss output_file holds either its previous or its new content in full,
+    never a truncated mix.
+    """
+    directory = os.path.dirname(os.path.abspath(output_file))
+    tmp_path = f"{output_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "x", encoding="utf-8") if text else open(tmp_path, "xb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(directory)
+
+
+def save_links_to_file(links, field, label, output_file, compact=False, serializer="auto"):
+
+    links_data = {
+        field: label,
+        "links": links,
+        "count": len(links)
+    }
+
+    with atomic_write(output_file) as f:
+        f.write(get_serializer(serializer).dumps(links_data, pretty=not compact))
+
+    print(f"Saved {len(links)} links to {output_file}")
+
+
+def save_articles_to_file(articles, output_file, compact=False, serializer="auto"):
+    # Written a batch at a time, so the whole list is never converted to dicts
+    # at once. A pretty file is the same as json.dump(..., indent=4); a
+    # compact one has one article per line.
+    serializer = get_serializer(serializer)
+    articles = iter(articles)
+    count = 0
+    with atomic_write(output_file) as f:
+        while True:
+            batch = [as_dict(article) for article in islice(articles, BATCH_SIZE)]
+            if not batch:
+                break
+            f.write(b",\n" if count else b"[\n")
+            f.write(serializer.dump_batch(batch, pretty=not compact))
+            count += len(batch)
+        f.write(b"\n]" if count else b"[]")
+
+    print(f"Saved {count} articles to {output_file}")
+    return count
@@ -0,0 +1,86 @@
+import sys
+
+from src.engine.dates import parse_date
+
+
+class Article:
+    """One scraped article.
+
+    Runs keep thousands of these in memory between flushes, so the record is
+    slotted rather than a dict, and the fields that are the same for every
+    article of a source (country, language, source name, title key) are
+    interned and shared instead of copied into each record. `date` is a
+    datetime.date (or None), written out as an ISO-8601 day. `tags` are the
+    keyword tags found at ingest time, see src.engine.keywords.
+    """
+
+    __slots__ = ("country", "language", "source", "url", "query", "title_field", "title", "date", "article_body",
+                 "tags")
+
+    def __init__(self, country, language, source, url, query=None, title_field="title", title=None, date=None,
+                 article_body=None, tags=None):
+        self.country = _intern(country)
+        self.language = _intern(language)
+        self.source = _intern(source)
+        self.url = url
+        self.query = query
+        self.title_field = _intern(title_field)
+        self.title = title
+        self.date = parse_date(date)
+        self.article_body = article_body
+        self.tags = tags
+
+    def items(self):
+        # Same keys, in the same order, as the dicts the scrapers used to write
+        yield "country", self.country
+        yield "language", self.language
+        yield "source", self.source
+        yield "url", self.url
+        day = self.date.isoformat() if self.date else None
+        if self.query is None:
+            yield "date", day
+        else:
+            yield "query", self.query
+        if self.title:
+            yield self.title_field, self.title
+        if self.query is not None and day:
+            yield "date", day
+        if self.article_body:
+            yield "article_body", self.article_body
+        if self.tags:
+            yield "tags", self.tags
+
+    def to_dict(self):
+        return dict(self.items())
+
+    @classmethod
+    def from_dict(cls, data):
+        title_field = "header" if "header" in data else "title"
+        return cls(
+            data.get("country"), data.get("language"), data.get("source"), data.get("url"),
+            query=data.get("query"), title_field=title_field, title=data.get(title_field),
+            date=data.get("date"), article_body=data.get("article_body"), tags=data.get("tags"),
+        )
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def as_dict(article):
+    # Output code accepts both records and plain dicts read back from JSON
+    return article.to_dict() if isinstance(article, Article) else article
+
+
+def build_record(source, unit, link, title, date, body):
+    return Article(
+        source.country,
+        source.language,
+        source.name,
+        link["url"],
+        query=None if source.mode == "by_date" else unit,
+        title_field=source.title_field,
+        title=title or None,
+        date=date or link["date"],
+        article_body=body or None,
+    )
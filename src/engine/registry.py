@@ -0,0 +1,71 @@
+import importlib
+
+# Every scraper the engine can run, by key. Built-in scrapers are listed here
+# with enough metadata for menus, so nothing is imported until a scraper is
+# actually used. Other packages can add scrapers by declaring an entry point
+# in the "article_scraper.sources" group that points at their Source object,
+# e.g. in their pyproject.toml:
+#
+#   [project.entry-points."article_scraper.sources"]
+#   delfi_lt = "delfi_scraper:SOURCE"
+#
+# Plugins are loaded when the registry is first listed, since their metadata
+# lives on the Source itself.
+
+ENTRY_POINT_GROUP = "article_scraper.sources"
+
+BUILTIN_SOURCES = {
+    "aktualne_cz": {"label": "aktualne.cz", "country": "Czech Republic", "mode": "by_query",
+                    "module": "src.scrapers.aktualne_cz_scraper"},
+    "iz_ru": {"label": "iz.ru", "country": "Russia", "mode": "by_query",
+              "module": "src.scrapers.iz_ru_scraper"},
+    "pravda_ua": {"label": "pravda.ua", "country": "Ukraine", "mode": "by_date",
+                  "module": "src.scrapers.pravda_ua_scraper"},
+    "aktuality_sk": {"label": "aktuality.sk", "country": "Slovakia", "mode": "by_query",
+                     "module": "src.scrapers.aktuality_sk_scraper"},
+    "blikk_hu": {"label": "blikk.hu", "country": "Hungary", "mode": "by_date",
+                 "module": "src.scrapers.blikk_hu_scraper"},
+    "onet_pl": {"label": "onet.pl", "country": "Poland", "mode": "by_date",
+                "module": "src.scrapers.onet_pl_scraper"},
+}
+
+_sources = {}
+_plugins = None
+
+
+def _plugin_entries():
+    global _plugins
+    if _plugins is None:
+        from importlib.metadata import entry_points  # slow to import, only needed to list plugins
+
+        _plugins = {}
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                source = entry_point.load()
+            except Exception as e:
+                print(f"Could not load scraper plugin {entry_point.name}: {e}")
+                continue
+            source.key = source.key or entry_point.name
+            _sources[source.key] = source
+            _plugins[source.key] = {
+                "label": source.name, "country": source.country, "mode": source.mode, "module": entry_point.value,
+            }
+    return _plugins
+
+
+def available_sources():
+    """Returns {key: {"label", "country", "mode", "module"}} for built-in and plugin scrapers."""
+    entries = dict(BUILTIN_SOURCES)
+    entries.update(_plugin_entries())
+    return entries
+
+
+def get_source(key):
+    """Returns the Source registered under key, importing its module on first use."""
+    if key not in _sources:
+        entry = BUILTIN_SOURCES.get(key) or _plugin_entries().get(key)
+        if entry is None:
+            raise KeyError(f"Unknown source {key}, available: {', '.join(sorted(available_sources()))}")
+        if key not in _sources:  # plugins are loaded by _plugin_entries()
+            _sources[key] = importlib.import_module(entry["module"]).SOURCE
+    return _sources[key]
@@ -0,0 +1,394 @@
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+from src.engine.fetch import NotModified, describe_error
+from src.engine.records import as_dict, build_record
+from src.engine.segments import list_segments, new_run_id, write_segment
+from src.engine.source import load_source
+from src.engine.stats import iter_output
+
+# Revision tracking for articles that are edited after publication.
+#
+# Every tracked URL keeps its latest version in full (the article record,
+# compressed), a hash of its text, and the ETag / Last-Modified of its last
+# response. Older versions are stored as reverse deltas, the line operations
+# that turn a version back into the one before it, so an edit costs about the
+# size of the lines that changed and the current version is read directly:
+#
+#   python -m src.engine.revisions add --segments data/segments
+#   python -m src.engine.revisions check onet_pl --days 3 --workers 8
+#   python -m src.engine.revisions changes --since 2024-05-13
+#   python -m src.engine.revisions history https://wiadomosci.onet.pl/...
+#
+# A check re-fetches recent articles with a conditional GET, so an unchanged
+# page usually costs a 304 and nothing else. Sites that answer every request
+# in full are compared by a hash of the extracted title and body, with
+# whitespace collapsed, so changes in ads or markup around the text are not
+# counted as revisions.
+
+REVISIONS_FILE = os.path.join("data", "revisions.sqlite")
+CHECK_DAYS = 3         # articles first seen this many days ago or less are re-checked
+MIN_CHECK_AGE = 3600   # seconds before the same URL is checked again
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    source TEXT NOT NULL,  -- Source.key
+    unit TEXT NOT NULL,    -- Source.encode_unit()
+    hash TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    record BLOB NOT NULL,  -- latest version, zlib-compressed JSON
+    etag TEXT,
+    last_modified TEXT,
+    first_seen REAL NOT NULL,
+    checked_at REAL NOT NULL,
+    changed_at REAL
+);
+CREATE INDEX IF NOT EXISTS articles_to_check ON articles (source, first_seen, checked_at);
+CREATE TABLE IF NOT EXISTS revisions (
+    url TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    saved_at REAL NOT NULL,  -- when this version was first seen
+    delta BLOB NOT NULL,   -- turns revision + 1 back into this revision
+    PRIMARY KEY (url, revision)
+) WITHOUT ROWID;
+"""
+
+
+def article_text(record):
+    title = record.get("title") or record.get("header") or ""
+    return f"{title}\n{record.get('article_body') or ''}"
+
+
+def content_hash(record):
+    text = " ".join(article_text(record).split())
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob))
+
+
+def make_delta(new_text, old_text):
+    """Returns the operations that rebuild old_text from new_text, line by line."""
+    new_lines = new_text.splitlines(keepends=True)
+    old_lines = old_text.splitlines(keepends=True)
+    operations = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, new_lines, old_lines, autojunk=False).get_opcodes():
+        if tag == "equal":
+            operations.append([i1, i2])
+        elif j1 < j2:
+            operations.append("".join(old_lines[j1:j2]))
+    return operations
+
+
+def apply_delta(new_text, operations):
+    new_lines = new_text.splitlines(keepends=True)
+    return "".join("".join(new_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in operations)
+
+
+class RevisionStore:
+    """Latest versions, hashes, validators and reverse deltas of tracked articles, in one SQLite file."""
+
+    def __init__(self, path=REVISIONS_FILE):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+
+    def _db(self):
+        # One connection per thread; checks run on a thread pool
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=60)
+            self._local.validators = {}
+        return db
+
+    # Validators, see src.engine.fetch.fetch()
+
+    def request_headers(self, url):
+        row = self._db().execute("SELECT etag, last_modified FROM articles WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def store(self, url, response_headers):
+        # Kept until observe() saves the version they belong to
+        self._db()
+        self._local.validators[url] = (response_headers.get("ETag"), response_headers.get("Last-Modified"))
+
+    # Versions
+
+    def observe(self, source_key, unit, article, now=None):
+        """Saves a version of an article; returns its revision number if it is new or changed, else None."""
+        record = as_dict(article)
+        url = record["url"]
+        now = now or time.time()
+        digest = content_hash(record)
+        db = self._db()
+        etag, last_modified = self._local.validators.pop(url, (None, None))
+        with db:
+            row = db.execute(
+                "SELECT hash, revision, record, COALESCE(changed_at, first_seen) FROM articles WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                db.execute(
+                    "INSERT INTO articles (url, source, unit, hash, revision, record, etag, last_modified, first_seen,"
+                    " checked_at) VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?, ?)",
+                    (url, source_key, unit, digest, _pack(record), etag, last_modified, now, now),
+                )
+                return 0
+            old_hash, revision, old_record, old_saved_at = row
+            if old_hash == digest:
+                db.execute(
+                    "UPDATE articles SET checked_at = ?, etag = COALESCE(?, etag),"
+                    " last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                    (now, etag, last_modified, url),
+                )
+                return None
+            old_record = _unpack(old_record)
+            # The old version becomes a delta against the new one; fields
+            # other than the text are kept whole, they are small. The title
+            # is kept whole too, it may itself contain line breaks
+            title_field = "header" if "header" in old_record else "title"
+            delta = {
+                "text": make_delta(article_text(record), article_text(old_record)),
+                "fields": {k: v for k, v in old_record.items() if k not in ("title", "header", "article_body")},
+                "title_field": title_field,
+                "title": old_record.get(title_field) or "",
+            }
+            db.execute(
+                "INSERT INTO revisions VALUES (?, ?, ?, ?, ?)", (url, revision, old_hash, old_saved_at, _pack(delta))
+            )
+            db.execute(
+                "UPDATE articles SET hash = ?, revision = ?, record = ?, etag = ?, last_modified = ?, checked_at = ?,"
+                " changed_at = ? WHERE url = ?",
+                (digest, revision + 1, _pack(record), etag, last_modified, now, now, url),
+            )
+            return revision + 1
+
+    def checked(self, url, now=None):
+        self._local.validators.pop(url, None)
+        with self._db() as db:
+            db.execute("UPDATE articles SET checked_at = ? WHERE url = ?", (now or time.time(), url))
+
+    def due(self, source_key, days=CHECK_DAYS, min_age=MIN_CHECK_AGE, limit=None, now=None):
+        """Returns (url, unit) of the articles of a source first seen in the last `days` and not checked recently."""
+        now = now or time.time()
+        query = (
+            "SELECT url, unit FROM articles WHERE source = ? AND first_seen >= ? AND checked_at <= ?"
+            " ORDER BY checked_at"
+        )
+        params = [source_key, now - days * 86400, now - min_age]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self._db().execute(query, params).fetchall()
+
+    def versions(self, url):
+        """Returns [(revision, saved_at, record)] of every stored version of url, newest first."""
+        db = self._db()
+        row = db.execute(
+            "SELECT revision, changed_at, first_seen, record FROM articles WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return []
+        revision, changed_at, first_seen, record = row
+        record = _unpack(record)
+        versions = [(revision, changed_at or first_seen, record)]
+        text = article_text(record)
+        rows = db.execute(
+            "SELECT revision, saved_at, delta FROM revisions WHERE url = ? ORDER BY revision DESC", (url,)
+        )
+        for revision, saved_at, delta in rows:
+            delta = _unpack(delta)
+            text = apply_delta(text, delta["text"])
+            title = delta["title"]
+            body = text[len(title) + 1:]
+            old_record = dict(delta["fields"])
+            if title:
+                old_record[delta["title_field"]] = title
+            if body:
+                old_record["article_body"] = body
+            versions.append((revision, saved_at, old_record))
+        return versions
+
+    def changes(self, since=0, source_key=None):
+        """Returns (url, source, revision, changed_at) of the articles changed after `since` (a timestamp)."""
+        query = "SELECT url, source, revision, changed_at FROM articles WHERE changed_at >= ?"
+        params = [since]
+        if source_key:
+            query += " AND source = ?"
+            params.append(source_key)
+        return self._db().execute(query + " ORDER BY changed_at", params).fetchall()
+
+    def counts(self):
+        db = self._db()
+        return {
+            "articles": db.execute("SELECT COUNT(*) FROM articles").fetchone()[0],
+            "changed": db.execute("SELECT COUNT(*) FROM articles WHERE revision > 0").fetchone()[0],
+            "revisions": db.execute("SELECT COUNT(*) FROM revisions").fetchone()[0],
+            "delta_bytes": db.execute("SELECT COALESCE(SUM(LENGTH(delta)), 0) FROM revisions").fetchone()[0],
+        }
+
+
+def track(store, source, unit, articles):
+    """Saves the articles of one day or query of a run; returns how many of them changed."""
+    unit = source.encode_unit(unit)
+    return sum(1 for article in articles if store.observe(source.key, unit, article))
+
+
+def add_segments(store, segments_root, source_key=None):
+    """Starts tracking the articles of the segment corpus, without downloading anything."""
+    added = 0
+    for directory, paths in list_segments(segments_root, source_key).items():
+        source_key_of_partition = os.path.basename(os.path.dirname(directory))
+        # Partition names are unit keys: the ISO day, or the quoted query
+        unit = unquote(os.path.basename(directory))
+        for path in paths:
+            for article in iter_output(path):
+                if store.observe(source_key_of_partition, unit, article) == 0:
+                    added += 1
+    print(f"Tracking {added} more articles in {store.path}")
+    return added
+
+
+def _check_one(store, source, url, unit):
+    # "unchanged", "changed" or "failed", and the changed record
+    try:
+        content = source.fetch(url, store)
+    except NotModified:
+        store.checked(url)
+        return "unchanged", None
+    except Exception as e:
+        print(f"Failed to re-check {url}: {describe_error(e)}")
+        store.checked(url)  # so a broken URL does not stay first in line for every check
+        return "failed", None
+    try:
+        title, date, body = source.parse_article(url, content)
+    except Exception as e:
+        print(f"Failed to parse {url}: {e}")
+        store.checked(url)
+        return "failed", None
+    if not any([title, body]):
+        # A page that lost its text is more likely a broken fetch than an edit
+        store.checked(url)
+        return "unchanged", None
+    # Archive links are dated by their day, as in a run
+    link = {"url": url, "date": unit if source.mode == "by_date" else None}
+    record = build_record(source, source.decode_unit(unit), link, title, date, body)
+    if store.observe(source.key, unit, record):
+        return "changed", record
+    return "unchanged", None
+
+
+def check(store, source, days=CHECK_DAYS, min_age=MIN_CHECK_AGE, workers=1, limit=None, segments=None):
+    """Re-fetches the recent articles of a source and saves the ones that changed.
+
+    Changed versions are also added to the segment corpus when `segments`
+    is given, where they replace the older version. Returns
+    {"unchanged": n, "changed": n, "failed": n}.
+    """
+    due = store.due(source.key, days, min_age, limit)
+    print(f"Re-checking {len(due)} articles of {source.key}")
+    if source.max_concurrency:
+        workers = min(workers, source.max_concurrency)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda row: _check_one(store, source, *row), due))
+    else:
+        results = [_check_one(store, source, url, unit) for url, unit in due]
+
+    counts = {"unchanged": 0, "changed": 0, "failed": 0}
+    changed = {}
+    for (url, unit), (outcome, record) in zip(due, results):
+        counts[outcome] += 1
+        if record is not None:
+            print(f"Changed: {url}")
+            changed.setdefault(unit, []).append(record)
+    if segments and changed:
+        run_id = new_run_id()
+        for unit, records in changed.items():
+            write_segment(segments, source, source.decode_unit(unit), records, run_id)
+    print(f"{source.key}: {counts['changed']} changed, {counts['unchanged']} unchanged, {counts['failed']} failed")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track edits of articles after publication.")
+    parser.add_argument("--db", default=REVISIONS_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="track the articles of the segment corpus")
+    add_parser.add_argument("--segments", default=os.path.join("data", "segments"))
+    add_parser.add_argument("--source")
+
+    check_parser = commands.add_parser("check", help="re-fetch recent articles and save the changed ones")
+    check_parser.add_argument("sources", nargs="+")
+    check_parser.add_argument("--days", type=float, default=CHECK_DAYS,
+                              help="re-check articles first seen this recently")
+    check_parser.add_argument("--min-age", type=float, default=MIN_CHECK_AGE,
+                              help="seconds since an article's last check")
+    check_parser.add_argument("--limit", type=int, help="at most this many articles per source")
+    check_parser.add_argument("--workers", type=int, default=1)
+    check_parser.add_argument("--segments", help="add changed versions to this segment corpus")
+
+    changes_parser = commands.add_parser("changes", help="list articles that changed")
+    changes_parser.add_argument("--since", help="YYYY-MM-DD")
+    changes_parser.add_argument("--source")
+
+    history_parser = commands.add_parser("history", help="show the stored versions of an article")
+    history_parser.add_argument("url")
+    history_parser.add_argument("--diff", action="store_true", help="print the changes between versions")
+
+    commands.add_parser("status", help="show how many articles and revisions are stored")
+
+    args = parser.parse_args()
+    store = RevisionStore(args.db)
+
+    if args.command == "add":
+        add_segments(store, args.segments, args.source)
+    elif args.command == "check":
+        for key in args.sources:
+            check(store, load_source(key), args.days, args.min_age, args.workers, args.limit, args.segments)
+    elif args.command == "changes":
+        since = time.mktime(time.strptime(args.since, "%Y-%m-%d")) if args.since else 0
+        for url, source, revision, changed_at in store.changes(since, args.source):
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(changed_at))} {source} r{revision} {url}")
+    elif args.command == "history":
+        versions = store.versions(args.url)
+        if not versions:
+            print(f"{args.url} is not tracked")
+        for i, (revision, saved_at, record) in enumerate(versions):
+            title = record.get("title") or record.get("header") or ""
+            print(f"r{revision} {time.strftime('%Y-%m-%d %H:%M', time.localtime(saved_at))} {title}")
+            if args.diff and i + 1 < len(versions):
+                older = article_text(versions[i + 1][2]).splitlines(keepends=True)
+                print("".join(difflib.unified_diff(older, article_text(record).splitlines(keepends=True), n=1)))
+    elif args.command == "status":
+        print(json.dumps(store.counts(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
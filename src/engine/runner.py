@@ -0,0 +1,233 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from src.engine.checkpoint import Checkpoint
+from src.engine.deadletter import DeadLetterStore, dead_letter_path
+from src.engine.fetch import cancel_all, describe_error, reset_cancel
+from src.engine.health import OPEN, get_health
+from src.engine.output import save_articles_to_file
+from src.engine.records import build_record
+from src.engine.segments import new_run_id, write_segment
+
+
+def date_range(start_date, end_date):
+    current_date = start_date
+    while current_date <= end_date:
+        yield current_date
+        current_date += timedelta(days=1)
+
+
+def _failed(source, unit, link, error, dead_letters):
+    # Failed articles go to the dead-letter store rather than into the output
+    print(f"Failed to fetch {link['url']}: {describe_error(error)}: {error}")
+    get_health(source).observe_failure()
+    if dead_letters is not None:
+        dead_letters.record(source, unit, link, error)
+    return None
+
+
+def _record(source, unit, link, title, date, body, dead_letters):
+    if dead_letters is not None:
+        # Failed in an earlier run, so a retry pass must not add it a second time
+        dead_letters.recovered(source.key, link["url"])
+    # Observed before empty records are skipped, so a broken selector shows up
+    get_health(source).observe(title, date or link["date"], body, source.article_selectors(link["url"]))
+    if source.skip_empty and not any([title, body]):
+        print(f"No title or body found for {link['url']}, skipping this article")
+        return None
+    return build_record(source, unit, link, title, date, body)
+
+
+def scrape_link(source, unit, link, dead_letters=None):
+    if get_health(source).paused():
+        return None
+    url = link["url"]
+    print(f"Fetching article: {url}")
+    try:
+        title, date, body = source.parse_article(url, source.fetch(url))
+    except Exception as e:
+        return _failed(source, unit, link, e, dead_letters)
+    return _record(source, unit, link, title, date, body, dead_letters)
+
+
+async def scrape_link_async(source, unit, link, fetcher, dead_letters=None):
+    if get_health(source).paused():
+        return None
+    url = link["url"]
+    print(f"Fetching article: {url}")
+    try:
+        content = await source.fetch_async(fetcher, url)
+        # Parsing is CPU-bound; a worker thread keeps the event loop free for I/O
+        title, date, body = await asyncio.to_thread(source.parse_article, url, content)
+    except Exception as e:
+        return _failed(source, unit, link, e, dead_letters)
+    return _record(source, unit, link, title, date, body, dead_letters)
+
+
+async def scrape_links_async(source, unit, links, workers, dead_letters=None, library="auto"):
+    from src.engine.async_fetch import AsyncFetcher
+
+    in_flight = asyncio.Semaphore(workers)
+
+    async def scrape(fetcher, link):
+        async with in_flight:
+            return await scrape_link_async(source, unit, link, fetcher, dead_letters)
+
+    # A run talks to one site, so the source's cap doubles as the per-host cap
+    async with AsyncFetcher(library, per_host=source.max_concurrency or workers) as fetcher:
+        return await asyncio.gather(*(scrape(fetcher, link) for link in links))
+
+
+def scrape_links(source, unit, links, workers=1, dead_letters=None, backend="threads"):
+    if backend != "threads":
+        # "async" uses whichever of httpx and aiohttp is installed
+        library = "auto" if backend == "async" else backend
+        records = asyncio.run(scrape_links_async(source, unit, links, workers, dead_letters, library))
+    elif workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                records = list(pool.map(lambda link: scrape_link(source, unit, link, dead_letters), links))
+            except KeyboardInterrupt:
+                # Abort downloads in flight instead of waiting for their deadlines
+                cancel_all()
+                pool.shutdown(cancel_futures=True)
+                raise
+    else:
+        records = [scrape_link(source, unit, link, dead_letters) for link in links]
+    return [record for record in records if record is not None]
+
+
+def scrape_unit(source, unit, workers=1, dead_letters=None, backend="threads", start_date=None, end_date=None):
+    """Collects and scrapes the articles of one day or query."""
+    print(f"\nProcessing {source.unit_field}: {source.unit_label(unit)}")
+    links = source.collect_links(unit, start_date, end_date)
+    if source.mode == "by_date":
+        # An archive day without a single link means the listing selectors broke;
+        # a query without results is common
+        get_health(source).observe_listing(len(links), source.listing_selectors())
+    return scrape_links(source, unit, links, workers, dead_letters, backend)
+
+
+def run_source(source, units, output_file, workers=1, frontier=None, dead_letters=None, compact=False,
+               segments=None, backend="threads", start_date=None, end_date=None, stats=None, keywords=None,
+               tag_index=None, revisions=None, health=None):
+    """Scrapes every unit (day or query) of a source into output_file.
+
+    Finished units are checkpointed (src.engine.checkpoint), so re-running an
+    interrupted run resumes it; failed articles go to `dead_letters`
+    (src.engine.deadletter). Every other option is described in the module
+    that implements it: frontier, segments, async_fetch (backend), stats,
+    keywords (keywords, tag_index), revisions and health.
+    """
+    reset_cancel()  # a Ctrl+C during an earlier run in this process must not abort this one
+    if source.max_concurrency:
+        workers = min(workers, source.max_concurrency)
+    if frontier:
+        from src.engine.frontier import run_with_frontier
+
+        unsupported = {
+            "dead_letters": dead_letters, "segments": segments, "stats": stats, "keywords": keywords,
+            "tag_index": tag_index, "revisions": revisions, "backend": backend != "threads",
+        }
+        unsupported = [name for name, value in unsupported.items() if value]
+        if unsupported:
+            raise ValueError(f"{', '.join(unsupported)} cannot be combined with frontier")
+        return run_with_frontier(source, units, output_file, frontier, workers, compact, start_date, end_date, health)
+
+    dead_letters = DeadLetterStore(dead_letters or dead_letter_path(output_file))
+    checkpoint = Checkpoint(output_file)
+    run_id = new_run_id()
+    all_articles = []
+    matcher = index = None
+    if keywords:
+        from src.engine.keywords import KeywordMatcher, TagIndex
+
+        matcher = KeywordMatcher.load(keywords)
+        index = TagIndex(tag_index) if tag_index else None
+    revision_store = None
+    if revisions:
+        from src.engine.revisions import RevisionStore, track
+
+        revision_store = RevisionStore(revisions)
+    source_health = get_health(source)
+    if health:
+        from src.engine.health import restore
+
+        restore(source_health, health)
+    paused = False
+
+    for unit in units:
+        unit_articles = checkpoint.load(source, unit)
+        if unit_articles is None:
+            if source_health.paused():
+                paused = True
+                break
+            unit_articles = scrape_unit(source, unit, workers, dead_letters, backend, start_date, end_date)
+            if source_health.state == OPEN:
+                # Tripped during this unit: it stays unfinished, to be scraped once the source works again
+                paused = True
+                break
+            if matcher:
+                matcher.tag_articles(unit_articles)
+            location = output_file
+            if segments:
+                location = write_segment(segments, source, unit, unit_articles, run_id)
+            if index:
+                index.add(unit_articles, location)
+            if revision_store:
+                track(revision_store, source, unit, unit_articles)
+            checkpoint.save(source, unit, unit_articles)
+        else:
+            print(f"\n{source.unit_label(unit)} already scraped, {len(unit_articles)} articles loaded from {checkpoint.path}")
+        all_articles.extend(unit_articles)
+
+    save_articles_to_file(all_articles, output_file, compact=compact)
+    if paused:
+        print(f"\n{source.key} is paused by its circuit breaker. Finished units are kept in {checkpoint.path}, "
+              "run the same command again to resume.")
+    else:
+        checkpoint.clear()
+    if health:
+        from src.engine.health import save
+
+        save(source_health, health)
+    if stats and segments:
+        from src.engine.stats import update_stats
+
+        update_stats(stats, segments, source_key=source.key)
+
+    print(f"\nEnd of scraping. All articles saved to {output_file}")
+    failed = dead_letters.summary(source.key)
+    if failed:
+        print(f"Failed articles by error: {failed}, recorded in {dead_letters.path}")
+    return all_articles
+
+
+async def run_source_async(source, units, output_file, **options):
+    """run_source() for asyncio callers; the run itself happens on a worker thread."""
+    return await asyncio.to_thread(run_source, source, units, output_file, **options)
+
+
+async def run_sources_async(jobs, parallel=4):
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def run(job):
+        async with semaphore:
+            return await run_source_async(job["source"], job["units"], job["output_file"], **job.get("options", {}))
+
+    results = await asyncio.gather(*(run(job) for job in jobs), return_exceptions=True)
+    for job, result in zip(jobs, results):
+        if isinstance(result, Exception):
+            print(f"Run of {job['source'].key} failed: {result}")
+    return results
+
+
+def run_sources(jobs, parallel=4):
+    """Runs several sources at once, at most `parallel` at a time.
+
+    Each job is {"source": Source, "units": [...], "output_file": ...,
+    "options": {...}}; options are passed on to run_source(). Returns the
+    articles (or the exception) of every job, in order.
+    """
+    return asyncio.run(run_sources_async(jobs, parallel))
@@ -0,0 +1,216 @@
+import argparse
+import heapq
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import date, datetime, timezone
+from itertools import islice
+
+from src.engine.dates import in_range, normalize_date
+from src.engine.output import atomic_write, save_articles_to_file
+from src.engine.records import as_dict
+from src.engine.serialize import get_serializer
+
+# Every run can also append its articles to a corpus of segments that is never
+# overwritten, one JSON-lines file per source, day or query and run:
+#
+#   <root>/<source>/<partition>/<run_id>.jsonl
+#
+# The partition is the day (2024-05-13) for by_date sources and the query for
+# by_query sources. Run ids sort chronologically, so when the same URL shows up
+# in several segments the newest one wins. compact() merges the segments of a
+# partition into one sorted, deduplicated segment, and export() merges any
+# number of partitions into one output file; both sort externally, holding at
+# most `max_records` articles in memory. Dates are ISO-8601 days, so an export
+# limited to a date range skips whole day partitions by name and compares the
+# dates of query partitions as strings.
+
+SEGMENT_SUFFIX = ".jsonl"
+COMPACTED_SUFFIX = ".compacted.jsonl"
+MAX_RECORDS = 100_000
+DAY_PARTITION = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def new_run_id():
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f") + f"-{os.getpid()}"
+
+
+def partition_dir(root, source, unit):
+    return os.path.join(root, source.key, source.unit_key(unit))
+
+
+def write_segment(root, source, unit, articles, run_id):
+    """Writes the articles of one day or query as a new segment; returns its path."""
+    directory = partition_dir(root, source, unit)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, run_id + SEGMENT_SUFFIX)
+    dumps = get_serializer().dumps
+    with atomic_write(path) as f:
+        for article in articles:
+            f.write(dumps(as_dict(article), pretty=False) + b"\n")
+    return path
+
+
+def partition_segments(directory):
+    """Returns the segment paths of one partition directory, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX))
+    return [os.path.join(directory, name) for name in names]
+
+
+def list_segments(root, source_key=None):
+    """Returns {partition directory: [segment paths, oldest first]}."""
+    partitions = {}
+    sources = [source_key] if source_key else sorted(os.listdir(root)) if os.path.isdir(root) else []
+    for source in sources:
+        source_dir = os.path.join(root, source)
+        if not os.path.isdir(source_dir):
+            continue
+        for partition in sorted(os.listdir(source_dir)):
+            directory = os.path.join(source_dir, partition)
+            paths = partition_segments(directory)
+            if paths:
+                partitions[directory] = paths
+    return partitions
+
+
+def _read_segment(path, age):
+    # Yields (url, age, article); a lower age is a newer segment
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                article = json.loads(line)
+                yield article.get("url") or "", age, article
+
+
+def _write_run(records, tmp_dir, number):
+    path = os.path.join(tmp_dir, f"run-{number:06d}.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def _read_run(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield tuple(json.loads(line))
+
+
+def merge_segments(paths, tmp_dir, max_records=MAX_RECORDS):
+    """Yields the articles of all segments sorted by URL, newest copy of each URL only.
+
+    `paths` are oldest first. Articles are sorted in runs of at most
+    max_records, spilled to tmp_dir and merged with a heap.
+    """
+    newest_first = list(reversed(paths))
+    records = (record for age, path in enumerate(newest_first) for record in _read_segment(path, age))
+
+    runs = []
+    while True:
+        chunk = list(islice(records, max_records))
+        if not chunk:
+            break
+        chunk.sort(key=lambda record: record[:2])
+        runs.append(_write_run(chunk, tmp_dir, len(runs)))
+        del chunk
+
+    previous_url = None
+    for url, _, article in heapq.merge(*(_read_run(path) for path in runs), key=lambda record: record[:2]):
+        if url != previous_url or not url:
+            yield article
+        previous_url = url
+
+
+def compact(root, source_key=None, max_records=MAX_RECORDS):
+    """Merges the segments of every partition into one; returns the number of partitions compacted."""
+    compacted = 0
+    dumps = get_serializer().dumps
+    for directory, paths in list_segments(root, source_key).items():
+        if len(paths) < 2:
+            continue
+        # Named after the newest input, so segments written later still sort after it
+        newest = os.path.basename(paths[-1])
+        target = os.path.join(directory, newest[: -len(SEGMENT_SUFFIX)].replace(".compacted", "") + COMPACTED_SUFFIX)
+        count = 0
+        tmp_dir = tempfile.mkdtemp(dir=directory)
+        try:
+            with atomic_write(target) as f:
+                for article in merge_segments(paths, tmp_dir, max_records):
+                    f.write(dumps(article, pretty=False) + b"\n")
+                    count += 1
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        for path in paths:
+            if path != target:
+                os.remove(path)
+        print(f"Compacted {len(paths)} segments of {directory} into {count} articles")
+        compacted += 1
+    return compacted
+
+
+def _partition_in_range(directory, start_date, end_date):
+    name = os.path.basename(directory)
+    return not DAY_PARTITION.match(name) or in_range(name, start_date, end_date)
+
+
+def export(root, output_file, source_key=None, max_records=MAX_RECORDS, compact_output=False, start_date=None,
+           end_date=None):
+    """Writes all articles of the corpus (or of one source) to output_file, sorted and deduplicated by URL.
+
+    With start_date and/or end_date only articles dated in that range (and
+    undated ones) are written.
+    """
+    paths = [
+        path for directory, segments in list_segments(root, source_key).items()
+        if _partition_in_range(directory, start_date, end_date) for path in segments
+    ]
+    # Run ids order segments across partitions too
+    paths.sort(key=os.path.basename)
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_file)))
+    try:
+        articles = merge_segments(paths, tmp_dir, max_records)
+        if start_date or end_date:
+            # normalize_date() also reads segments written before dates were ISO
+            articles = (a for a in articles if in_range(normalize_date(a.get("date")), start_date, end_date))
+        return save_articles_to_file(articles, output_file, compact=compact_output)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact and export the segment corpus written by runs.")
+    parser.add_argument("--root", default=os.path.join("data", "segments"))
+    parser.add_argument("--max-records", type=int, default=MAX_RECORDS, help="articles held in memory while sorting")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="show partitions and their segment counts")
+    list_parser.add_argument("--source")
+
+    compact_parser = commands.add_parser("compact", help="merge the segments of every partition into one")
+    compact_parser.add_argument("--source")
+
+    export_parser = commands.add_parser("export", help="merge segments into one sorted, deduplicated JSON file")
+    export_parser.add_argument("--source")
+    export_parser.add_argument("--output", required=True)
+    export_parser.add_argument("--compact", action="store_true", help="one article per line instead of indented JSON")
+    export_parser.add_argument("--start", type=date.fromisoformat, help="earliest article date (YYYY-MM-DD)")
+    export_parser.add_argument("--end", type=date.fromisoformat, help="latest article date (YYYY-MM-DD)")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for directory, paths in list_segments(args.root, args.source).items():
+            print(f"{directory}: {len(paths)} segments")
+    elif args.command == "compact":
+        print(f"Compacted {compact(args.root, args.source, args.max_records)} partitions")
+    elif args.command == "export":
+        export(args.root, args.output, args.source, args.max_records, args.compact, args.start, args.end)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional, see README
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional, see README
+    msgspec = None
+
+# Output files are JSON in one of two layouts:
+#   pretty   indented by four spaces, as json.dump(..., indent=4) writes it
+#   compact  no indentation, one article per line
+#
+# Serialization goes through orjson or msgspec when one is installed and the
+# standard library otherwise; all of them produce the same bytes. Articles
+# are serialized in batches: dump_batch() returns the batch as it appears
+# inside the output list, without the surrounding brackets.
+
+
+def _strip_brackets(data):
+    # b"[\n    {...},\n    {...}\n]" -> b"    {...},\n    {...}"
+    return data[2:-2]
+
+
+class JsonSerializer:
+    name = "json"
+
+    def dumps(self, obj, pretty=True):
+        if pretty:
+            return json.dumps(obj, ensure_ascii=False, indent=4).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def dump_batch(self, records, pretty=True):
+        if pretty:
+            return _strip_brackets(self.dumps(records))
+        return b",\n".join(self.dumps(record, pretty=False) for record in records)
+
+
+_LEADING_SPACES = re.compile(rb"^( +)", re.MULTILINE)
+
+
+def _is_flat(record):
+    return not any(isinstance(value, (dict, list)) for value in record.values())
+
+
+class OrjsonSerializer:
+    name = "orjson"
+
+    def __init__(self):
+        self.fallback = JsonSerializer()
+
+    def dumps(self, obj, pretty=True):
+        try:
+            if not pretty:
+                return orjson.dumps(obj)
+            data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # e.g. lone surrogates left over from a badly encoded page
+            return self.fallback.dumps(obj, pretty)
+        # orjson only indents by two spaces. Strings never contain a raw
+        # newline, so every leading space is indentation and can be doubled.
+        return _LEADING_SPACES.sub(lambda match: match.group(1) * 2, data)
+
+    def dump_batch(self, records, pretty=True):
+        try:
+            if not pretty:
+                return b",\n".join(orjson.dumps(record) for record in records)
+            if not all(record and _is_flat(record) for record in records):
+                return _strip_brackets(self.dumps(records))
+            # A flat record has one level of indentation, so one replacement
+            # per record re-indents it as an element of the output list
+            return b",\n".join(
+                b"    " + orjson.dumps(record, option=orjson.OPT_INDENT_2)[:-2].replace(b"\n  ", b"\n        ")
+                + b"\n    }"
+                for record in records
+            )
+        except TypeError:
+            return self.fallback.dump_batch(records, pretty)
+
+
+class MsgspecSerializer:
+    name = "msgspec"
+
+    def __init__(self):
+        self.encoder = msgspec.json.Encoder()
+
+    def dumps(self, obj, pretty=True):
+        data = self.encoder.encode(obj)
+        return msgspec.json.format(data, indent=4) if pretty else data
+
+    def dump_batch(self, records, pretty=True):
+        if pretty:
+            return _strip_brackets(self.dumps(records))
+        return b",\n".join(self.encoder.encode(record) for record in records)
+
+
+SERIALIZERS = {
+    "orjson": (OrjsonSerializer, lambda: orjson is not None),
+    "msgspec": (MsgspecSerializer, lambda: msgspec is not None),
+    "json": (JsonSerializer, lambda: True),
+}
+
+
+def available_serializers():
+    return [name for name, (_, available) in SERIALIZERS.items() if available()]
+
+
+def get_serializer(name="auto"):
+    """Returns the named serializer, or the fastest installed one for "auto"."""
+    if name == "auto":
+        name = available_serializers()[0]
+    serializer_class, available = SERIALIZERS[name]
+    if not available():
+        raise ImportError(f"Serializer {name} is not installed")
+    return serializer_class()
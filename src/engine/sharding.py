@@ -0,0 +1,323 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+from datetime import date
+
+from src.engine.deadletter import DeadLetterStore
+from src.engine.health import OPEN, get_health
+from src.engine.output import atomic_write, save_articles_to_file
+from src.engine.records import Article
+from src.engine.runner import date_range, scrape_unit
+from src.engine.source import load_source
+
+# Sharded runs split a date range or query list into work units (one day or
+# one query each) and let any number of worker processes pull them from a
+# queue in a shared work directory:
+#
+#   <work_dir>/plan.json       source, mode and number of units
+#   <work_dir>/queue/          directory queue (pending/, claimed/, done/)
+#   <work_dir>/queue.sqlite    or an SQLite queue
+#   <work_dir>/parts/          one JSON file of articles per finished unit
+#   <work_dir>/failed.jsonl    dead-letter store shared by all workers
+#
+# Workers may run on this machine or on any node that sees the work directory.
+# merge() concatenates the parts in unit order, so the output does not depend
+# on which worker finished first.
+
+
+class DirectoryQueue:
+    """Work queue made of one file per unit; claims are atomic renames."""
+
+    def __init__(self, path):
+        self.path = path
+        for state in ("pending", "claimed", "done"):
+            os.makedirs(os.path.join(path, state), exist_ok=True)
+
+    def _name(self, seq):
+        return f"{seq:06d}.json"
+
+    def put(self, seq, payload):
+        with atomic_write(os.path.join(self.path, "pending", self._name(seq))) as f:
+            f.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def claim(self, worker_id):
+        for name in sorted(os.listdir(os.path.join(self.path, "pending"))):
+            if not name.endswith(".json"):
+                continue
+            claimed = os.path.join(self.path, "claimed", name)
+            try:
+                os.rename(os.path.join(self.path, "pending", name), claimed)
+            except FileNotFoundError:
+                continue  # another worker got there first
+            os.utime(claimed)
+            with open(claimed, "r", encoding="utf-8") as f:
+                return int(name.split(".")[0]), json.load(f)
+        return None
+
+    def complete(self, seq):
+        name = self._name(seq)
+        os.replace(os.path.join(self.path, "claimed", name), os.path.join(self.path, "done", name))
+
+    def release(self, seq):
+        # Hands an unfinished unit back to the queue
+        name = self._name(seq)
+        os.replace(os.path.join(self.path, "claimed", name), os.path.join(self.path, "pending", name))
+
+    def requeue_stale(self, max_age):
+        # Units claimed by workers that died are handed out again
+        requeued = 0
+        now = time.time()
+        for name in os.listdir(os.path.join(self.path, "claimed")):
+            claimed = os.path.join(self.path, "claimed", name)
+            if now - os.path.getmtime(claimed) > max_age:
+                os.replace(claimed, os.path.join(self.path, "pending", name))
+                requeued += 1
+        return requeued
+
+    def counts(self):
+        return {state: len(os.listdir(os.path.join(self.path, state))) for state in ("pending", "claimed", "done")}
+
+
+class SQLiteQueue:
+    """Work queue in a single SQLite file; claims are serialized by the database lock."""
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS units ("
+                "seq INTEGER PRIMARY KEY, payload TEXT NOT NULL, state TEXT NOT NULL DEFAULT 'pending', "
+                "worker TEXT, updated_at REAL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    def put(self, seq, payload):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO units (seq, payload, state, updated_at) VALUES (?, ?, 'pending', ?)",
+                (seq, json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+
+    def claim(self, worker_id):
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT seq, payload FROM units WHERE state = 'pending' ORDER BY seq LIMIT 1").fetchone()
+            if row:
+                db.execute(
+                    "UPDATE units SET state = 'claimed', worker = ?, updated_at = ? WHERE seq = ?",
+                    (worker_id, time.time(), row[0]),
+                )
+            db.execute("COMMIT")
+        finally:
+            db.close()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def complete(self, seq):
+        with self._connect() as db:
+            db.execute("UPDATE units SET state = 'done', updated_at = ? WHERE seq = ?", (time.time(), seq))
+
+    def release(self, seq):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE units SET state = 'pending', worker = NULL, updated_at = ? WHERE seq = ?", (time.time(), seq)
+            )
+
+    def requeue_stale(self, max_age):
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE units SET state = 'pending', worker = NULL WHERE state = 'claimed' AND updated_at < ?",
+                (time.time() - max_age,),
+            )
+            return cursor.rowcount
+
+    def counts(self):
+        with self._connect() as db:
+            rows = dict(db.execute("SELECT state, COUNT(*) FROM units GROUP BY state").fetchall())
+        return {state: rows.get(state, 0) for state in ("pending", "claimed", "done")}
+
+
+def open_queue(work_dir, backend=None):
+    if backend is None:
+        with open(os.path.join(work_dir, "plan.json"), "r", encoding="utf-8") as f:
+            backend = json.load(f)["backend"]
+    if backend == "sqlite":
+        return SQLiteQueue(os.path.join(work_dir, "queue.sqlite"))
+    return DirectoryQueue(os.path.join(work_dir, "queue"))
+
+
+def plan(source_name, units, work_dir, backend="directory", start_date=None, end_date=None):
+    """Writes one work unit per day or query into a fresh queue in work_dir.
+
+    start_date and end_date are the date window of by_query units. A work
+    dir that is not empty is refused: the units and parts of an earlier plan
+    would be merged with the new ones.
+    """
+    if os.path.isdir(work_dir) and os.listdir(work_dir):
+        raise ValueError(f"{work_dir} is not empty, plan into a new work directory")
+    source = load_source(source_name)
+    os.makedirs(os.path.join(work_dir, "parts"), exist_ok=True)
+    queue = open_queue(work_dir, backend)
+
+    window = {}
+    if source.mode == "by_query":
+        window = {
+            "start": start_date.isoformat() if start_date else None,
+            "end": end_date.isoformat() if end_date else None,
+        }
+    units = list(units)
+    for seq, unit in enumerate(units):
+        queue.put(seq, {"source": source_name, "unit": source.encode_unit(unit), **window})
+
+    planned = {"source": source_name, "mode": source.mode, "units": len(units), "backend": backend}
+    with atomic_write(os.path.join(work_dir, "plan.json")) as f:
+        f.write(json.dumps(planned, indent=4).encode("utf-8"))
+
+    print(f"Planned {len(units)} work units for {source_name} in {work_dir}")
+    return len(units)
+
+
+def work(work_dir, workers=1, worker_id=None):
+    """Processes units from the queue until it is empty or the source's circuit breaker opens."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = open_queue(work_dir)
+    dead_letters = DeadLetterStore(os.path.join(work_dir, "failed.jsonl"))
+    sources = {}
+    processed = 0
+
+    while True:
+        claimed = queue.claim(worker_id)
+        if claimed is None:
+            break
+        seq, payload = claimed
+        if payload["source"] not in sources:
+            sources[payload["source"]] = load_source(payload["source"])
+        source = sources[payload["source"]]
+        if get_health(source).paused():
+            queue.release(seq)
+            print(f"{source.key} is paused by its circuit breaker, worker {worker_id} stops")
+            break
+
+        start_date = date.fromisoformat(payload["start"]) if payload.get("start") else None
+        end_date = date.fromisoformat(payload["end"]) if payload.get("end") else None
+        # The same per-source cap as run_source()
+        unit_workers = min(workers, source.max_concurrency) if source.max_concurrency else workers
+        articles = scrape_unit(
+            source, source.decode_unit(payload["unit"]), unit_workers, dead_letters, start_date=start_date,
+            end_date=end_date,
+        )
+        if get_health(source).state == OPEN:
+            # Tripped during this unit: it goes back to the queue rather than into a part
+            queue.release(seq)
+            print(f"{source.key} is paused by its circuit breaker, worker {worker_id} stops")
+            break
+
+        save_articles_to_file(articles, os.path.join(work_dir, "parts", f"{seq:06d}.json"))
+        queue.complete(seq)
+        processed += 1
+
+    print(f"Worker {worker_id} finished after {processed} units")
+    return processed
+
+
+def merge(work_dir, output_file):
+    """Concatenates the finished parts in unit order into output_file."""
+    with open(os.path.join(work_dir, "plan.json"), "r", encoding="utf-8") as f:
+        planned = json.load(f)["units"]
+
+    all_articles = []
+    missing = []
+    for seq in range(planned):
+        part = os.path.join(work_dir, "parts", f"{seq:06d}.json")
+        if not os.path.exists(part):
+            missing.append(seq)
+            continue
+        with open(part, "r", encoding="utf-8") as f:
+            all_articles.extend(Article.from_dict(article) for article in json.load(f))
+
+    if missing:
+        print(f"Warning: {len(missing)} of {planned} units have no output yet: {missing}")
+    save_articles_to_file(all_articles, output_file)
+    return all_articles
+
+
+def run_sharded(source_name, units, output_file, work_dir, processes=2, workers=1, backend="directory",
+                start_date=None, end_date=None):
+    """Plans the units, runs `processes` local workers and merges their output."""
+    plan(source_name, units, work_dir, backend, start_date, end_date)
+
+    context = multiprocessing.get_context("spawn")
+    pool = [context.Process(target=work, args=(work_dir, workers)) for _ in range(processes)]
+    for process in pool:
+        process.start()
+    for process in pool:
+        process.join()
+
+    return merge(work_dir, output_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded scraping: plan work units, run workers, merge results.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = commands.add_parser("plan", help="split a date range or query list into work units")
+    plan_parser.add_argument("source", help="short name (e.g. onet_pl) or module path of the scraper")
+    plan_parser.add_argument("--work-dir", required=True)
+    plan_parser.add_argument("--start", type=date.fromisoformat,
+                             help="first day (YYYY-MM-DD); for by_query sources, the earliest article date")
+    plan_parser.add_argument("--end", type=date.fromisoformat,
+                             help="last day (YYYY-MM-DD); for by_query sources, the latest article date")
+    plan_parser.add_argument("--queries", help="comma-separated queries, by_query sources")
+    plan_parser.add_argument("--backend", choices=["directory", "sqlite"], default="directory")
+
+    work_parser = commands.add_parser("work", help="process units until the queue is empty")
+    work_parser.add_argument("--work-dir", required=True)
+    work_parser.add_argument("--processes", type=int, default=1)
+    work_parser.add_argument("--workers", type=int, default=1, help="article fetch threads per process")
+
+    requeue_parser = commands.add_parser("requeue", help="hand out units claimed by dead workers again")
+    requeue_parser.add_argument("--work-dir", required=True)
+    requeue_parser.add_argument("--max-age", type=float, default=3600, help="seconds since the claim")
+
+    merge_parser = commands.add_parser("merge", help="merge finished parts into one output file")
+    merge_parser.add_argument("--work-dir", required=True)
+    merge_parser.add_argument("--output", required=True)
+
+    args = parser.parse_args()
+
+    if args.command == "plan":
+        source = load_source(args.source)
+        if source.mode == "by_date":
+            if not (args.start and args.end):
+                plan_parser.error(f"{args.source} is scraped by date and needs --start and --end")
+            units = date_range(args.start, args.end)
+        else:
+            units = [q.strip() for q in (args.queries or "").split(",") if q.strip()]
+        try:
+            plan(args.source, units, args.work_dir, args.backend, args.start, args.end)
+        except ValueError as e:
+            plan_parser.error(str(e))
+    elif args.command == "work":
+        if args.processes > 1:
+            context = multiprocessing.get_context("spawn")
+            pool = [context.Process(target=work, args=(args.work_dir, args.workers)) for _ in range(args.processes)]
+            for process in pool:
+                process.start()
+            for process in pool:
+                process.join()
+        else:
+            work(args.work_dir, args.workers)
+    elif args.command == "requeue":
+        print(f"Requeued {open_queue(args.work_dir).requeue_stale(args.max_age)} units")
+    elif args.command == "merge":
+        merge(args.work_dir, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import asyncio
+import importlib
+import threading
+import time
+from datetime import date
+from urllib.parse import quote
+
+import requests
+
+from src.engine.fetch import (
+    DEFAULT_BACKOFF, DEFAULT_MAX_BYTES, DEFAULT_RETRIES, DEFAULT_TIMEOUT, HTML_TYPES, NotModified, fetch_with_retry,
+)
+
+_throttle_lock = threading.Lock()
+
+
+class Source:
+    """One news outlet, as seen by the engine.
+
+    A source turns a unit of work (a day for "by_date" sources, a search query
+    for "by_query" sources) into article links, and a downloaded article page
+    into (title, date, body). Scheduling, fetching, output and checkpointing
+    are handled by src.engine.runner.
+    """
+
+    key = None             # short name used to load the source, e.g. "onet_pl"
+    name = None
+    country = None
+    language = None
+    mode = "by_date"
+    headers = None
+    timeout = DEFAULT_TIMEOUT  # deadline for a whole request, in seconds
+    max_bytes = DEFAULT_MAX_BYTES  # larger responses are abandoned
+    content_types = HTML_TYPES     # other responses (PDF, video, ...) are rejected from their headers
+    retries = DEFAULT_RETRIES  # extra attempts after a transient failure
+    backoff = DEFAULT_BACKOFF  # seconds before the first retry, doubled each time
+    title_field = "title"  # key of the title in output records
+    skip_empty = False     # drop records with neither title nor body
+    max_concurrency = None  # cap on parallel fetches from this source, None for no cap
+    rate_limit = None       # requests per second to this source, None for no limit
+    validators = None       # ETag/Last-Modified store for conditional listing requests, see src.engine.daemon
+    _next_request = 0.0
+
+    @property
+    def supports_date(self):
+        # True for by_query sources that can limit their results to a date window
+        return self.mode == "by_date"
+
+    @property
+    def supports_query(self):
+        return self.mode == "by_query"
+
+    def make_units(self, start_date=None, end_date=None, queries=None):
+        """Turns a date range and/or a list of queries into this source's units of work."""
+        if self.mode == "by_date":
+            from src.engine.runner import date_range
+
+            return list(date_range(start_date, end_date))
+        return list(queries or [])
+
+    def collect_links(self, unit, start_date=None, end_date=None, strict=False):
+        """Returns [{"url": ..., "date": ...}] for one day or query.
+
+        For a query, start_date and end_date limit the results to that window
+        where the source supports it (see supports_date). A listing page that
+        cannot be fetched ends the collection early, or raises with `strict`,
+        so the caller can retry the whole unit (see src.engine.frontier).
+        """
+        raise NotImplementedError
+
+    def parse_article(self, url, content):
+        """Returns (title, date, body) for a downloaded article page."""
+        raise NotImplementedError
+
+    def article_selectors(self, url):
+        # {"title": ..., "body": ...} used for url, named in health reports (src.engine.health)
+        return None
+
+    def listing_selectors(self):
+        return None
+
+    @property
+    def unit_field(self):
+        return "date" if self.mode == "by_date" else "query"
+
+    def unit_label(self, unit):
+        return unit.strftime("%d-%m-%Y") if self.mode == "by_date" else unit
+
+    def unit_key(self, unit):
+        # Safe for use in file names
+        return unit.isoformat() if self.mode == "by_date" else quote(unit, safe="")
+
+    def encode_unit(self, unit):
+        # JSON-friendly form of a unit, for queues and checkpoints
+        return unit.isoformat() if self.mode == "by_date" else unit
+
+    def decode_unit(self, value):
+        return date.fromisoformat(value) if self.mode == "by_date" else value
+
+    def _throttle_delay(self):
+        # Spaces requests to this source 1/rate_limit seconds apart, across
+        # threads; returns how long the caller has to wait for its slot
+        with _throttle_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request)
+            self._next_request = start + 1 / self.rate_limit
+        return start - now
+
+    def fetch(self, url, validators=None):
+        if self.rate_limit:
+            time.sleep(self._throttle_delay())
+        return fetch_with_retry(
+            url, headers=self.headers, timeout=self.timeout, retries=self.retries,
+            backoff=self.backoff, max_bytes=self.max_bytes, content_types=self.content_types,
+            validators=validators,
+        )
+
+    async def fetch_async(self, fetcher, url):
+        """fetch() through an AsyncFetcher, see src.engine.async_fetch."""
+        if self.rate_limit:
+            await asyncio.sleep(self._throttle_delay())
+        return await fetcher.fetch_with_retry(
+            url, headers=self.headers, timeout=self.timeout, retries=self.retries,
+            backoff=self.backoff, max_bytes=self.max_bytes, content_types=self.content_types,
+        )
+
+    def scrape_article(self, url):
+        try:
+            return self.parse_article(url, self.fetch(url))
+        except requests.exceptions.Timeout:
+            print(f"Timeout after {self.timeout} seconds for {url}")
+            return None, None, None
+        except requests.exceptions.RequestException as req_err:
+            print(f"Request error: {req_err}")
+            return None, None, None
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            return None, None, None
+
+
+def make_soup(content):
+    # bs4 is imported on the first page parsed, not when the scraper is loaded
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(content, "html.parser")
+
+
+def load_source(name):
+    """Returns the SOURCE of a scraper, given its registry key or module import path."""
+    if "." not in name:
+        from src.engine.registry import available_sources, get_source
+
+        if name in available_sources():
+            return get_source(name)
+    module_name = name if "." in name else f"src.scrapers.{name}_scraper"
+    return importlib.import_module(module_name).SOURCE
+
+
+class SpecSource(Source):
+    """A source fully described by a declarative SPEC (see src.engine.extractor)."""
+
+    def __init__(self, spec, key, name, country, language, mode="by_date", headers=None,
+                 timeout=DEFAULT_TIMEOUT, title_field="title", skip_empty=False):
+        self.spec = spec
+        self._extractor = None
+        self._article_selectors = None
+        self.key = key
+        self.name = name
+        self.country = country
+        self.language = language
+        self.mode = mode
+        self.headers = headers
+        self.timeout = timeout
+        self.title_field = title_field
+        self.skip_empty = skip_empty
+
+    @property
+    def extractor(self):
+        # Compiled on first use, so loading a scraper module stays cheap
+        if self._extractor is None:
+            from src.engine.extractor import compile_spec
+
+            self._extractor = compile_spec(self.spec)
+        return self._extractor
+
+    @property
+    def supports_date(self):
+        # Read from the spec, so asking does not compile it
+        if self.mode == "by_date":
+            return True
+        search_url = self.spec.get("search_url") or ""
+        return "{date_from" in search_url or "{date_to" in search_url or bool(self.spec.get("links", {}).get("date"))
+
+    def unit_label(self, unit):
+        return self.extractor.format_date(unit) if self.mode == "by_date" else unit
+
+    def collect_links(self, unit, start_date=None, end_date=None, strict=False):
+        links = []
+        seen = set()
+        label = self.unit_label(unit)
+        print(f"\nCollecting links for {label}:")
+
+        if self.mode == "by_date":
+            pages = self.extractor.listing_urls(date=unit)
+            window = False
+        else:
+            # The search URL narrows the results where the site allows it,
+            # listing dates filter what is left before any article is fetched
+            pages = self.extractor.listing_urls(query=unit, start_date=start_date, end_date=end_date)
+            window = bool(start_date or end_date)
+        out_of_range = 0
+        for page, url in pages:
+            print(f"Scraping: {url}")
+            try:
+                soup = make_soup(self.fetch(url, self.validators))
+                page_links = self.extractor.extract_links(soup)
+            except NotModified:
+                # Nothing new on this page, nor on the older ones after it
+                print(f"Page {page} for {label} unchanged since the last check.")
+                break
+            except requests.exceptions.Timeout:
+                print(f"Timeout after {self.timeout} seconds for {url}")
+                if strict:
+                    raise
+                break
+            except Exception as e:
+                print(f"Error fetching links for {label}, page {page}: {e}")
+                if strict:
+                    raise
+                break
+
+            if not page_links and self.extractor.pagination["stop_when_empty"]:
+                print(f"No more results on page {page} for {label}.")
+                break
+
+            for link in page_links:
+                if link["url"] in seen:
+                    continue
+                seen.add(link["url"])
+                if window and not self.extractor.in_window(link, start_date, end_date):
+                    out_of_range += 1
+                    continue
+                # Archive links are dated by the day they were listed on
+                if self.mode == "by_date":
+                    link["date"] = unit.isoformat()
+                links.append(link)
+                print(f"  • {link['url']} ({link['date'] if link['date'] else 'no date'})")
+
+        if out_of_range:
+            print(f"Skipped {out_of_range} links dated outside {start_date or '...'} - {end_date or '...'}")
+        print(f"\nTotal links collected for {label}: {len(links)}")
+        return links
+
+    def parse_article(self, url, content):
+        soup = make_soup(content)
+        return self.extractor.extract_article(soup, url)
+
+    def article_selectors(self, url):
+        # One dict per article spec, so health samples can be grouped by variant
+        if self._article_selectors is None:
+            self._article_selectors = [
+                (match, _selectors(spec)) for match, spec in self.spec.get("article_variants", [])
+            ] + [("", _selectors(self.spec["article"]))]
+        for match, selectors in self._article_selectors:
+            if match in url:
+                return selectors
+
+    def listing_selectors(self):
+        links = self.spec.get("links", {})
+        return {key: links.get(key) for key in ("container", "items", "link") if links.get(key)}
+
+
+def _selectors(article_spec):
+    from src.engine.extractor import HEADINGS
+
+    date_spec = article_spec.get("date")
+    return {
+        "title": article_spec.get("title"),
+        "date": date_spec["selector"] if date_spec else None,
+        "body": article_spec.get("body"),
+        "elements": article_spec.get("elements", HEADINGS),
+    }
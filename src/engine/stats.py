@@ -0,0 +1,425 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+from bisect import bisect_right
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+
+from src.engine.dates import normalize_date
+from src.engine.output import atomic_write
+from src.engine.segments import list_segments, merge_segments, new_run_id
+from src.engine.serialize import get_serializer
+from src.engine.tokens import count_terms, language_code, tokenize
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional, see README
+    pyarrow = None
+
+try:
+    import numpy
+except ImportError:  # optional, see README
+    numpy = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Precomputed corpus statistics, so dashboards never scan article text:
+#
+#   terms       term frequencies per source, date and language
+#   articles    article, token and character counts per source and date
+#   lengths     histogram of article lengths (in tokens) per source and date
+#   query_hits  articles whose text contains the query, per source and date
+#
+# The statistics are built from the segment corpus (src.engine.segments) and
+# from output files, one partition (a day or query of a source, or a file) at
+# a time. A manifest remembers which segments each partition was built from,
+# so an update only re-reads the partitions a run added to; compaction, which
+# rewrites a partition's segments without changing its articles, is picked
+# up the same way. Each update adds its rows as a new part of every table
+#
+#   <stats_dir>/<table>/<update id>.<parquet|npz|json>
+#
+# and the manifest records which part holds each partition's current rows,
+# so an update costs the partitions it rebuilt, not the whole corpus. Parts
+# are stored as Parquet when pyarrow is installed, as compressed NumPy
+# arrays (strings dictionary-encoded) when numpy is, and as JSON otherwise.
+
+STATS_DIR = os.path.join("data", "stats")
+MANIFEST = "manifest.json"
+LOCK_FILE = ".lock"
+MAX_PARTS = 16  # parts per table before they are merged into one
+TABLES = {
+    "terms": ("partition", "source", "date", "language", "term", "count"),
+    "articles": ("partition", "source", "date", "articles", "tokens", "chars"),
+    "lengths": ("partition", "source", "date", "bin", "articles"),
+    "query_hits": ("partition", "source", "date", "query", "articles"),
+}
+STRING_COLUMNS = {"partition", "source", "date", "language", "term", "query"}
+# Lower edges of the article length bins, in tokens
+LENGTH_BINS = (0, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+_update_lock = threading.Lock()
+
+
+def storage_format():
+    if pyarrow is not None:
+        return "parquet"
+    if numpy is not None:
+        return "npz"
+    return "json"
+
+
+def iter_output(path, chunk_size=1 << 20):
+    """Yields the articles of an output file (indented, compact or JSON lines) without loading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n[],":
+                position += 1
+            if position < len(buffer):
+                try:
+                    article, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield article
+                    continue
+            elif eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def _hits(tokens, query_tokens):
+    # A query hits an article when each of its words starts some token of the
+    # article, which also counts the inflected forms of these languages
+    # ("atom" hits "atomowej", "atomu")
+    return all(any(token.startswith(word) for token in tokens) for word in query_tokens)
+
+
+def partition_stats(partition, articles, queries=()):
+    """Returns {table: [row tuples]} for the articles of one partition."""
+    terms = {}
+    totals = {}
+    lengths = Counter()
+    hits = Counter()
+    query_tokens = {}
+
+    for article in articles:
+        source = article.get("source") or ""
+        day = normalize_date(article.get("date")) or ""
+        language = language_code(article.get("language"))
+        title = article.get("title") or article.get("header") or ""
+        body = article.get("article_body") or ""
+        counts = count_terms(f"{title}\n{body}", language)
+        length = sum(counts.values())
+
+        # One Counter per source, day and language, merged from the article's
+        # own counts, so each distinct word is added once per article
+        bucket = terms.get((source, day, language))
+        if bucket is None:
+            terms[source, day, language] = counts
+        else:
+            bucket.update(counts)
+        total = totals.setdefault((source, day), [0, 0, 0])
+        total[0] += 1
+        total[1] += length
+        total[2] += len(title) + len(body)
+        lengths[source, day, LENGTH_BINS[bisect_right(LENGTH_BINS, length) - 1]] += 1
+
+        article_queries = set(queries)
+        if article.get("query"):
+            article_queries.add(article["query"])
+        if article_queries:
+            vocabulary = counts.keys()
+            for query in article_queries:
+                if (query, language) not in query_tokens:
+                    query_tokens[query, language] = tokenize(query, language) or query.casefold().split()
+                if _hits(vocabulary, query_tokens[query, language]):
+                    hits[source, day, query] += 1
+
+    return {
+        "terms": [(partition, *key, term, count) for key, bucket in terms.items() for term, count in bucket.items()],
+        "articles": [(partition, *key, *counts) for key, counts in totals.items()],
+        "lengths": [(partition, *key, count) for key, count in lengths.items()],
+        "query_hits": [(partition, *key, count) for key, count in hits.items()],
+    }
+
+
+# Storage
+
+def _part_path(stats_dir, name, part, storage):
+    return os.path.join(stats_dir, name, f"{part}.{storage}")
+
+
+def _write_part(stats_dir, name, part, rows, storage):
+    columns = {column: [row[i] for row in rows] for i, column in enumerate(TABLES[name])}
+    path = _part_path(stats_dir, name, part, storage)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with atomic_write(path) as f:
+        if storage == "parquet":
+            arrays = {
+                column: pyarrow.array(values, pyarrow.string()).dictionary_encode() if column in STRING_COLUMNS
+                else pyarrow.array(values, pyarrow.int64())
+                for column, values in columns.items()
+            }
+            pyarrow.parquet.write_table(pyarrow.table(arrays), f, compression="zstd")
+        elif storage == "npz":
+            arrays = {}
+            for column, values in columns.items():
+                if column in STRING_COLUMNS:
+                    vocabulary, codes = numpy.unique(numpy.array(values, dtype=str), return_inverse=True)
+                    arrays[f"{column}.values"] = vocabulary
+                    arrays[f"{column}.codes"] = codes.astype(numpy.int32)
+                else:
+                    arrays[column] = numpy.array(values, dtype=numpy.int64)
+            numpy.savez_compressed(f, **arrays)
+        else:
+            f.write(get_serializer().dumps(columns, pretty=False))
+
+
+def _read_file(path, name, storage):
+    if storage == "parquet":
+        return pyarrow.parquet.read_table(path).to_pydict()
+    if storage == "npz":
+        with numpy.load(path) as arrays:
+            return {
+                column: arrays[f"{column}.values"][arrays[f"{column}.codes"]].tolist() if column in STRING_COLUMNS
+                else arrays[column].tolist()
+                for column in TABLES[name]
+            }
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _live_rows(stats_dir, name, manifest):
+    # Rows of every part, without those of partitions rebuilt in a later part
+    rows = []
+    owners = manifest["partitions"]
+    for part in manifest["parts"]:
+        path = _part_path(stats_dir, name, part, manifest["storage"])
+        if not os.path.exists(path):
+            continue  # nothing of this table in that update
+        table = _read_file(path, name, manifest["storage"])
+        rows.extend(row for row in zip(*table.values()) if owners.get(row[0], {}).get("part") == part)
+    return rows
+
+
+def load_table(stats_dir, name):
+    """Returns a table as {column: list of values}; empty columns if it was never written."""
+    with _locked(stats_dir):
+        manifest = _manifest(stats_dir)
+        rows = _live_rows(stats_dir, name, manifest) if manifest["storage"] else []
+    return {column: [row[i] for row in rows] for i, column in enumerate(TABLES[name])}
+
+
+def _manifest(stats_dir):
+    path = os.path.join(stats_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"storage": None, "queries": [], "parts": [], "partitions": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest
+
+
+def _write_manifest(stats_dir, manifest):
+    with atomic_write(os.path.join(stats_dir, MANIFEST)) as f:
+        f.write(json.dumps(manifest, indent=4).encode())
+
+
+@contextmanager
+def _locked(stats_dir):
+    # One reader or writer of a statistics directory at a time, across the
+    # threads of this process and across processes (a daemon and main.py)
+    with _update_lock:
+        os.makedirs(stats_dir, exist_ok=True)
+        with open(os.path.join(stats_dir, LOCK_FILE), "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Updates
+
+def _segment_partitions(segments_root, source_key=None):
+    # {partition id: (signature, segment paths)}
+    partitions = {}
+    for directory, paths in list_segments(segments_root, source_key).items():
+        partition = "segments:" + os.path.relpath(directory, segments_root).replace(os.sep, "/")
+        partitions[partition] = ([os.path.basename(path) for path in paths], paths)
+    return partitions
+
+
+def _file_partitions(files):
+    partitions = {}
+    for path in files:
+        stat = os.stat(path)
+        partitions["file:" + os.path.abspath(path)] = ([stat.st_size, stat.st_mtime_ns], path)
+    return partitions
+
+
+def update_stats(stats_dir=STATS_DIR, segments_root=None, files=(), source_key=None, queries=None):
+    """Brings the statistics up to date with the segment corpus and/or output files.
+
+    Only partitions that are new or changed since the last update are read,
+    and their rows are written as a new part of each table; the rows they
+    replace are left out when the table is read. Once there are more than
+    MAX_PARTS parts, they are merged into one. With source_key, only that
+    source's segments are looked at. `queries` are counted in query_hits for
+    every article, in addition to the query each article was scraped for;
+    changing them rebuilds everything. Returns the number of partitions
+    rebuilt.
+    """
+    with _locked(stats_dir):
+        manifest = _manifest(stats_dir)
+        queries = sorted(manifest["queries"] if queries is None else set(queries))
+        storage = storage_format()
+        rebuild_all = queries != manifest["queries"]
+
+        current = {}
+        if segments_root:
+            current.update(_segment_partitions(segments_root, source_key))
+        current.update(_file_partitions(files))
+
+        known = manifest["partitions"]
+        changed = [
+            partition for partition, (signature, _) in current.items()
+            if rebuild_all or known.get(partition, {}).get("signature") != signature
+        ]
+        # Partitions of the scanned scope that no longer exist, e.g. deleted by
+        # hand; after a change of queries, every partition that was not rebuilt
+        prefix = "segments:" + (f"{source_key}/" if source_key else "")
+        removed = [
+            partition for partition in known
+            if partition not in current and (rebuild_all or segments_root and partition.startswith(prefix))
+        ]
+        if not changed and not removed and storage == manifest["storage"]:
+            return 0
+
+        old_storage = manifest["storage"] or storage
+        parts = list(manifest["parts"])
+        partitions = {partition: owner for partition, owner in known.items() if partition not in removed}
+        if changed:
+            part = new_run_id()
+            rows = {name: [] for name in TABLES}
+            for partition in changed:
+                inputs = current[partition][1]
+                if isinstance(inputs, list):
+                    # Segments of a partition can repeat a URL; the newest copy counts
+                    tmp_dir = tempfile.mkdtemp(dir=stats_dir)
+                    try:
+                        stats = partition_stats(partition, merge_segments(inputs, tmp_dir), queries)
+                    finally:
+                        shutil.rmtree(tmp_dir, ignore_errors=True)
+                else:
+                    stats = partition_stats(partition, iter_output(inputs), queries)
+                for name, table_rows in stats.items():
+                    rows[name].extend(table_rows)
+            for name, table_rows in rows.items():
+                if table_rows:
+                    _write_part(stats_dir, name, part, table_rows, old_storage)
+            parts.append(part)
+            partitions.update((partition, {"signature": current[partition][0], "part": part}) for partition in changed)
+
+        listed = parts
+        # Parts whose partitions were all rebuilt later hold nothing live
+        owners = {owner["part"] for owner in partitions.values()}
+        parts = [part for part in parts if part in owners]
+        updated = {"storage": old_storage, "queries": queries, "parts": parts, "partitions": partitions}
+        if len(parts) > MAX_PARTS or storage != old_storage:
+            # Merge the live rows into one part, converting them to the current storage format
+            merged = new_run_id()
+            for name in TABLES:
+                table_rows = _live_rows(stats_dir, name, updated)
+                if table_rows:
+                    _write_part(stats_dir, name, merged, table_rows, storage)
+            updated = {
+                "storage": storage, "queries": queries, "parts": [merged],
+                "partitions": {partition: {**owner, "part": merged} for partition, owner in partitions.items()},
+            }
+        _write_manifest(stats_dir, updated)
+
+        # Only now that the manifest no longer lists them
+        for part in set(listed) - set(updated["parts"]):
+            for name in TABLES:
+                path = _part_path(stats_dir, name, part, old_storage)
+                if os.path.exists(path):
+                    os.remove(path)
+
+        print(f"Statistics updated: {len(changed)} partitions rebuilt, {len(removed)} removed, "
+              f"{len(updated['parts'])} parts stored as {updated['storage']}")
+        return len(changed)
+
+
+def top_terms(stats_dir=STATS_DIR, source=None, start_date=None, end_date=None, limit=20):
+    """Returns [(term, count)] summed over the terms table, optionally for one source and date range."""
+    table = load_table(stats_dir, "terms")
+    start = start_date.isoformat() if start_date else ""
+    end = end_date.isoformat() if end_date else "9999"
+    counts = Counter()
+    for row_source, day, term, count in zip(table["source"], table["date"], table["term"], table["count"]):
+        if (source is None or row_source == source) and start <= day <= end:
+            counts[term] += count
+    return counts.most_common(limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precomputed term, length and query statistics of the corpus.")
+    parser.add_argument("--stats-dir", default=STATS_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update_parser = commands.add_parser("update", help="read new or changed partitions into the statistics")
+    update_parser.add_argument("--segments", default=os.path.join("data", "segments"), help="segment corpus root")
+    update_parser.add_argument("--source", help="only this source's segments, by registry key, e.g. onet_pl")
+    update_parser.add_argument("--input", nargs="*", default=[], help="output files to include")
+    update_parser.add_argument("--queries", help="comma-separated queries to count in every article")
+
+    top_parser = commands.add_parser("top", help="most frequent terms")
+    top_parser.add_argument("--source", help="registry key (e.g. onet_pl) or source name as written in the output")
+    top_parser.add_argument("--start", type=date.fromisoformat)
+    top_parser.add_argument("--end", type=date.fromisoformat)
+    top_parser.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+
+    if args.command == "update":
+        queries = [q.strip() for q in args.queries.split(",") if q.strip()] if args.queries is not None else None
+        update_stats(args.stats_dir, args.segments, args.input, args.source, queries)
+    elif args.command == "top":
+        source = args.source
+        if source:
+            from src.engine.registry import available_sources, get_source
+
+            if source in available_sources():
+                source = get_source(source).name  # the name is what the tables hold
+        for term, count in top_terms(args.stats_dir, source, args.start, args.end, args.limit):
+            print(f"{term:30} {count}")
+
+
+if __name__ == "__main__":
+    main()
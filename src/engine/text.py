@@ -0,0 +1,115 @@
+import re
+import unicodedata
+
+# Assembles the body of an article from the text elements (p, h1..h6) of its
+# containers. Each container is walked once: containers nested inside another
+# selected container, and elements nested inside an element already taken
+# (a <p> inside a <p>, a promotion frame inside the article), are skipped
+# rather than read twice. Parts are collected in a list and joined once.
+# When the element selector is a plain list of tag names, as in every spec so
+# far, the walk compares tag names instead of running the CSS matcher on
+# every descendant.
+#
+# Optional clean-up, per article spec:
+#   unicode_normalize    a unicodedata form ("NFC", "NFKC", ...) applied to every text
+#   collapse_whitespace  runs of whitespace become one space, and inline tags
+#                        are separated by a space instead of glued together
+
+
+_TAG_NAMES = re.compile(r"^\s*[a-z][a-z0-9]*(\s*,\s*[a-z][a-z0-9]*)*\s*$")
+
+
+def tag_names(selector):
+    """Returns the set of tag names of a selector like "p, h1, h2", or None for any other selector."""
+    if not selector or not _TAG_NAMES.match(selector):
+        return None
+    return frozenset(name.strip() for name in selector.split(","))
+
+
+def normalize_text(text, unicode_form=None, collapse_whitespace=False):
+    # Normalised first, so spaces that NFKC produces are collapsed too
+    if unicode_form:
+        text = unicodedata.normalize(unicode_form, text)
+    if collapse_whitespace:
+        text = " ".join(text.split())
+    return text
+
+
+def element_text(element, unicode_form=None, collapse_whitespace=False):
+    """Returns the text of a title, lead or body element, cleaned up as the article spec asks."""
+    if collapse_whitespace:
+        # Inline tags are separated by a space instead of glued together
+        return normalize_text(element.get_text(" "), unicode_form, True)
+    return normalize_text(element.get_text(strip=True), unicode_form)
+
+
+def _inside(element, taken, stop):
+    # True if an ancestor of element, below stop, is in taken
+    parent = element.parent
+    while parent is not None and parent is not stop:
+        if id(parent) in taken:
+            return True
+        parent = parent.parent
+    return False
+
+
+def outermost(elements):
+    """Returns elements (in document order) without those nested inside another one of them."""
+    kept = []
+    taken = set()
+    for element in elements:
+        if not _inside(element, taken, None):
+            kept.append(element)
+            taken.add(id(element))
+    return kept
+
+
+def _walk(container, names, bare_only):
+    # Text elements below container in document order, without descending
+    # into the ones yielded; elements skipped for their attributes are
+    # descended into, as the CSS matcher would find what they contain
+    stack = [iter(container.contents)]
+    while stack:
+        for node in stack[-1]:
+            name = node.name
+            if name is None:
+                continue  # text, comments
+            if name in names and not (bare_only and node.attrs):
+                yield node
+            elif node.contents:
+                stack.append(iter(node.contents))
+                break
+        else:
+            stack.pop()
+
+
+def _select(container, elements, bare_only):
+    taken = set()
+    for element in elements.select(container):
+        if bare_only and element.attrs:
+            continue
+        if taken and _inside(element, taken, container):
+            continue
+        taken.add(id(element))
+        yield element
+
+
+def assemble_text(containers, elements, paragraph="{}\n", heading="\n{}\n", bare_only=False, skip_empty=True,
+                  unicode_form=None, collapse_whitespace=False):
+    """Returns the formatted text parts of the text elements of every container.
+
+    `elements` is a set of tag names (see tag_names()) or a compiled
+    soupsieve selector.
+    """
+    parts = []
+    for container in outermost(containers):
+        if isinstance(elements, frozenset):
+            found = _walk(container, elements, bare_only)
+        else:
+            found = _select(container, elements, bare_only)
+        for element in found:
+            text = element_text(element, unicode_form, collapse_whitespace)
+            if skip_empty and not text:
+                continue
+            parts.append((heading if element.name[0] == "h" else paragraph).format(text))
+    return parts
@@ -0,0 +1,85 @@
+import re
+import unicodedata
+from collections import Counter
+
+# Word tokenizer for the languages of the scraped outlets. Tokens are
+# case-folded runs of letters, with per-language clean-up and stop words, so
+# term counts are comparable across sources. Scrapers label their language
+# in different ways ("rus", "ua"); LANGUAGE_ALIASES maps them to ISO 639-1.
+
+LANGUAGE_ALIASES = {"rus": "ru", "ua": "uk", "ukr": "uk", "cz": "cs", "cze": "cs", "pol": "pl", "slk": "sk", "hun": "hu"}
+
+MIN_LENGTH = 2
+
+# Letters only; an apostrophe between letters belongs to the word (Ukrainian п'ять, м’ясо)
+_WORD = re.compile(r"[^\W\d_]+(?:['’ʼ][^\W\d_]+)*")
+
+STOP_WORDS = {
+    "pl": """
+        a aby ale bo by być był była było czy dla do gdy go i ich im jak jako jego jej jest już
+        ma może na nad nie o od oraz po pod przez przy są się ta tak także te tego tej ten to
+        tu tylko w we z za ze że który która które którzy został została zostało
+    """,
+    "cs": """
+        a aby ale ani by byl byla bylo být bude co do i jak jako je jeho její jejich jsem jsou
+        k když který která které má na nebo než o od po podle pro při s se si tak také tato
+        tento této to už v ve z za že
+    """,
+    "sk": """
+        a aby ako ale aj alebo bol bola bolo bude by byť čo do i ich je jeho jej k keď ktorý
+        ktorá ktoré má na o od po podľa pre pri s sa si som sú tak táto tento tejto to už v
+        však vo z za že
+    """,
+    "hu": """
+        a aki akkor alatt ami amely az azt be de egy el és ez ezt fel ha hogy is kell ki le
+        lesz már meg mert miatt mint minden most még nem pedig sem szerint után vagy van volt
+        így között csak
+    """,
+    "ru": """
+        а без бы был была было быть в вот все всех вы где да для до его ее ей если есть еще
+        же за и из или им их к как когда ли на не него нет ни но о об он она они оно от по
+        после при с со так также там то только у уже что чтобы это этот эти я
+    """,
+    "uk": """
+        а або але б був була було бути в від вже вона вони все до є з за зі і із її їх й як
+        який яка яке які на не під по при про після та також так те то у це ці чи що щоб
+        його
+    """,
+}
+STOP_WORDS = {language: frozenset(words.split()) for language, words in STOP_WORDS.items()}
+
+
+def language_code(language):
+    language = (language or "").lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+
+def _words(text, language):
+    text = unicodedata.normalize("NFC", text).casefold()
+    if language == "ru":
+        text = text.replace("ё", "е")
+    elif language == "uk":
+        text = text.replace("’", "'").replace("ʼ", "'")
+    return _WORD.findall(text)
+
+
+def tokenize(text, language=None):
+    """Returns the case-folded words of text, without stop words and one-letter tokens."""
+    if not text:
+        return []
+    language = language_code(language)
+    stop_words = STOP_WORDS.get(language, frozenset())
+    return [word for word in _words(text, language) if len(word) >= MIN_LENGTH and word not in stop_words]
+
+
+def count_terms(text, language=None):
+    """Returns a Counter of the tokens of text, as tokenize() would return them."""
+    if not text:
+        return Counter()
+    language = language_code(language)
+    stop_words = STOP_WORDS.get(language, frozenset())
+    # Counting first and filtering the distinct words is cheaper than filtering every word
+    counts = Counter(_words(text, language))
+    for word in [word for word in counts if len(word) < MIN_LENGTH or word in stop_words]:
+        del counts[word]
+    return counts
@@ -1,5 +1,7 @@
 import json
 
+from src.engine.output import atomic_write
+
 def remove_duplicates_from_file(file_path):
     try:
         with open(file_path, "r", encoding="utf-8") as f:
@@ -23,7 +25,8 @@ def remove_duplicates_from_file(file_path):
                     removed_urls.append(url)
 
         if removed_urls:
-            with open(file_path, "w", encoding="utf-8") as f:
+            # Replaced in one rename, so a crash mid-write cannot truncate the file
+            with atomic_write(file_path, text=True) as f:
                 json.dump(unique_data, f, ensure_ascii=False, indent=2)
             print(f"Removed {len(removed_urls)} duplicates from {file_path}")
             print("Removed URLs:")
@@ -0,0 +1,48 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+from src.engine.checkpoint import checkpoint_dir
+from src.engine.runner import run_source
+from src.engine.source import Source
+
+DAYS = [date(2024, 5, 1), date(2024, 5, 2)]
+
+
+class CrashingSource(Source):
+    key = "crash_pl"
+    name = "crash.pl"
+
+    def __init__(self, crash_on=None):
+        self.crash_on = crash_on
+        self.collected = []
+
+    def collect_links(self, unit, start_date=None, end_date=None, strict=False):
+        if unit == self.crash_on:
+            raise KeyboardInterrupt
+        self.collected.append(unit)
+        return [{"url": f"https://crash.pl/{unit.isoformat()}", "date": unit.isoformat()}]
+
+    def fetch(self, url, validators=None):
+        return url
+
+    def parse_article(self, url, content):
+        return f"Title {url}", None, "Body"
+
+
+def test_rerun_resumes_from_the_finished_units(tmp_path):
+    output = str(tmp_path / "out.json")
+    with pytest.raises(KeyboardInterrupt):
+        run_source(CrashingSource(crash_on=DAYS[1]), DAYS, output)
+    assert not os.path.exists(output)
+    assert os.listdir(checkpoint_dir(output)) == ["crash_pl_2024-05-01.json"]
+
+    source = CrashingSource()
+    run_source(source, DAYS, output)
+
+    assert source.collected == [DAYS[1]]
+    with open(output, "r", encoding="utf-8") as f:
+        assert [a["url"] for a in json.load(f)] == ["https://crash.pl/2024-05-01", "https://crash.pl/2024-05-02"]
+    assert not os.path.exists(checkpoint_dir(output))
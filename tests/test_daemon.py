@@ -0,0 +1,64 @@
+from datetime import date
+
+from src.engine.daemon import CrawlState, tick, tick_units
+from src.engine.deadletter import DeadLetterStore
+from src.engine.segments import list_segments
+from src.engine.source import Source
+
+TODAY = date(2024, 5, 2)
+
+
+class ListingSource(Source):
+    # Lists `links` for every day; URLs in `broken` fail to download
+    key = "tick_pl"
+    name = "tick.pl"
+
+    def __init__(self, links, broken=()):
+        self.links = links
+        self.broken = set(broken)
+        self.fetched = []
+
+    def collect_links(self, unit, start_date=None, end_date=None, strict=False):
+        return [{"url": url, "date": unit.isoformat()} for url in self.links]
+
+    def fetch(self, url, validators=None):
+        self.fetched.append(url)
+        if url in self.broken:
+            raise ConnectionError("connection reset")
+        return url
+
+    def parse_article(self, url, content):
+        return f"Title {url}", None, "Body"
+
+
+def test_tick_units_cover_the_recent_days():
+    units, start_date = tick_units(ListingSource([]), days=2, today=TODAY)
+    assert units == [date(2024, 5, 1), TODAY] and start_date is None
+
+
+def test_second_tick_fetches_only_new_urls(tmp_path):
+    state = CrawlState(str(tmp_path / "crawl.sqlite"))
+    segments = str(tmp_path / "segments")
+    source = ListingSource(["https://tick.pl/1", "https://tick.pl/2"])
+
+    assert tick(source, [TODAY], state, segments=segments) == 2
+    source.fetched.clear()
+    assert tick(source, [TODAY], state, segments=segments) == 0
+    assert source.fetched == []
+
+    source.links.append("https://tick.pl/3")
+    assert tick(source, [TODAY], state, segments=segments) == 1
+    assert source.fetched == ["https://tick.pl/3"]
+    [paths] = list_segments(segments).values()
+    assert len(paths) == 2
+
+
+def test_failed_urls_are_seen_and_left_to_the_dead_letters(tmp_path):
+    state = CrawlState(str(tmp_path / "crawl.sqlite"))
+    dead_letters = DeadLetterStore(str(tmp_path / "failed.jsonl"))
+    source = ListingSource(["https://tick.pl/1", "https://tick.pl/2"], broken=["https://tick.pl/2"])
+
+    assert tick(source, [TODAY], state, segments=str(tmp_path / "segments"), dead_letters=dead_letters) == 1
+    assert [entry["url"] for entry in dead_letters.pending()] == ["https://tick.pl/2"]
+    assert state.unseen(source.key, [{"url": "https://tick.pl/2"}]) == []
+    assert state.counts() == {"tick_pl": 2}
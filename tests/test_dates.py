@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+import pytest
+
+from src.engine.dates import in_range, normalize_date, parse_date
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-05-13", "2024-05-13"),
+    ("2024-05-13T22:47:00Z", "2024-05-13"),
+    ("2024.5.3", "2024-05-03"),
+    ("13-05-2024", "2024-05-13"),
+    ("13.05.2024 10:15", "2024-05-13"),
+    ("13. 5. 2024", "2024-05-13"),
+    ("13/5/2024", "2024-05-13"),
+    (date(2024, 5, 13), "2024-05-13"),
+    (datetime(2024, 5, 13, 23, 59), "2024-05-13"),
+    ("31.02.2024", None),
+    ("wczoraj", None),
+    ("", None),
+    (None, None),
+])
+def test_normalize_date(value, expected):
+    assert normalize_date(value) == expected
+
+
+def test_parse_date_shares_one_object_per_day():
+    first = parse_date("13.05.2024")
+    assert first == date(2024, 5, 13)
+    assert parse_date("2024-05-13") is first
+    assert parse_date("no date") is None
+
+
+def test_in_range_keeps_undated_values():
+    start, end = date(2024, 5, 1), date(2024, 5, 31)
+    assert in_range("2024-05-01", start, end) and in_range("2024-05-31", start, end)
+    assert not in_range("2024-06-01", start, end)
+    assert in_range(None, start, end)
+    assert in_range("2020-01-01")
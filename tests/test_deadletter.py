@@ -0,0 +1,94 @@
+import json
+from datetime import date
+
+from src.engine.deadletter import DeadLetterStore, retry_dead_letters
+from src.engine.keywords import TagIndex
+from src.engine.revisions import RevisionStore
+from src.engine.runner import run_source
+from src.engine.segments import list_segments
+from src.engine.source import Source
+from src.engine.stats import load_table
+
+
+class FlakySource(Source):
+    # Article 1 fails until `failing` is cleared
+    key = "flaky_pl"
+    name = "flaky.pl"
+
+    def __init__(self):
+        self.failing = True
+        self.fetched = []
+
+    def collect_links(self, unit, start_date=None, end_date=None, strict=False):
+        return [{"url": f"https://flaky.pl/{i}", "date": unit.isoformat()} for i in range(3)]
+
+    def fetch(self, url, validators=None):
+        self.fetched.append(url)
+        if self.failing and url.endswith("/1"):
+            raise ConnectionError("connection reset")
+        return url
+
+    def parse_article(self, url, content):
+        return f"Atom {url[-1]}", None, "Elektrownia atomowa w Polsce"
+
+
+def test_failed_article_goes_to_the_store_not_the_output(tmp_path):
+    source = FlakySource()
+    output = str(tmp_path / "out.json")
+    run_source(source, [date(2024, 5, 1)], output)
+
+    with open(output, "r", encoding="utf-8") as f:
+        assert [a["url"] for a in json.load(f)] == ["https://flaky.pl/0", "https://flaky.pl/2"]
+    [entry] = DeadLetterStore(str(tmp_path / "out_failed.jsonl")).pending()
+    assert entry["url"] == "https://flaky.pl/1"
+    assert entry["error_class"] == "ConnectionError"
+
+
+def test_retry_appends_recovered_articles_to_the_output(tmp_path):
+    source = FlakySource()
+    output = str(tmp_path / "out.json")
+    run_source(source, [date(2024, 5, 1)], output)
+    store = DeadLetterStore(str(tmp_path / "out_failed.jsonl"))
+
+    source.failing = False
+    recovered = retry_dead_letters(source, store, output, backoff=0)
+
+    assert [a.url for a in recovered] == ["https://flaky.pl/1"]
+    with open(output, "r", encoding="utf-8") as f:
+        assert len(json.load(f)) == 3
+    assert store.pending() == []
+
+
+def test_later_run_resolves_the_dead_letter(tmp_path):
+    source = FlakySource()
+    output = str(tmp_path / "out.json")
+    run_source(source, [date(2024, 5, 1)], output)
+    source.failing = False
+    run_source(source, [date(2024, 5, 1)], output)
+
+    store = DeadLetterStore(str(tmp_path / "out_failed.jsonl"))
+    assert store.pending() == []
+    source.fetched.clear()
+    assert retry_dead_letters(source, store, output, backoff=0) == []
+    assert source.fetched == []
+
+
+def test_retry_into_segments_updates_stats_tags_and_revisions(tmp_path):
+    source = FlakySource()
+    segments = str(tmp_path / "segments")
+    stats = str(tmp_path / "stats")
+    tags = str(tmp_path / "tags.sqlite")
+    revisions = str(tmp_path / "revisions.sqlite")
+    store = DeadLetterStore(str(tmp_path / "failed.jsonl"))
+    run_source(source, [date(2024, 5, 1)], str(tmp_path / "out.json"), dead_letters=store.path, segments=segments,
+               stats=stats)
+
+    source.failing = False
+    retry_dead_letters(source, store, rounds=1, segments=segments, stats=stats, keywords={"nuclear": ["atom"]},
+                       tag_index=tags, revisions=revisions)
+
+    [paths] = list_segments(segments).values()
+    assert len(paths) == 2
+    assert sum(load_table(stats, "articles")["articles"]) == 3
+    assert [row[0] for row in TagIndex(tags).find("nuclear")] == ["https://flaky.pl/1"]
+    assert len(RevisionStore(revisions).versions("https://flaky.pl/1")) == 1
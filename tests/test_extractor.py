@@ -0,0 +1,65 @@
+import importlib
+
+import pytest
+
+from benchmarks.bench_parsers import CASES
+from benchmarks.offline import serve_fixtures
+from src.engine.extractor import compile_spec
+from src.engine.source import make_soup
+
+SPEC = {
+    "base_url": "https://example.pl/",
+    "links": {"container": "ul.news", "items": "li", "link": "a",
+              "date": {"selector": "time", "attr": "datetime", "pattern": r"(\d+)\.(\d+)\.(\d+)",
+                       "format": "{2}-{1}-{0}"}},
+    "article": {"title": "h1", "date": {"selector": "time", "pattern": r"(\d{4}-\d{2}-\d{2})", "format": "{0}"},
+                "lead": "p.lead", "body": "div.body"},
+    "article_variants": [("/live/", {"title": "h2", "body": "div.live"})],
+}
+
+LISTING = """
+<ul class="news">
+  <li><a href="/kraj/1">One</a><time datetime="13.05.2024"></time></li>
+  <li><a href="https://example.pl/kraj/2">Two</a></li>
+  <li><a href="/kraj/1">One again</a></li>
+</ul>
+<ul><li><a href="/outside">Outside the container</a></li></ul>
+"""
+
+ARTICLE = """
+<h1>Elektrownia atomowa</h1><time>2024-05-13T10:00</time>
+<p class="lead">Lead</p>
+<div class="body"><p>First</p><p>Second</p></div>
+<h2>Live title</h2><div class="live"><p>Live body</p></div>
+"""
+
+
+def test_links_are_absolute_dated_and_deduplicated():
+    links = compile_spec(SPEC).extract_links(make_soup(LISTING))
+    assert links == [
+        {"url": "https://example.pl/kraj/1", "date": "2024-05-13"},
+        {"url": "https://example.pl/kraj/2", "date": None},
+    ]
+
+
+def test_article_and_its_variant():
+    extractor = compile_spec(SPEC)
+    title, date, body = extractor.extract_article(make_soup(ARTICLE), "https://example.pl/kraj/1")
+    assert (title, date) == ("Elektrownia atomowa", "2024-05-13")
+    assert "Lead" in body and body.index("First") < body.index("Second")
+
+    title, date, body = extractor.extract_article(make_soup(ARTICLE), "https://example.pl/live/1")
+    assert (title, date) == ("Live title", None)
+    assert "Live body" in body and "First" not in body
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_scrapers_read_their_fixtures(case, capsys):
+    module, function, args, routes = CASES[case]
+    with serve_fixtures(routes):
+        result = getattr(importlib.import_module(module), function)(*args)
+    if isinstance(result, tuple):
+        title, _, body = result
+        assert title and body
+    else:
+        assert result and all(link["url"].startswith("https://") for link in result)
@@ -0,0 +1,140 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.engine import fetch
+from src.engine.fetch import DeadlineExceeded, ResponseTooLarge, UnexpectedContentType
+
+
+class Handler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, body=b"<html>ok</html>", content_type="text/html", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        hits = Handler.hits[self.path] = Handler.hits.get(self.path, 0) + 1
+        if self.path == "/page":
+            self.send(200)
+        elif self.path == "/pdf":
+            self.send(200, b"%PDF-1.4", "application/pdf")
+        elif self.path == "/announced-big":
+            self.send(200, b"x" * 2000)
+        elif self.path == "/chunked-big":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.end_headers()
+            self.wfile.write(b"x" * 2000)
+        elif self.path == "/trickle":
+            # Each byte arrives well within the socket timeout, the whole body does not
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", "100")
+            self.end_headers()
+            try:
+                for _ in range(100):
+                    self.wfile.write(b"x")
+                    self.wfile.flush()
+                    time.sleep(0.1)
+            except OSError:
+                pass
+        elif self.path == "/trickle-headers":
+            try:
+                for byte in b"HTTP/1.1 200 OK\r\nX-Slow: " + b"a" * 100:
+                    self.wfile.write(bytes([byte]))
+                    self.wfile.flush()
+                    time.sleep(0.1)
+            except OSError:
+                pass
+            self.close_connection = True
+        elif self.path == "/flaky":
+            if hits < 3:
+                self.send(503, headers=[("Retry-After", "0")])
+            else:
+                self.send(200)
+        elif self.path == "/missing":
+            self.send(404)
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def fresh_hits():
+    Handler.hits.clear()
+    fetch.reset_cancel()
+
+
+def test_fetch_returns_the_body(server):
+    assert fetch.fetch(server + "/page") == b"<html>ok</html>"
+
+
+def test_deadline_covers_the_whole_body(server):
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        fetch.fetch(server + "/trickle", timeout=1)
+    assert time.monotonic() - started < 3
+
+
+def test_deadline_covers_the_response_headers(server):
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        fetch.fetch(server + "/trickle-headers", timeout=1)
+    assert time.monotonic() - started < 3
+
+
+def test_size_cap_from_headers_and_from_the_body(server):
+    with pytest.raises(ResponseTooLarge):
+        fetch.fetch(server + "/announced-big", max_bytes=1000)
+    with pytest.raises(ResponseTooLarge):
+        fetch.fetch(server + "/chunked-big", max_bytes=1000)
+
+
+def test_unexpected_content_type_is_rejected(server):
+    with pytest.raises(UnexpectedContentType):
+        fetch.fetch(server + "/pdf")
+
+
+def test_transient_errors_are_retried(server):
+    assert fetch.fetch_with_retry(server + "/flaky", retries=2, backoff=0) == b"<html>ok</html>"
+    assert Handler.hits["/flaky"] == 3
+
+
+def test_retries_give_up_and_skip_permanent_errors(server):
+    with pytest.raises(requests.exceptions.HTTPError):
+        fetch.fetch_with_retry(server + "/flaky", retries=1, backoff=0)
+    with pytest.raises(requests.exceptions.HTTPError):
+        fetch.fetch_with_retry(server + "/missing", retries=2, backoff=0)
+    assert Handler.hits["/missing"] == 1
+
+
+def test_retry_delay_honours_retry_after_and_backs_off():
+    response = requests.Response()
+    response.status_code = 429
+    response.headers["Retry-After"] = "7"
+    assert fetch.retry_delay(requests.exceptions.HTTPError(response=response), 0) == 7
+    delays = [fetch.retry_delay(requests.exceptions.ConnectionError(), attempt, backoff=1.0) for attempt in range(3)]
+    assert 1 <= delays[0] <= 1.5 and 2 <= delays[1] <= 3 and 4 <= delays[2] <= 6
+
+
+def test_cancel_aborts_new_fetches(server):
+    fetch.cancel_all()
+    with pytest.raises(fetch.FetchCancelled):
+        fetch.fetch(server + "/page")
@@ -0,0 +1,64 @@
+import socket
+from datetime import date
+
+from src.engine.frontier import IN_FLIGHT, Frontier, collect, run_with_frontier
+from src.engine.source import Source
+
+
+class QuerySource(Source):
+    key = "query_pl"
+    name = "query.pl"
+    mode = "by_query"
+
+    def __init__(self):
+        self.windows = []
+        self.fetched = []
+
+    def collect_links(self, unit, start_date=None, end_date=None, strict=False):
+        self.windows.append((unit, start_date, end_date))
+        return [{"url": f"https://query.pl/{unit}/{i}", "date": "2024-05-01"} for i in range(2)]
+
+    def fetch(self, url, validators=None):
+        self.fetched.append(url)
+        return url
+
+    def parse_article(self, url, content):
+        return f"Title {url}", None, "Body"
+
+
+def test_query_window_is_stored_with_the_unit(tmp_path):
+    source = QuerySource()
+    frontier = Frontier(str(tmp_path / "frontier.sqlite"))
+    frontier.add_units(source, ["atom"], date(2024, 5, 1), date(2024, 5, 31))
+
+    # A collector in another process only has the frontier file
+    assert collect(frontier, {source.key: source}) == 1
+    assert source.windows == [("atom", date(2024, 5, 1), date(2024, 5, 31))]
+
+
+def test_rerun_does_not_fetch_finished_urls(tmp_path):
+    source = QuerySource()
+    path = str(tmp_path / "frontier.sqlite")
+    first = run_with_frontier(source, ["atom"], str(tmp_path / "out.json"), path)
+    source.fetched.clear()
+
+    second = run_with_frontier(source, ["atom"], str(tmp_path / "out.json"), path)
+
+    assert source.fetched == []
+    assert [a.url for a in second] == [a.url for a in first] == ["https://query.pl/atom/0", "https://query.pl/atom/1"]
+
+
+def test_rerun_resumes_urls_of_a_dead_worker(tmp_path):
+    source = QuerySource()
+    path = str(tmp_path / "frontier.sqlite")
+    frontier = Frontier(path)
+    frontier.add_units(source, ["atom"])
+    collect(frontier, {source.key: source})
+    # Claimed by a process on this host that no longer exists
+    frontier.claim_url(f"{socket.gethostname()}-999999999-1")
+    assert frontier.status()["urls"] == {IN_FLIGHT: 1, "pending": 1}
+
+    articles = run_with_frontier(source, ["atom"], str(tmp_path / "out.json"), path)
+
+    assert len(articles) == 2
+    assert sorted(source.fetched) == ["https://query.pl/atom/0", "https://query.pl/atom/1"]
@@ -0,0 +1,111 @@
+import os
+from datetime import date
+
+import pytest
+
+from src.engine import health
+from src.engine.checkpoint import checkpoint_dir
+from src.engine.health import CLOSED, HALF_OPEN, OPEN, SourceHealth
+from src.engine.runner import run_source
+from src.engine.source import Source
+
+SELECTORS = {"title": "h1", "body": "div.article"}
+GOOD = ("Title", "2024-05-01", "Body " * 100, SELECTORS)
+EMPTY = ("Title", "2024-05-01", "", SELECTORS)
+
+
+def test_breaker_opens_on_empty_bodies_and_names_the_selector():
+    breaker = SourceHealth("test_pl", min_samples=10)
+    for _ in range(5):
+        breaker.observe(*GOOD)
+    for _ in range(5):
+        breaker.observe(*EMPTY)
+    assert breaker.state == CLOSED
+
+    breaker.observe(*EMPTY)
+
+    assert breaker.state == OPEN
+    assert breaker.paused()
+    assert breaker.failing_selectors() == ["body 'div.article': empty in 6 of 11"]
+
+
+def test_articles_without_selectors_are_reported_together():
+    breaker = SourceHealth("test_pl", min_samples=4)
+    for _ in range(4):
+        breaker.observe("Title", None, "", None)
+    assert breaker.failing_selectors() == ["body: empty in 4 of 4"]
+
+def test_breaker_ignores_fetch_failures():
+    breaker = SourceHealth("test_pl", min_samples=10)
+    for _ in range(20):
+        breaker.observe_failure()
+    assert breaker.state == CLOSED
+    assert breaker.metrics()["fetch_failure_rate"] == 1.0
+
+
+def test_half_open_breaker_closes_after_good_probes_and_reopens_after_bad():
+    breaker = SourceHealth("test_pl", min_samples=4, cooldown=60, probe=3)
+    for _ in range(4):
+        breaker.observe(*EMPTY)
+    assert breaker.paused(now=breaker.opened_at + 1)
+
+    assert not breaker.paused(now=breaker.opened_at + 61)
+    assert breaker.state == HALF_OPEN
+    for _ in range(3):
+        breaker.observe(*GOOD)
+    assert breaker.state == CLOSED
+
+    for _ in range(4):
+        breaker.observe(*EMPTY)
+    breaker.paused(now=breaker.opened_at + 61)
+    for _ in range(3):
+        breaker.observe(*EMPTY)
+    assert breaker.state == OPEN
+
+
+def test_empty_listings_open_the_breaker():
+    breaker = SourceHealth("test_pl")
+    for links in (5, 0, 0, 0):
+        breaker.observe_listing(links, {"items": "a.link"})
+    assert breaker.state == OPEN
+
+
+class BrokenSource(Source):
+    # The site changed its markup: pages after the first few have no body
+    key = "broken_pl"
+    name = "broken.pl"
+
+    def collect_links(self, unit, start_date=None, end_date=None, strict=False):
+        return [{"url": f"https://broken.pl/{unit.day}/{i}", "date": unit.isoformat()} for i in range(15)]
+
+    def fetch(self, url, validators=None):
+        return url
+
+    def parse_article(self, url, content):
+        return "Title", None, "Body " * 100 if url.startswith("https://broken.pl/1/") else ""
+
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setattr(health, "_registry", {})
+    breaker = health.get_health(BrokenSource())
+    breaker.min_samples = 10
+    return breaker
+
+
+def test_run_stops_and_keeps_its_checkpoint_when_the_breaker_opens(tmp_path, breaker):
+    output = str(tmp_path / "out.json")
+    health_file = str(tmp_path / "health.json")
+    days = [date(2024, 5, 1), date(2024, 5, 2), date(2024, 5, 3)]
+
+    articles = run_source(BrokenSource(), days, output, health=health_file)
+
+    # Day 2 was all empty, the first empty article of day 3 tips the rate over half
+    assert breaker.state == OPEN
+    assert len(articles) == 30
+    assert sorted(os.listdir(checkpoint_dir(output))) == ["broken_pl_2024-05-01.json", "broken_pl_2024-05-02.json"]
+    # A later run in another process starts paused
+    health._registry.clear()
+    restored = health.restore(health.get_health(BrokenSource()), health_file)
+    assert restored.state == OPEN
@@ -0,0 +1,76 @@
+from datetime import date
+
+import pytest
+
+from src.engine.keywords import KEYWORDS_FILE, KeywordMatcher, TagIndex, load_articles, tag_corpus
+from src.engine.segments import compact, list_segments, write_segment
+from src.engine.source import Source
+
+
+class DaySource(Source):
+    key = "test_pl"
+    name = "test.pl"
+
+
+def article(url, title, body="", day="2024-05-01"):
+    return {"url": url, "title": title, "date": day, "article_body": body, "source": "test.pl"}
+
+
+def test_find_reads_articles_after_compaction(tmp_path):
+    root = tmp_path / "segments"
+    day = date(2024, 5, 1)
+    write_segment(root, DaySource(), day, [article("https://test.pl/1", "Elektrownia atomowa")], "20240501T000000-1")
+    write_segment(root, DaySource(), day, [article("https://test.pl/2", "Atom w Polsce")], "20240502T000000-1")
+    index = TagIndex(str(tmp_path / "tags.sqlite"))
+    tag_corpus(KeywordMatcher({"nuclear": ["atom"]}), index, str(root))
+
+    assert compact(str(root)) == 1
+    assert len(next(iter(list_segments(str(root)).values()))) == 1
+
+    found = list(load_articles(index.find("nuclear")))
+    assert sorted(a["url"] for a in found) == ["https://test.pl/1", "https://test.pl/2"]
+
+
+def test_retagging_drops_old_tags(tmp_path):
+    index = TagIndex(str(tmp_path / "tags.sqlite"))
+    index.add([dict(article("https://test.pl/1", "x"), tags=["gas", "nuclear"])], "a.json")
+    index.add([dict(article("https://test.pl/1", "x"), tags=["nuclear"])], "b.json")
+
+    assert index.find("gas") == []
+    assert [row[3] for row in index.find("nuclear")] == ["b.json"]
+
+
+@pytest.fixture(scope="module")
+def shipped():
+    return KeywordMatcher.load(KEYWORDS_FILE)
+
+
+@pytest.mark.parametrize("text", [
+    "Uranus planet",
+    "Planeta Uran widoczna na niebie",
+    "спутник Урана",
+    "Napój energetyczny daje energię do pracy",
+    "puszka energetyka",
+    "Energy drink sales",
+    "банка энергетика",
+    "Woda gazowana",
+    "Gazeta Wyborcza",
+    "Газета",
+    "Обстрел сектора Газа",
+    "plynulý provoz",
+    "Nehéz választás volt",
+    "ураган",
+])
+def test_shipped_keywords_skip_unrelated_words(shipped, text):
+    assert shipped.tags(text) == []
+
+
+@pytest.mark.parametrize("text, tag", [
+    ("Rosja wstrzymała dostawy gazu", "energy"),
+    ("Удари по об'єктах енергосистеми", "energy"),
+    ("Iran a obohacený uran", "nuclear"),
+    ("Elektrownia jądrowa w Polsce", "nuclear"),
+    ("Parlamenti választások", "elections"),
+])
+def test_shipped_keywords_tag_their_topics(shipped, text, tag):
+    assert shipped.tags(text) == [tag]
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from src.engine.output import atomic_write, save_articles_to_file
+from src.engine.records import Article
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_bytes(b"previous")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as f:
+            f.write(b"half of the new")
+            raise RuntimeError("killed mid-write")
+
+    assert path.read_bytes() == b"previous"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_saved_articles_read_back_as_json(tmp_path, compact):
+    articles = [
+        Article("Poland", "pl", "test.pl", f"https://test.pl/{i}", title=f"Tytuł {i}", article_body="Treść")
+        for i in range(2500)
+    ]
+    path = tmp_path / "out.json"
+
+    save_articles_to_file(iter(articles), str(path), compact=compact)
+
+    with open(path, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert [a["url"] for a in saved] == [a.url for a in articles]
+    assert saved[0]["title"] == "Tytuł 0"
+    if compact:
+        assert len(path.read_text(encoding="utf-8").splitlines()) == len(articles) + 2
+
+
+def test_no_articles_is_an_empty_list(tmp_path):
+    path = tmp_path / "out.json"
+    save_articles_to_file([], str(path))
+    assert json.loads(path.read_text(encoding="utf-8")) == []
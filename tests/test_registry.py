@@ -0,0 +1,25 @@
+import sys
+import types
+from importlib import metadata
+
+from src.engine import registry
+from src.engine.source import Source
+
+
+def test_get_source_loads_plugin_in_fresh_process(monkeypatch):
+    # A plugin requested by key before the registry was ever listed, as
+    # main.py --sources does
+    plugin = types.ModuleType("delfi_scraper")
+    plugin.SOURCE = Source()
+    plugin.SOURCE.name = "delfi.lt"
+    monkeypatch.setitem(sys.modules, "delfi_scraper", plugin)
+    entry_point = metadata.EntryPoint("delfi_lt", "delfi_scraper:SOURCE", registry.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(metadata, "entry_points", lambda group: [entry_point] if group == entry_point.group else [])
+    monkeypatch.setattr(registry, "_plugins", None)
+    monkeypatch.setattr(registry, "_sources", {})
+
+    source = registry.get_source("delfi_lt")
+
+    assert source is plugin.SOURCE
+    assert source.key == "delfi_lt"
+    assert registry.available_sources()["delfi_lt"]["label"] == "delfi.lt"
@@ -0,0 +1,66 @@
+from src.engine.revisions import RevisionStore, apply_delta, check, make_delta
+from src.engine.source import Source
+
+
+def record(title, body, url="https://rev.pl/1"):
+    return {"url": url, "title": title, "date": "2024-05-01", "article_body": body, "source": "rev.pl"}
+
+
+class EditedSource(Source):
+    key = "rev_pl"
+    name = "rev.pl"
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def fetch(self, url, validators=None):
+        page = self.pages[url]
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+    def parse_article(self, url, content):
+        title, body = content
+        return title, None, body
+
+
+def test_delta_round_trip():
+    old = "Title\nfirst line\nsecond line\nthird line"
+    new = "Title\nfirst line\nsecond line, edited\nthird line\nfourth line"
+
+    assert apply_delta(new, make_delta(new, old)) == old
+
+
+def test_versions_rebuild_every_revision(tmp_path):
+    store = RevisionStore(str(tmp_path / "revisions.sqlite"))
+    versions = [
+        record("Two-line\ntitle", "Body one\nunchanged"),
+        record("Two-line\ntitle", "Body two\nunchanged"),
+        record("New title", "Body two\nunchanged\nappended"),
+    ]
+    for number, version in enumerate(versions):
+        assert store.observe("rev_pl", "2024-05-01", version, now=1000 + number) == number
+    assert store.observe("rev_pl", "2024-05-01", record("New title", "Body two unchanged   appended")) is None
+
+    stored = store.versions("https://rev.pl/1")
+
+    assert [revision for revision, _, _ in stored] == [2, 1, 0]
+    assert [saved_at for _, saved_at, _ in stored] == [1002, 1001, 1000]
+    assert [(v["title"], v["article_body"]) for _, _, v in stored] == [
+        (v["title"], v["article_body"]) for v in reversed(versions)
+    ]
+
+
+def test_check_saves_edits_and_skips_failed_urls_next_time(tmp_path):
+    store = RevisionStore(str(tmp_path / "revisions.sqlite"))
+    store.observe("rev_pl", "2024-05-01", record("Title", "Body"))
+    store.observe("rev_pl", "2024-05-01", record("Title", "Body", url="https://rev.pl/2"))
+    source = EditedSource({
+        "https://rev.pl/1": ("Title", "Body, corrected"),
+        "https://rev.pl/2": ConnectionError("connection reset"),
+    })
+
+    assert check(store, source, min_age=0) == {"unchanged": 0, "changed": 1, "failed": 1}
+    assert store.versions("https://rev.pl/1")[0][2]["article_body"] == "Body, corrected"
+    # Both were checked just now, so neither is due again within min_age
+    assert check(store, source, min_age=3600) == {"unchanged": 0, "changed": 0, "failed": 0}
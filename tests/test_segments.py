@@ -0,0 +1,54 @@
+import json
+import os
+from datetime import date
+
+from src.engine.segments import compact, export, list_segments, write_segment
+from src.engine.source import Source
+
+
+class SegmentSource(Source):
+    key = "seg_pl"
+    name = "seg.pl"
+
+
+def article(url, title, day="2024-05-01"):
+    return {"url": url, "title": title, "date": day, "article_body": "Body", "source": "seg.pl"}
+
+
+def test_compaction_keeps_the_newest_copy_of_each_url(tmp_path):
+    root = str(tmp_path)
+    day = date(2024, 5, 1)
+    write_segment(root, SegmentSource(), day, [article("https://seg.pl/2", "Old"), article("https://seg.pl/1", "One")],
+                  "20240501T000000-1")
+    write_segment(root, SegmentSource(), day, [article("https://seg.pl/2", "New")], "20240502T000000-1")
+
+    assert compact(root) == 1
+    [paths] = list_segments(root).values()
+    assert len(paths) == 1
+    with open(paths[0], "r", encoding="utf-8") as f:
+        assert [(a["url"], a["title"]) for a in map(json.loads, f)] == [
+            ("https://seg.pl/1", "One"), ("https://seg.pl/2", "New"),
+        ]
+    # A partition with a single segment is left alone
+    assert compact(root) == 0
+
+
+def test_export_is_sorted_deduplicated_and_filtered_by_date(tmp_path):
+    root = str(tmp_path / "segments")
+    for day, run_id in ((date(2024, 5, 1), "20240501T000000-1"), (date(2024, 5, 2), "20240502T000000-1")):
+        write_segment(root, SegmentSource(), day, [
+            article(f"https://seg.pl/{day.day}", f"Day {day.day}", day.isoformat()),
+            article("https://seg.pl/shared", f"Shared {day.day}", day.isoformat()),
+        ], run_id)
+    output = str(tmp_path / "out.json")
+
+    assert export(root, output) == 3
+    with open(output, "r", encoding="utf-8") as f:
+        assert [(a["url"], a["title"]) for a in json.load(f)] == [
+            ("https://seg.pl/1", "Day 1"), ("https://seg.pl/2", "Day 2"), ("https://seg.pl/shared", "Shared 2"),
+        ]
+
+    export(root, output, start_date=date(2024, 5, 2))
+    with open(output, "r", encoding="utf-8") as f:
+        assert [a["url"] for a in json.load(f)] == ["https://seg.pl/2", "https://seg.pl/shared"]
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("tmp")]
@@ -0,0 +1,74 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+from src.engine import sharding
+from src.engine.records import Article
+from src.engine.source import Source
+
+
+class DaySource(Source):
+    key = "days_pl"
+    name = "days.pl"
+
+
+@pytest.fixture
+def source(monkeypatch):
+    source = DaySource()
+    monkeypatch.setattr(sharding, "load_source", lambda name: source)
+    return source
+
+
+def fake_scrape_unit(calls):
+    def scrape_unit(source, unit, workers, dead_letters, start_date=None, end_date=None):
+        calls.append(workers)
+        return [Article("Poland", "pl", source.name, f"https://days.pl/{unit.isoformat()}", date=unit)]
+    return scrape_unit
+
+
+DAYS = [date(2024, 5, 1), date(2024, 5, 2), date(2024, 5, 3)]
+
+
+@pytest.mark.parametrize("backend", ["directory", "sqlite"])
+def test_merge_keeps_unit_order(tmp_path, monkeypatch, source, backend):
+    monkeypatch.setattr(sharding, "scrape_unit", fake_scrape_unit([]))
+    work_dir = str(tmp_path / "work")
+    sharding.plan("days_pl", DAYS, work_dir, backend)
+    # Units finish out of order: the last one was done by another worker first
+    queue = sharding.open_queue(work_dir)
+    claims = [queue.claim("other") for _ in DAYS]
+    seq, payload = claims[-1]
+    articles = sharding.scrape_unit(source, date.fromisoformat(payload["unit"]), 1, None)
+    sharding.save_articles_to_file(articles, os.path.join(work_dir, "parts", f"{seq:06d}.json"))
+    queue.complete(seq)
+    for seq, _ in claims[:-1]:
+        queue.release(seq)
+
+    assert sharding.work(work_dir) == 2
+    assert queue.counts() == {"pending": 0, "claimed": 0, "done": 3}
+    merged = sharding.merge(work_dir, str(tmp_path / "out.json"))
+    assert [article.date for article in merged] == DAYS
+
+
+def test_plan_refuses_a_used_work_dir(tmp_path, source):
+    work_dir = str(tmp_path / "work")
+    sharding.plan("days_pl", DAYS, work_dir)
+
+    with pytest.raises(ValueError):
+        sharding.plan("days_pl", DAYS[:1], work_dir)
+    with open(os.path.join(work_dir, "plan.json"), "r", encoding="utf-8") as f:
+        assert json.load(f)["units"] == 3
+
+
+def test_work_caps_workers_at_the_source_limit(tmp_path, monkeypatch, source):
+    calls = []
+    monkeypatch.setattr(sharding, "scrape_unit", fake_scrape_unit(calls))
+    source.max_concurrency = 2
+    work_dir = str(tmp_path / "work")
+    sharding.plan("days_pl", DAYS, work_dir)
+
+    sharding.work(work_dir, workers=8)
+
+    assert calls == [2, 2, 2]
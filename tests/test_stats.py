@@ -0,0 +1,81 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+from src.engine import stats
+from src.engine.segments import compact, write_segment
+from src.engine.source import Source
+
+
+class DaySource(Source):
+    key = "stats_pl"
+    name = "stats.pl"
+
+
+def write_day(root, day, urls, run_id):
+    articles = [
+        {"url": url, "title": "Elektrownia atomowa", "date": day.isoformat(), "article_body": "Atom w Polsce",
+         "source": "stats.pl", "language": "pl"}
+        for url in urls
+    ]
+    write_segment(root, DaySource(), day, articles, run_id)
+
+
+def articles_by_date(stats_dir):
+    table = stats.load_table(stats_dir, "articles")
+    counts = {}
+    for day, count in zip(table["date"], table["articles"]):
+        counts[day] = counts.get(day, 0) + count
+    return counts
+
+
+@pytest.fixture(params=["parquet", "npz", "json"])
+def storage(request, monkeypatch):
+    if request.param == "parquet" and stats.pyarrow is None or request.param == "npz" and stats.numpy is None:
+        pytest.skip(f"{request.param} needs an optional dependency")
+    monkeypatch.setattr(stats, "storage_format", lambda: request.param)
+    return request.param
+
+
+def test_update_reads_only_changed_partitions(tmp_path, storage):
+    root, stats_dir = str(tmp_path / "segments"), str(tmp_path / "stats")
+    write_day(root, date(2024, 5, 1), ["https://stats.pl/1", "https://stats.pl/2"], "20240501T000000-1")
+    write_day(root, date(2024, 5, 2), ["https://stats.pl/3"], "20240502T000000-1")
+    assert stats.update_stats(stats_dir, root) == 2
+    assert stats.update_stats(stats_dir, root) == 0
+
+    # A later run repeats one URL of May 1 and adds one
+    write_day(root, date(2024, 5, 1), ["https://stats.pl/2", "https://stats.pl/4"], "20240503T000000-1")
+    assert stats.update_stats(stats_dir, root) == 1
+
+    assert articles_by_date(stats_dir) == {"2024-05-01": 3, "2024-05-02": 1}
+    with open(os.path.join(stats_dir, stats.MANIFEST), "r", encoding="utf-8") as f:
+        assert len(json.load(f)["parts"]) == 2
+    assert dict(stats.top_terms(stats_dir))["atom"] == 4
+
+
+def test_compaction_keeps_the_counts(tmp_path, storage):
+    root, stats_dir = str(tmp_path / "segments"), str(tmp_path / "stats")
+    write_day(root, date(2024, 5, 1), ["https://stats.pl/1"], "20240501T000000-1")
+    write_day(root, date(2024, 5, 1), ["https://stats.pl/1", "https://stats.pl/2"], "20240502T000000-1")
+    stats.update_stats(stats_dir, root)
+
+    compact(root)
+    stats.update_stats(stats_dir, root)
+
+    assert articles_by_date(stats_dir) == {"2024-05-01": 2}
+
+
+def test_parts_are_merged_past_max_parts(tmp_path, monkeypatch, storage):
+    monkeypatch.setattr(stats, "MAX_PARTS", 2)
+    root, stats_dir = str(tmp_path / "segments"), str(tmp_path / "stats")
+    for day in (1, 2, 3):
+        write_day(root, date(2024, 5, day), [f"https://stats.pl/{day}"], f"2024050{day}T000000-1")
+        stats.update_stats(stats_dir, root)
+
+    with open(os.path.join(stats_dir, stats.MANIFEST), "r", encoding="utf-8") as f:
+        assert len(json.load(f)["parts"]) == 1
+    assert len(os.listdir(os.path.join(stats_dir, "articles"))) == 1
+    assert articles_by_date(stats_dir) == {"2024-05-01": 1, "2024-05-02": 1, "2024-05-03": 1}